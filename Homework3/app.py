@@ -70,7 +70,8 @@ def preprocess_data(file_path):
 
     numeric_cols = ['Last trade price', 'Max', 'Min', 'Avg Price', '%chg.', 'Volume', 'TurnoverBEST_MKD', 'TotalTurnoverMKD']
     for col in numeric_cols:
-        data[col] = data[col].replace({',': '', '"': ''}, regex=True).apply(pd.to_numeric, errors='coerce')
+        if not pd.api.types.is_numeric_dtype(data[col]):
+            data[col] = data[col].replace({',': '', '"': ''}, regex=True).apply(pd.to_numeric, errors='coerce')
 
     return data
 
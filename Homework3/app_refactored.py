@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for
+from flask import Flask, render_template, request, redirect, url_for, jsonify
 import pandas as pd
 import os
 import yfinance as yf
@@ -8,13 +8,27 @@ from sklearn.metrics import mean_squared_error
 import math
 from keras._tf_keras.keras.layers import LSTM, Dense, Dropout
 from keras._tf_keras.keras.models import Sequential
+from keras._tf_keras.keras.utils import Sequence
 import matplotlib.pyplot as plt
-from scraper import fetch_data_for_all_companies_threaded
-from technical_analysis import perform_technical_analysis
+import price_store
+import lstm_registry
+from frame_cache import FrameCache
+from async_crawler import AsyncCrawler
+from scrape_jobs import ScrapeJobManager
+from scraper import BASE_URL, fetch_companies, parse_table, plan_company, save_company
+from technical_analysis_refactored import perform_technical_analysis, sync_indicators
 
 app = Flask(__name__)
 UPLOAD_FOLDER = './data'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+CACHE_MAX_ENTRIES = 32
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+TABLE_PAGE_SIZE = 100
+TABLE_MAX_PAGE_SIZE = 1000
+frame_cache = FrameCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+# Scrapes run as background jobs, checkpointed so an interrupted one resumes where it stopped
+scrape_jobs = ScrapeJobManager(AsyncCrawler(BASE_URL, parse_table), fetch_companies, plan_company, save_company)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -22,7 +36,7 @@ def index():
         action = request.form.get('action')
 
         if action == 'scrape':
-            fetch_data_for_all_companies_threaded()
+            scrape_jobs.start(years_back=10, incremental=False)
             return redirect(url_for('index'))
 
         company = request.form.get('company')
@@ -32,12 +46,12 @@ def index():
         if company:
             file_path = os.path.join(UPLOAD_FOLDER, f"{company}.csv")
             if os.path.exists(file_path):
-                data = preprocess_data(file_path)
-
                 if date_from and date_to:
                     date_from = pd.to_datetime(date_from)
                     date_to = pd.to_datetime(date_to)
-                    data = data[(data['Date'] >= date_from) & (data['Date'] <= date_to)]
+                    data = load_range(company, file_path, date_from, date_to)
+                else:
+                    data = frame_cache.get(company, file_path, preprocess_data)
 
                 if data.empty:
                     return render_template(
@@ -47,13 +61,13 @@ def index():
                     )
 
                 if action == 'analyze_table':
-                    table_html = data.to_html(index=False, classes='table table-striped')
+                    # Only the ticker and range go in the URL; view_table reads the rows a page at a time.
+                    # Either date may have been left empty, so each one is normalised on its own
                     return redirect(url_for(
                         'view_table',
                         company=company,
-                        date_from=date_from,
-                        date_to=date_to,
-                        table=table_html
+                        date_from=pd.to_datetime(date_from).strftime('%Y-%m-%d') if date_from else None,
+                        date_to=pd.to_datetime(date_to).strftime('%Y-%m-%d') if date_to else None
                     ))
                 elif action == 'analyze_technical':
                     analysis_html = perform_technical_analysis(data, company)
@@ -92,42 +106,126 @@ def index():
     return render_template('index.html', companies=get_companies())
 
 def preprocess_data(file_path):
-    data = pd.read_csv(file_path)
-    data['Date'] = pd.to_datetime(data['Date'], format='%m/%d/%Y', errors='coerce')
+    company = os.path.splitext(os.path.basename(file_path))[0]
+
+    # Typed columns are read straight from the store; the CSV is only parsed once after each scrape
+    if price_store.is_stale(company, file_path):
+        data = price_store.convert_csv(company, file_path)
+        sync_indicators(company, data)
+        return data
+    return price_store.load_frame(company)
+
+def ensure_store(company, file_path):
+    # A CSV newer than the store is converted first
+    if price_store.is_stale(company, file_path):
+        frame_cache.get(company, file_path, preprocess_data)
+
+def load_range(company, file_path, date_from, date_to):
+    # Only the requested days are read, through the store's sorted date column
+    ensure_store(company, file_path)
+    return price_store.load(company, date_from, date_to)
+
+def table_page(company, date_from, date_to, page, page_size):
+    # One page of a ticker's rows in the range; memory per request is bounded by page_size
+    file_path = os.path.join(UPLOAD_FOLDER, f"{company}.csv")
+    ensure_store(company, file_path)
+    start, end = price_store.row_range(company, date_from, date_to)
+    total_rows = end - start
+    pages = max(1, -(-total_rows // page_size))
+    page = min(max(page, 1), pages)
+    first = start + (page - 1) * page_size
+    rows = price_store.load_rows(company, first, min(end, first + page_size))
+    return rows, page, pages, total_rows
+
+def table_args():
+    # Ticker, range and page of a table request; dates may be left out for an open range
+    company = request.args.get('company')
+    date_from = request.args.get('date_from') or None
+    date_to = request.args.get('date_to') or None
+    page = request.args.get('page', 1, type=int)
+    page_size = min(max(request.args.get('page_size', TABLE_PAGE_SIZE, type=int), 1), TABLE_MAX_PAGE_SIZE)
+    return company, date_from, date_to, page, page_size
 
-    numeric_cols = ['Last trade price', 'Max', 'Min', 'Avg Price', '%chg.', 'Volume', 'TurnoverBEST_MKD', 'TotalTurnoverMKD']
-    for col in numeric_cols:
-        data[col] = data[col].replace({',': '', '"': ''}, regex=True).apply(pd.to_numeric, errors='coerce')
+def has_company(company):
+    return bool(company) and os.path.exists(os.path.join(UPLOAD_FOLDER, f"{company}.csv"))
 
-    return data
+def format_price(value):
+    # Prices are numbers everywhere else; the 23.299,00 style is only applied when rendering
+    return "{:,.2f}".format(value).replace(',', 'X').replace('.', ',').replace('X', '.')
 
 def get_companies():
     return [file.replace('.csv', '') for file in os.listdir(UPLOAD_FOLDER) if file.endswith('.csv')]
 
+@app.route('/scrape_status', methods=['GET'])
+def scrape_status():
+    return jsonify(scrape_jobs.jobs())
+
+@app.route('/scrape_status/<job_id>', methods=['GET'])
+def scrape_job_status(job_id):
+    job = scrape_jobs.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify(frame_cache.stats())
+
 @app.route('/view_table', methods=['GET'])
 def view_table():
-    company = request.args.get('company')
-    date_from = request.args.get('date_from')
-    date_to = request.args.get('date_to')
-    table_html = request.args.get('table')
+    company, date_from, date_to, page, page_size = table_args()
+    if not has_company(company):
+        return render_template('index.html', error=f"No data found for {company}.", companies=get_companies())
+
+    rows, page, pages, total_rows = table_page(company, date_from, date_to, page, page_size)
+    table_html = rows.to_html(index=False, classes='table table-striped', float_format=format_price)
+
+    def page_url(number):
+        return url_for('view_table', company=company, date_from=date_from, date_to=date_to,
+                       page=number, page_size=page_size)
 
     return render_template(
         'view_table.html',
         company=company,
         date_from=date_from,
         date_to=date_to,
-        table=table_html
+        table=table_html,
+        page=page,
+        pages=pages,
+        total_rows=total_rows,
+        prev_url=page_url(page - 1) if page > 1 else None,
+        next_url=page_url(page + 1) if page < pages else None
     )
 
-def perform_fundamental_analysis(stock_data, date_from, date_to):
-    filtered_data = stock_data[(stock_data['Date'] >= date_from) & (stock_data['Date'] <= date_to)]
+@app.route('/table_rows', methods=['GET'])
+def table_rows():
+    company, date_from, date_to, page, page_size = table_args()
+    if not has_company(company):
+        return jsonify({'error': f"No data found for {company}."}), 404
+
+    rows, page, pages, total_rows = table_page(company, date_from, date_to, page, page_size)
+    rows['Date'] = rows['Date'].dt.strftime('%Y-%m-%d')
+    return jsonify({
+        'company': company,
+        'date_from': date_from,
+        'date_to': date_to,
+        'page': page,
+        'page_size': page_size,
+        'pages': pages,
+        'total_rows': total_rows,
+        # NaN is not valid JSON, missing values are sent as null
+        'rows': rows.astype(object).where(rows.notna(), None).to_dict(orient='records')
+    })
 
-    if filtered_data.empty:
+def perform_fundamental_analysis(stock_data, date_from, date_to):
+    # stock_data is already limited to the selected range by index()
+    if stock_data.empty:
         return "No stock data available for the selected date range."
 
-    fundamental_table = filtered_data[['Date', 'Last trade price']].to_html(index=False, classes='table table-striped')
+    fundamental_table = stock_data[['Date', 'Last trade price']].to_html(
+        index=False, classes='table table-striped', float_format=format_price)
 
-    stock_movement_counter = analyze_stock_movement(filtered_data)
+    stock_movement_counter = analyze_stock_movement(stock_data)
 
     if stock_movement_counter > 0:
         recommendation = "Buy"
@@ -138,40 +236,64 @@ def perform_fundamental_analysis(stock_data, date_from, date_to):
 
     return recommendation, fundamental_table
 
-def analyze_stock_movement(stock_data):
-    movement_counter = 0
-    for i in range(1, len(stock_data)):
-        previous_day_price = stock_data['Last trade price'].iloc[i - 1]
-        current_day_price = stock_data['Last trade price'].iloc[i]
-
-        if current_day_price < previous_day_price:
-            movement_counter += 1
-        elif current_day_price > previous_day_price:
-            movement_counter -= 1
-
-    return movement_counter
+def analyze_stock_movement(stock_data, window=None):
+    # Rising days minus falling days over the (date-ascending) data, or its last `window` daily moves;
+    # days with a missing price do not count
+    steps = np.nan_to_num(np.sign(np.diff(stock_data['Last trade price'].to_numpy(dtype=float))))
+    if window is not None:
+        steps = steps[-window:]
+    return int(steps.sum())
 
-def preprocess_for_lstm(stock_data, window_size=60):
+def preprocess_for_lstm(stock_data, window_size=60, scaler=None):
     from sklearn.preprocessing import MinMaxScaler
     import numpy as np
 
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(stock_data[['Last trade price']].values)
-
-    X, y = [], []
-    for i in range(window_size, len(scaled_data)):
-        X.append(scaled_data[i - window_size:i, 0])
-        y.append(scaled_data[i, 0])
+    # A stored model brings its own fitted scaler; a new one is fitted here
+    if scaler is None:
+        scaler = MinMaxScaler(feature_range=(0, 1))
+        scaled_data = scaler.fit_transform(stock_data[['Last trade price']].values)
+    else:
+        scaled_data = scaler.transform(stock_data[['Last trade price']].values)
 
-    if len(X) == 0 or len(y) == 0:
+    if len(scaled_data) <= window_size:
         raise ValueError("Insufficient data for LSTM preprocessing. Consider using a larger date range.")
 
-    X, y = np.array(X), np.array(y)
+    # Strided view over the prices: window i is scaled_data[i:i + window_size], nothing is copied
+    series = scaled_data[:, 0]
+    X = np.lib.stride_tricks.sliding_window_view(series[:-1], window_size)
+    y = series[window_size:]
     print(f"Shape of X before reshaping: {X.shape}")  # Debugging
-    X = np.reshape(X, (X.shape[0], X.shape[1], 1))  # Reshape for LSTM input
+    X = X[..., np.newaxis]  # Reshape for LSTM input
 
     return X, y, scaler
 
+
+class WindowSequence(Sequence):
+    """Batches of LSTM windows copied out of the strided view one batch at a time"""
+
+    def __init__(self, X, y=None, batch_size=32, shuffle=False):
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(X))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.X) / self.batch_size))
+
+    def __getitem__(self, index):
+        rows = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+        if self.y is None:
+            return self.X[rows]
+        return self.X[rows], self.y[rows]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
+
+
 def build_lstm_model(input_shape):
     model = Sequential()
     model.add(LSTM(units=50, return_sequences=True, input_shape=input_shape))
@@ -197,25 +319,34 @@ def evaluate_lstm_model(y_test, predicted_prices):
 
 def perform_lstm_analysis(data, date_from, date_to, company, window_size=60):
     try:
-        stock_data = data[(data['Date'] >= date_from) & (data['Date'] <= date_to)]
+        # data is already limited to the selected range by index()
+        stock_data = data
         if stock_data.empty:
             raise ValueError("No stock data available for the selected date range.")
 
-        X, y, scaler = preprocess_for_lstm(stock_data, window_size)
+        # Reuse the model trained on exactly this ticker, window and price range when there is one
+        data_fingerprint = lstm_registry.fingerprint(stock_data[['Last trade price']].values)
+        stored = lstm_registry.load_model(company, window_size, data_fingerprint)
+        X, y, scaler = preprocess_for_lstm(stock_data, window_size, stored[1] if stored else None)
 
         split_ratio = 0.7
         train_size = int(len(X) * split_ratio)
         X_train, X_test = X[:train_size], X[train_size:]
         y_train, y_test = y[:train_size], y[train_size:]
 
-        model = build_lstm_model((X_train.shape[1], 1))
-        model.fit(X_train, y_train, epochs=20, batch_size=32, verbose=1)
+        if stored:
+            model = stored[0]
+        else:
+            model = build_lstm_model((X_train.shape[1], 1))
+            model.fit(WindowSequence(X_train, y_train, batch_size=32, shuffle=True), epochs=20, verbose=1)
 
-        predictions = model.predict(X_test)
+        predictions = model.predict(WindowSequence(X_test, batch_size=256))
         predicted_prices = scaler.inverse_transform(predictions)
         actual_prices = scaler.inverse_transform(y_test.reshape(-1, 1))
 
         rmse = np.sqrt(np.mean((predicted_prices - actual_prices) ** 2))
+        if not stored:
+            lstm_registry.save_model(company, window_size, data_fingerprint, model, scaler, {'rmse': float(rmse)})
 
         plt.figure(figsize=(10, 6))
         plt.plot(actual_prices, label='Actual Prices', color='blue')
@@ -236,4 +367,8 @@ def perform_lstm_analysis(data, date_from, date_to, company, window_size=60):
         return str(e), None
 
 if __name__ == '__main__':
+    # The debug reloader imports this module in a watcher and in the serving process;
+    # only the serving one may resume jobs, or both would write the same job and store files
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        scrape_jobs.resume_unfinished()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,194 @@
+import asyncio
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import aiohttp
+import numpy as np
+import pandas as pd
+
+# Responses that mean "slow down and try again"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket whose refill rate adapts to how the server copes.
+
+    The rate is halved when the server throttles or fails (429/5xx, timeouts), at most
+    once per second so that a burst of rejected in-flight requests counts as one signal,
+    and grows back by a share of max_rate with every success. Latency is tracked as a
+    moving average, and backoff delays scale with it.
+    """
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 0.5, increase: float = 0.05):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.latency = None
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                # Short naps, so a rate that recovers meanwhile takes effect quickly
+                await asyncio.sleep(min(0.1, (1 - self.tokens) / self.rate))
+
+    def on_success(self, latency: float):
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.rate = min(self.max_rate, self.rate + self.increase * self.max_rate)
+
+    def on_throttle(self):
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease >= max(1.0, self.latency or 0.0):
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._last_decrease = now
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        base = max(0.5, 2 * (self.latency or 0.5))
+        return min(60.0, base * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+class AsyncCrawler:
+    """Fetches every (company, date range) page as an independent asyncio task.
+
+    Requests share one connection pool, a global concurrency cap and an adaptive
+    rate limit, so a full refresh is bounded by the rate limit instead of by the
+    longest chain of one company's yearly requests.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            parse_page: Callable[[bytes], pd.DataFrame],
+            concurrency: int = 16,
+            rate: float = 8.0,
+            burst: int = 8,
+            retries: int = 4
+    ):
+        self.base_url = base_url
+        self.parse_page = parse_page
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.limiter = None
+        self.latencies: List[float] = []
+
+    async def fetch_range(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                          company: str, date_from: str, date_to: str) -> Optional[pd.DataFrame]:
+        """The parsed page of one date range, or None when it could not be fetched."""
+        url = f"{self.base_url}{company}?FromDate={date_from}&ToDate={date_to}"
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            status, body, retry_after = None, None, None
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    async with session.get(url) as response:
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                        body = await response.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Request for {company} {date_from}-{date_to} failed: {e!r}")
+                latency = time.monotonic() - start
+
+            if status is not None:
+                self.latencies.append(latency)
+            if status == 200:
+                self.limiter.on_success(latency)
+                # Parsing is CPU work, keep it off the event loop
+                return await asyncio.get_running_loop().run_in_executor(None, self.parse_page, body)
+            if status is not None and status not in RETRY_STATUSES:
+                print(f"Failed to fetch data for {company}: HTTP {status}")
+                return None
+
+            self.limiter.on_throttle()
+            await asyncio.sleep(self.limiter.backoff_delay(attempt, retry_after))
+
+        print(f"Failed to fetch data for {company} after {self.retries} retries")
+        return None
+
+    async def crawl(self, plan: Dict[str, List[Tuple[str, str]]],
+                    on_company_done: Callable[[str, List[pd.DataFrame]], object],
+                    on_range_done: Optional[Callable[[str, str, str, pd.DataFrame], None]] = None) -> Dict[str, object]:
+        """Fetch every date range in plan; on_company_done gets each company's frames once they are all in.
+
+        A company with a range that still failed after its retries is not passed to on_company_done,
+        since saving it would leave a gap in its history; its result is None. on_range_done, if given,
+        is called with every range that was fetched successfully as soon as it arrives. A range whose
+        page fails to parse, or whose on_range_done raises, counts as failed.
+        """
+        # Created here so they belong to the running event loop
+        self.limiter = RateLimiter(self.rate, self.burst)
+        self.latencies = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        results = {}
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            async def crawl_range(company: str, date_from: str, date_to: str) -> Optional[pd.DataFrame]:
+                # A page that does not parse or a range that cannot be recorded only fails that range
+                try:
+                    frame = await self.fetch_range(session, semaphore, company, date_from, date_to)
+                    if frame is not None and on_range_done is not None:
+                        await loop.run_in_executor(None, on_range_done, company, date_from, date_to, frame)
+                    return frame
+                except Exception as e:
+                    print(f"Error while processing {company} {date_from}-{date_to}: {e!r}")
+                    return None
+
+            async def crawl_company(company: str, ranges: List[Tuple[str, str]]):
+                frames = await asyncio.gather(*(
+                    crawl_range(company, date_from, date_to) for date_from, date_to in ranges
+                ))
+                failed = sum(frame is None for frame in frames)
+                if failed:
+                    print(f"Not saving {company}: {failed} of {len(ranges)} date ranges could not be fetched")
+                    results[company] = None
+                    return
+                try:
+                    # Saving writes files, so it runs in a worker thread as well
+                    results[company] = await loop.run_in_executor(
+                        None, on_company_done, company, [frame for frame in frames if not frame.empty]
+                    )
+                except Exception as e:
+                    print(f"Error while saving data for {company}: {e}")
+                    results[company] = None
+
+            await asyncio.gather(*(crawl_company(company, ranges) for company, ranges in plan.items()))
+
+        return results
+
+    def run(self, plan: Dict[str, List[Tuple[str, str]]],
+            on_company_done: Callable[[str, List[pd.DataFrame]], object],
+            on_range_done: Optional[Callable[[str, str, str, pd.DataFrame], None]] = None) -> Dict[str, object]:
+        return asyncio.run(self.crawl(plan, on_company_done, on_range_done))
+
+    def stats(self) -> dict:
+        if self.limiter is None:
+            return {}
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'requests': len(latencies),
+            'rate': round(self.limiter.rate, 2),
+            'latency': round(self.limiter.latency, 3) if self.limiter.latency else None,
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None,
+            'p99_ms': round(float(np.percentile(latencies, 99)), 1) if len(latencies) else None,
+            'throttled': self.limiter.throttled
+        }
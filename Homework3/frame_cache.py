@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FrameCache:
+    """Bounded LRU cache of preprocessed DataFrames, invalidated when the source file changes.
+
+    Cached frames are shared between requests, so callers must not modify them in place.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, path, loader):
+        signature = file_signature(path)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        frame = loader(path)
+        self.put(key, signature, frame)
+        return frame
+
+    def put(self, key, signature, frame):
+        size = int(frame.memory_usage(deep=True).sum())
+        with self.lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+
+            self.entries[key] = (signature, frame, size)
+            self.current_bytes += size
+            while len(self.entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import numpy as np
+
+MODEL_DIR = './models'
+
+# Models already loaded in this process, by key
+loaded_models = {}
+models_lock = threading.Lock()
+
+
+def fingerprint(prices):
+    return hashlib.sha1(np.ascontiguousarray(prices, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+
+def model_key(ticker, window_size, data_fingerprint):
+    return f"{ticker}_w{window_size}_{data_fingerprint}"
+
+
+def save_model(ticker, window_size, data_fingerprint, model, scaler, metrics=None, model_dir=MODEL_DIR):
+    key = model_key(ticker, window_size, data_fingerprint)
+    target = os.path.join(model_dir, key)
+    tmp_dir = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    model.save(os.path.join(tmp_dir, 'model.keras'))
+    with open(os.path.join(tmp_dir, 'scaler.pkl'), 'wb') as f:
+        pickle.dump(scaler, f)
+    meta = {
+        'ticker': ticker,
+        'window_size': window_size,
+        'fingerprint': data_fingerprint,
+        'trained_at': time.time(),
+        'metrics': metrics or {}
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+    with models_lock:
+        loaded_models[key] = (model, scaler, meta)
+    return key
+
+
+def load_model(ticker, window_size, data_fingerprint, model_dir=MODEL_DIR):
+    # Returns (model, scaler, meta), or None when no model was trained on this data yet
+    key = model_key(ticker, window_size, data_fingerprint)
+    with models_lock:
+        if key in loaded_models:
+            return loaded_models[key]
+
+    entry_dir = os.path.join(model_dir, key)
+    if not os.path.exists(os.path.join(entry_dir, 'meta.json')):
+        return None
+
+    from keras._tf_keras.keras.models import load_model as load_keras_model
+    model = load_keras_model(os.path.join(entry_dir, 'model.keras'))
+    with open(os.path.join(entry_dir, 'scaler.pkl'), 'rb') as f:
+        scaler = pickle.load(f)
+    with open(os.path.join(entry_dir, 'meta.json')) as f:
+        meta = json.load(f)
+
+    with models_lock:
+        loaded_models[key] = (model, scaler, meta)
+    return model, scaler, meta
@@ -0,0 +1,225 @@
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+STORE_DIR = './data/store'
+INDICATOR_DIR = './data/indicators'
+
+# Column name -> (file name, dtype) of the typed columnar store
+COLUMNS = {
+    'Date': ('date', 'datetime64[D]'),
+    'Last trade price': ('last_trade_price', 'float64'),
+    'Max': ('max', 'float64'),
+    'Min': ('min', 'float64'),
+    'Avg Price': ('avg_price', 'float64'),
+    '%chg.': ('pct_change', 'float64'),
+    'Volume': ('volume', 'int64'),
+    'TurnoverBEST_MKD': ('turnover_best_mkd', 'float64'),
+    'TotalTurnoverMKD': ('total_turnover_mkd', 'float64'),
+}
+
+TURNOVER_COLUMNS = ['TurnoverBEST_MKD', 'TotalTurnoverMKD']
+
+# A ticker's columns live in a versioned directory under store/<ticker>, and this file
+# names the current one, so a write replaces every column at once by rewriting it
+CURRENT_FILE = 'CURRENT'
+
+# Indicator columns persisted next to the prices, plus the EMA state needed to extend MACD
+INDICATOR_COLUMNS = {
+    'Date': ('date', 'datetime64[D]'),
+    'Avg Price': ('avg_price', 'float64'),
+    'SMA_10': ('sma_10', 'float64'),
+    'EMA_20': ('ema_20', 'float64'),
+    'SMA_50': ('sma_50', 'float64'),
+    'WMA_15': ('wma_15', 'float64'),
+    'HMA_9': ('hma_9', 'float64'),
+    'RSI': ('rsi', 'float64'),
+    'Stochastic': ('stochastic', 'float64'),
+    'EMA_12': ('ema_12', 'float64'),
+    'EMA_26': ('ema_26', 'float64'),
+    'MACD': ('macd', 'float64'),
+    'Williams_R': ('williams_r', 'float64'),
+}
+
+
+def ticker_dir(ticker, store_dir=STORE_DIR):
+    # Directory with the ticker's current column files; resolve it once per read
+    root = os.path.join(store_dir, ticker)
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return os.path.join(root, f.read().strip())
+    except FileNotFoundError:
+        # Stores written before versioned directories keep the columns in store/<ticker> itself
+        return root
+
+
+def has_ticker(ticker, store_dir=STORE_DIR):
+    return os.path.exists(os.path.join(ticker_dir(ticker, store_dir), 'date.npy'))
+
+
+def is_stale(ticker, csv_path, store_dir=STORE_DIR):
+    if not has_ticker(ticker, store_dir):
+        return True
+    if not os.path.exists(csv_path):
+        return False
+    store_mtime = os.path.getmtime(os.path.join(ticker_dir(ticker, store_dir), 'date.npy'))
+    return os.path.getmtime(csv_path) > store_mtime
+
+
+def parse_number_column(values, column):
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+
+    # Numbers (new scrapes, CSVs written by write_csv) are taken as they are;
+    # text in a number column only comes from CSVs saved by the old scraper
+    is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+    numbers = pd.to_numeric(values.where(~is_text), errors='coerce')
+    text = values[is_text].str.strip().str.replace('"', '', regex=False)
+    return numbers.where(~is_text, parse_legacy_text(text, column))
+
+
+def parse_legacy_text(text, column):
+    # The old scraper saved the site's text, except that it read every price, %chg. and turnover
+    # value it could parse as a float (one comma, no point) and wrote it back with two decimals
+    # and a decimal comma. So in its CSVs:
+    #   prices     "23,299.00" is grouped, "577,00" is 577.00
+    #   %chg.      "0,85" always has a decimal comma
+    #   Volume     "1,061" is always grouped
+    #   turnovers  "1,484,406" is grouped, "715,66" is the site's "715,664" read as 715.664
+    grouped = pd.to_numeric(text.str.replace(',', '', regex=False), errors='coerce')
+    if column == 'Volume':
+        return grouped
+    decimal = pd.to_numeric(text.str.replace(',', '.', regex=False), errors='coerce')
+    if column == '%chg.':
+        return decimal
+
+    reformatted = (text.str.count(',') == 1) & ~text.str.contains('.', regex=False)
+    if column in TURNOVER_COLUMNS:
+        decimal = decimal * 1000
+    return grouped.where(~reformatted, decimal)
+
+
+def to_typed_frame(data):
+    typed = pd.DataFrame({'Date': pd.to_datetime(data['Date'], format='%m/%d/%Y', errors='coerce')})
+    for column, (_, dtype) in COLUMNS.items():
+        if column == 'Date':
+            continue
+        values = parse_number_column(data[column], column)
+        typed[column] = values.fillna(0).astype(dtype) if dtype == 'int64' else values
+
+    typed = typed.dropna(subset=['Date'])
+    return typed.sort_values('Date', kind='stable').drop_duplicates('Date', keep='last').reset_index(drop=True)
+
+
+def parse_csv(file_path):
+    return to_typed_frame(pd.read_csv(file_path))
+
+
+def write_csv(data, file_path):
+    # CSVs keep the scraped layout: newest day first, dates as month/day/year
+    newest_first = data.iloc[::-1]
+    newest_first.assign(Date=newest_first['Date'].dt.strftime('%m/%d/%Y')).to_csv(file_path, index=False)
+
+
+def write_frame(ticker, data, store_dir=STORE_DIR, schema=COLUMNS):
+    root = os.path.join(store_dir, ticker)
+    # Versions sort by creation time, which the clean-up below relies on
+    version = f"{time.time_ns():020d}-{os.getpid()}"
+    os.makedirs(os.path.join(root, version))
+
+    for column, (file_name, dtype) in schema.items():
+        np.save(os.path.join(root, version, f"{file_name}.npy"), data[column].to_numpy(dtype=dtype))
+
+    # Repointing CURRENT is one atomic rename, so readers see either the old or the new columns
+    previous = ticker_dir(ticker, store_dir)
+    pointer_tmp = os.path.join(root, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_FILE))
+    remove_old_versions(root, os.path.basename(previous) if previous != root else None)
+
+
+def remove_old_versions(root, previous):
+    # Keep the version just replaced for readers that resolved it a moment ago, and anything
+    # newer that a concurrent write may still be filling; older versions are removed
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            if previous is not None and name < previous:
+                shutil.rmtree(path, ignore_errors=True)
+        elif name.endswith('.npy') and previous is not None:
+            # Columns of the unversioned layout, replaced by an earlier versioned write
+            os.remove(path)
+
+
+def convert_csv(ticker, csv_path, store_dir=STORE_DIR):
+    data = parse_csv(csv_path)
+    write_frame(ticker, data, store_dir)
+    return data
+
+
+def load_columns(ticker, columns=None, store_dir=STORE_DIR, schema=COLUMNS):
+    columns = columns or list(schema)
+    path = ticker_dir(ticker, store_dir)
+    return {
+        column: np.load(os.path.join(path, f"{schema[column][0]}.npy"), mmap_mode='r')
+        for column in columns
+    }
+
+
+def load_frame(ticker, columns=None, store_dir=STORE_DIR, schema=COLUMNS):
+    return pd.DataFrame(load_columns(ticker, columns, store_dir, schema))
+
+
+def row_range(ticker, date_from=None, date_to=None, store_dir=STORE_DIR, schema=COLUMNS):
+    # [start, end) row positions of the days from date_from to date_to (both inclusive, either may be open).
+    # Dates are stored sorted, so this is a binary search on the memory-mapped Date column
+    dates = np.load(os.path.join(ticker_dir(ticker, store_dir), f"{schema['Date'][0]}.npy"), mmap_mode='r')
+    start, end = 0, len(dates)
+    if date_from is not None:
+        start = int(np.searchsorted(dates, pd.Timestamp(date_from).to_datetime64().astype('datetime64[D]'), side='left'))
+    if date_to is not None:
+        end = int(np.searchsorted(dates, pd.Timestamp(date_to).to_datetime64().astype('datetime64[D]'), side='right'))
+    return start, max(start, end)
+
+
+def load_rows(ticker, start, end, columns=None, store_dir=STORE_DIR, schema=COLUMNS):
+    # Only rows [start, end) of each requested column are read from disk
+    columns = columns or list(schema)
+    path = ticker_dir(ticker, store_dir)
+    return pd.DataFrame({
+        column: np.array(np.load(os.path.join(path, f"{schema[column][0]}.npy"), mmap_mode='r')[start:end])
+        for column in columns
+    })
+
+
+def load(ticker, date_from=None, date_to=None, columns=None, store_dir=STORE_DIR, schema=COLUMNS):
+    start, end = row_range(ticker, date_from, date_to, store_dir, schema)
+    return load_rows(ticker, start, end, columns, store_dir, schema)
+
+
+def load_tail(ticker, last_date, rows, store_dir=STORE_DIR, schema=COLUMNS):
+    # Reads only the `rows` rows ending at last_date, or None when that date is not stored
+    columns = load_columns(ticker, None, store_dir, schema)
+    last_date = np.datetime64(last_date, 'D')
+    end = int(np.searchsorted(columns['Date'], last_date, side='right'))
+    if end == 0 or columns['Date'][end - 1] != last_date:
+        return None
+    return pd.DataFrame({column: values[max(0, end - rows):end] for column, values in columns.items()})
+
+
+def convert_all(data_dir='./data', store_dir=STORE_DIR):
+    converted = []
+    for file in sorted(os.listdir(data_dir)):
+        if file.endswith('.csv'):
+            ticker = file[:-len('.csv')]
+            convert_csv(ticker, os.path.join(data_dir, file), store_dir)
+            converted.append(ticker)
+    return converted
+
+
+if __name__ == '__main__':
+    tickers = convert_all()
+    print(f"Converted {len(tickers)} tickers into {STORE_DIR}")
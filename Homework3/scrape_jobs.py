@@ -0,0 +1,276 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+from async_crawler import AsyncCrawler
+
+
+class ScrapeJobManager:
+    """Runs full scrapes as background jobs that survive restarts.
+
+    A job's state is kept in <jobs_dir>/<job_id>/: its status in job.json, its plan in
+    plan.json, written once, and its progress as one line per finished range or saved
+    company appended to progress.jsonl. Every fetched (company, date range) page is
+    checkpointed under <jobs_dir>/<job_id>/ranges/.
+    A job that was cut short resumes from those checkpoints and only requests the
+    ranges that are still missing. A company is only saved once all of its ranges
+    are in; when some could not be fetched the job ends as 'interrupted' and keeps
+    its checkpoints, so resuming it requests just those ranges. Jobs run one at a time.
+    """
+
+    UNFINISHED = ('queued', 'running', 'interrupted', 'failed')
+    # Job fields kept outside job.json: the plan is written once and progress is appended
+    PLAN_FIELDS = ('plan', 'last_dates')
+    PROGRESS_FIELDS = ('done', 'saved')
+
+    def __init__(
+            self,
+            crawler: AsyncCrawler,
+            list_companies: Callable[[], List[str]],
+            plan_company: Callable[[str, int, bool], tuple],
+            save_company: Callable[[str, List[pd.DataFrame], Optional[datetime]], object],
+            jobs_dir: str = './data/jobs'
+    ):
+        self.crawler = crawler
+        self.list_companies = list_companies
+        self.plan_company = plan_company
+        self.save_company = save_company
+        self.jobs_dir = jobs_dir
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+        self._jobs: Dict[str, dict] = {}
+        self._active: Optional[str] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def start(self, years_back: int = 10, incremental: bool = True) -> dict:
+        """Queue a new scrape, unless one is already queued or running."""
+        with self._lock:
+            if self._active is not None:
+                return self._summary(self._jobs[self._active])
+
+            now = datetime.now().isoformat(timespec='seconds')
+            job = {
+                'id': uuid.uuid4().hex[:12],
+                'status': 'queued',
+                'years_back': years_back,
+                'incremental': incremental,
+                'created_at': now,
+                'updated_at': now,
+                'plan': None,
+                'last_dates': None,
+                'done': {},
+                'saved': {},
+                'error': None
+            }
+            self._jobs[job['id']] = job
+            self._active = job['id']
+            self._write(job)
+
+        self._executor.submit(self._run, job['id'])
+        return self._summary(job)
+
+    def resume(self, job_id: str) -> Optional[dict]:
+        """Continue an unfinished job from its checkpoints."""
+        job = self._load(job_id)
+        if job is None:
+            return None
+
+        with self._lock:
+            if job['status'] not in self.UNFINISHED or self._active is not None:
+                return self._summary(job)
+            job['status'] = 'queued'
+            job['error'] = None
+            self._active = job_id
+            self._write(job)
+
+        self._executor.submit(self._run, job_id)
+        return self._summary(job)
+
+    def resume_unfinished(self) -> List[str]:
+        """Pick up the latest job that was still queued or running when the service stopped."""
+        unfinished = [job for job in self._load_all() if job['status'] in self.UNFINISHED]
+        if not unfinished:
+            return []
+        latest = max(unfinished, key=lambda job: job['created_at'])
+        self.resume(latest['id'])
+        return [latest['id']]
+
+    def status(self, job_id: str) -> Optional[dict]:
+        job = self._load(job_id)
+        return self._summary(job) if job else None
+
+    def jobs(self) -> List[dict]:
+        return [self._summary(job) for job in sorted(self._load_all(), key=lambda job: job['created_at'], reverse=True)]
+
+    def _run(self, job_id: str):
+        job = self._jobs[job_id]
+        try:
+            # Plan once: a resumed job asks for the same ranges it started with
+            if job['plan'] is None:
+                plan, last_dates = {}, {}
+                for company in self.list_companies():
+                    ranges, last_date = self.plan_company(company, job['years_back'], job['incremental'])
+                    plan[company] = [list(date_range) for date_range in ranges]
+                    last_dates[company] = last_date.isoformat() if last_date else None
+                with self._lock:
+                    job['plan'], job['last_dates'] = plan, last_dates
+                    self._write_plan(job)
+
+            with self._lock:
+                job['status'] = 'running'
+                self._write(job)
+                remaining = {
+                    company: [
+                        tuple(date_range) for date_range in ranges
+                        if self._range_key(*date_range) not in job['done'].get(company, [])
+                    ]
+                    for company, ranges in job['plan'].items() if company not in job['saved']
+                }
+
+            self.crawler.run(
+                remaining,
+                lambda company, frames: self._save(job_id, company),
+                lambda company, date_from, date_to, frame: self._checkpoint(job_id, company, date_from, date_to, frame)
+            )
+
+            with self._lock:
+                unsaved = sorted(company for company in job['plan'] if company not in job['saved'])
+            if unsaved:
+                self._finish(job, 'interrupted',
+                             f"Date ranges of {len(unsaved)} companies could not be fetched: {', '.join(unsaved)}")
+            else:
+                shutil.rmtree(self._ranges_dir(job_id), ignore_errors=True)
+                self._finish(job, 'completed', None)
+        except Exception as e:
+            self._finish(job, 'failed', str(e))
+
+    def _finish(self, job: dict, status: str, error: Optional[str]):
+        # The final status and the free worker slot are published together, so a job seen as
+        # finished can be resumed or followed by a new one right away
+        with self._lock:
+            try:
+                job['status'] = status
+                job['error'] = error
+                self._write(job)
+            finally:
+                self._active = None
+
+    def _checkpoint(self, job_id: str, company: str, date_from: str, date_to: str, frame: pd.DataFrame):
+        key = self._range_key(date_from, date_to)
+        if not frame.empty:
+            os.makedirs(self._ranges_dir(job_id), exist_ok=True)
+            frame.to_csv(os.path.join(self._ranges_dir(job_id), f'{company}_{key}.csv'), index=False)
+
+        job = self._jobs[job_id]
+        with self._lock:
+            job['done'].setdefault(company, []).append(key)
+            self._record(job, ['done', company, key])
+
+    def _save(self, job_id: str, company: str):
+        # Every fetched range of the company is on disk, including those of earlier runs
+        job = self._jobs[job_id]
+        frames = []
+        for date_range in job['plan'][company]:
+            path = os.path.join(self._ranges_dir(job_id), f'{company}_{self._range_key(*date_range)}.csv')
+            if os.path.exists(path):
+                frames.append(pd.read_csv(path))
+
+        last_date = job['last_dates'][company]
+        result = self.save_company(company, frames, datetime.fromisoformat(last_date) if last_date else None)
+        with self._lock:
+            job['saved'][company] = result
+            self._record(job, ['saved', company, result])
+        return result
+
+    def _summary(self, job: dict) -> dict:
+        plan = job['plan'] or {}
+        return {
+            'id': job['id'],
+            'status': job['status'],
+            'years_back': job['years_back'],
+            'incremental': job['incremental'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at'],
+            'error': job['error'],
+            'progress': {
+                'companies': len(plan),
+                'companies_saved': len(job['saved']),
+                'ranges': sum(len(ranges) for ranges in plan.values()),
+                'ranges_done': sum(len(done) for done in job['done'].values())
+            }
+        }
+
+    @staticmethod
+    def _range_key(date_from: str, date_to: str) -> str:
+        return f"{date_from}-{date_to}".replace('/', '')
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _ranges_dir(self, job_id: str) -> str:
+        return os.path.join(self._job_dir(job_id), 'ranges')
+
+    def _write(self, job: dict):
+        # Callers hold the lock
+        job['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        separate = self.PLAN_FIELDS + self.PROGRESS_FIELDS
+        self._replace(job['id'], 'job.json', {key: value for key, value in job.items() if key not in separate})
+
+    def _write_plan(self, job: dict):
+        # Callers hold the lock
+        self._replace(job['id'], 'plan.json', {key: job[key] for key in self.PLAN_FIELDS})
+
+    def _replace(self, job_id: str, name: str, content: dict):
+        # The file is replaced atomically so a crash never leaves half of it
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        path = os.path.join(self._job_dir(job_id), name)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(content, f)
+        os.replace(f'{path}.tmp', path)
+
+    def _record(self, job: dict, entry: list):
+        # Callers hold the lock; a checkpoint appends one line instead of rewriting the job
+        job['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        os.makedirs(self._job_dir(job['id']), exist_ok=True)
+        with open(os.path.join(self._job_dir(job['id']), 'progress.jsonl'), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    def _load(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            if job_id in self._jobs:
+                return self._jobs[job_id]
+
+        job_dir = self._job_dir(job_id)
+        if not os.path.exists(os.path.join(job_dir, 'job.json')):
+            return None
+        with open(os.path.join(job_dir, 'job.json')) as f:
+            job = json.load(f)
+
+        job.update(dict.fromkeys(self.PLAN_FIELDS), done={}, saved={})
+        if os.path.exists(os.path.join(job_dir, 'plan.json')):
+            with open(os.path.join(job_dir, 'plan.json')) as f:
+                job.update(json.load(f))
+        if os.path.exists(os.path.join(job_dir, 'progress.jsonl')):
+            with open(os.path.join(job_dir, 'progress.jsonl')) as f:
+                for line in f:
+                    try:
+                        kind, company, value = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash; that range is simply fetched again
+                        continue
+                    if kind == 'done':
+                        job['done'].setdefault(company, []).append(value)
+                    else:
+                        job['saved'][company] = value
+        with self._lock:
+            return self._jobs.setdefault(job_id, job)
+
+    def _load_all(self) -> List[dict]:
+        jobs = [self._load(name) for name in os.listdir(self.jobs_dir)]
+        return [job for job in jobs if job is not None]
@@ -1,11 +1,15 @@
+import io
 import os
 import time
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
+from lxml import etree
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from time import sleep
+import price_store
+from async_crawler import AsyncCrawler
+from technical_analysis_refactored import sync_indicators
 
 
 def format_date(date):
@@ -31,32 +35,46 @@ def fetch_companies():
     return valid_company_names
 
 
-companies = fetch_companies()
+COLUMNS = ['Date', 'Last trade price', 'Max', 'Min', 'Avg Price', '%chg.', 'Volume',
+           'TurnoverBEST_MKD', 'TotalTurnoverMKD']
 
 
-def parse_cells(row):
-    cells = row.find_all('td')
+def parse_number(value):
+    # The site writes numbers as 23,299.00; empty or malformed cells are missing values
+    try:
+        return float(value.strip().replace(',', ''))
+    except ValueError:
+        return float('nan')
 
-    def format_price(value):
-        try:
-            return "{:,.2f}".format(float(value.replace(',', '.'))).replace(',', 'X').replace('.', ',').replace('X',
-                                                                                                                '.')
-        except ValueError:
-            return value
-
-    item = {
-        'Date': cells[0].text,
-        'Last trade price': format_price(cells[1].text),
-        'Max': format_price(cells[2].text),
-        'Min': format_price(cells[3].text),
-        'Avg Price': format_price(cells[4].text),
-        '%chg.': cells[5].text.replace('.', ','),
-        'Volume': cells[6].text,
-        'TurnoverBEST_MKD': format_price(cells[7].text),
-        'TotalTurnoverMKD': format_price(cells[8].text)
-    }
-
-    return item
+
+def parse_row(cells):
+    # Date text and numbers of one row's cells, in COLUMNS order
+    return [cells[0].strip()] + [parse_number(cell) for cell in cells[1:9]]
+
+
+def parse_cells(row):
+    return dict(zip(COLUMNS, parse_row([cell.text for cell in row.find_all('td')])))
+
+
+def parse_table(page):
+    # Streams the rows of the first table body into column lists with lxml, freeing each row
+    # once it is read; gives the same rows as BeautifulSoup with parse_cells
+    columns = [[] for _ in COLUMNS]
+    for _, element in etree.iterparse(io.BytesIO(page), events=('end',), tag=('tr', 'tbody'), html=True):
+        if element.tag == 'tbody':
+            break
+        if element.getparent().tag == 'tbody':
+            cells = [
+                (cell.text or '') if len(cell) == 0 else ''.join(cell.itertext())
+                for cell in element.iter('td')
+            ]
+            for column, value in zip(columns, parse_row(cells)):
+                column.append(value)
+        element.clear()
+
+    if not columns[0]:
+        return pd.DataFrame()
+    return pd.DataFrame(dict(zip(COLUMNS, columns)))
 
 
 def scrape_data_from_url(company, date_from, date_to, retries=3):
@@ -65,10 +83,7 @@ def scrape_data_from_url(company, date_from, date_to, retries=3):
         try:
             response = requests.get(url, timeout=(30, 120))
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                rows = soup.find_all('tbody')[0].find_all('tr') if soup.find_all('tbody') else []
-                data = [parse_cells(row) for row in rows]
-                return pd.DataFrame(data)
+                return parse_table(response.content)
             else:
                 print(f"Failed to fetch data for {company}: HTTP {response.status_code}")
                 return pd.DataFrame()
@@ -79,51 +94,101 @@ def scrape_data_from_url(company, date_from, date_to, retries=3):
     return pd.DataFrame()
 
 
-def fetch_data_for_company(company, years_back=10):
+def date_ranges(start, end):
+    ranges = []
+    date_to = end
+    while date_to >= start:
+        date_from = max(date_to - timedelta(days=365), start)
+        ranges.append((format_date(date_from), format_date(date_to)))
+        date_to = date_from - timedelta(days=1)
+    return ranges
+
+
+def last_stored_date(file_path):
+    if not os.path.exists(file_path):
+        return None
+
+    dates = pd.read_csv(file_path, usecols=['Date'])['Date']
+    latest = pd.to_datetime(dates, format='%m/%d/%Y', errors='coerce').max()
+    return None if pd.isna(latest) else latest.to_pydatetime()
+
+
+def merge_rows(new_data, stored=None):
+    if stored is not None:
+        new_data = pd.concat([new_data, stored], ignore_index=True)
+
+    dates = pd.to_datetime(new_data['Date'], format='%m/%d/%Y', errors='coerce')
+    keep = ~dates.duplicated(keep='first')
+    order = dates[keep].sort_values(ascending=False, kind='stable').index
+    return new_data.loc[order].reset_index(drop=True)
+
+
+def plan_company(company, years_back=10, incremental=False):
+    # Date ranges to request for a company, and the newest date it already has stored
     today = datetime.today()
-    end_date = format_date(today)
-    start_date = format_date(today - timedelta(days=365 * years_back))
+    file_path = f'./data/{company}.csv'
 
-    company_data = []
-    for year in range(years_back):
-        date_to = format_date(today - timedelta(days=365 * year))
-        date_from = format_date(today - timedelta(days=365 * (year + 1)))
+    # In incremental mode only the days after the newest stored date are requested
+    last_date = last_stored_date(file_path) if incremental else None
+    if last_date is not None:
+        start = last_date + timedelta(days=1)
+    else:
+        start = today - timedelta(days=365 * years_back)
+    return date_ranges(start, today), last_date
 
-        yearly_data = scrape_data_from_url(company, date_from, date_to)
-        if not yearly_data.empty:
-            company_data.append(yearly_data)
 
+def save_company(company, company_data, last_date=None):
+    file_path = f'./data/{company}.csv'
     if company_data:
-        final_df = pd.concat(company_data, ignore_index=True)
-        final_df.to_csv(f'./data/{company}.csv', index=False)
-        print(f"Data for {company} saved to ./data/{company}.csv")
+        new_data = pd.concat(company_data, ignore_index=True)
+        stored = pd.read_csv(file_path) if last_date is not None else None
+        # Older CSVs hold formatted strings; to_typed_frame reads both, so they are rewritten as numbers
+        typed_df = price_store.to_typed_frame(merge_rows(new_data, stored))
+        price_store.write_csv(typed_df, file_path)
+        price_store.write_frame(company, typed_df)
+        sync_indicators(company, typed_df)
+        print(f"Data for {company} saved to {file_path}")
+    elif last_date is not None:
+        print(f"Data for {company} is already up to date")
     else:
         print(f"No data collected for {company}")
 
 
-def fetch_data_for_all_companies_threaded(years_back=10):
+def fetch_data_for_company(company, years_back=10, incremental=False):
+    ranges, last_date = plan_company(company, years_back, incremental)
+
+    company_data = []
+    for date_from, date_to in ranges:
+        yearly_data = scrape_data_from_url(company, date_from, date_to)
+        if not yearly_data.empty:
+            company_data.append(yearly_data)
+
+    save_company(company, company_data, last_date)
+
+
+def fetch_data_for_all_companies_threaded(years_back=10, incremental=False):
+    # Every (company, date range) request is its own task in one rate-limited asyncio crawl,
+    # instead of one thread per company requesting its years one after another
     start_time = time.time()
 
-    def worker(company):
+    plans = {}
+    for company in fetch_companies():
         try:
-            print(f"Fetching data for {company}")
-            fetch_data_for_company(company, years_back)
+            plans[company] = plan_company(company, years_back, incremental)
         except Exception as e:
-            print(f"Error while fetching data for {company}: {e}")
-        sleep(2)
-
-    max_threads = 10
-    with ThreadPoolExecutor(max_threads) as executor:
-        futures = [executor.submit(worker, company) for company in companies]
-        for future in as_completed(futures):
-            try:
-                future.result()
-            except Exception as e:
-                print(f"Unhandled exception: {e}")
+            print(f"Error while planning data for {company}: {e}")
+
+    crawler = AsyncCrawler(BASE_URL, parse_table)
+    crawler.run(
+        {company: ranges for company, (ranges, _) in plans.items()},
+        lambda company, frames: save_company(company, frames, plans[company][1])
+    )
 
     end_time = time.time()
     elapsed_time = end_time - start_time
     print(f"Total time taken to fetch data: {elapsed_time / 60:.2f} minutes")
+    print(f"Crawler: {crawler.stats()}")
 
 
-fetch_data_for_all_companies_threaded()
\ No newline at end of file
+if __name__ == '__main__':
+    fetch_data_for_all_companies_threaded()
\ No newline at end of file
@@ -8,8 +8,10 @@ def perform_technical_analysis(data, company):
 
     numeric_columns = ['Max', 'Min', 'Last trade price', 'Avg Price']
     for col in numeric_columns:
-        data[col] = data[col].astype(str).str.replace(',', '').str.replace('$', '')
-        data[col] = pd.to_numeric(data[col], errors='coerce')
+        # Only CSVs scraped before the scraper wrote numbers still hold formatted strings
+        if not pd.api.types.is_numeric_dtype(data[col]):
+            data[col] = data[col].astype(str).str.replace(',', '').str.replace('$', '')
+            data[col] = pd.to_numeric(data[col], errors='coerce')
 
     data['High'] = data['Max']
     data['Low'] = data['Min']
@@ -1,6 +1,22 @@
+import operator
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+import price_store
+
+# Rows of earlier prices the rolling indicators depend on (SMA_50 is the longest window)
+INDICATOR_LOOKBACK = 50
+
+
+def weighted_moving_average(series: pd.Series, window: int) -> pd.Series:
+    """Linearly weighted moving average; any NaN inside a window gives NaN, like rolling().apply."""
+    weights = np.arange(1, window + 1, dtype=float)
+    values = series.to_numpy(dtype=float)
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        result[window - 1:] = windows @ weights / weights.sum()
+    return pd.Series(result, index=series.index)
 
 
 def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
@@ -14,21 +30,14 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     data['EMA_20'] = price.ewm(span=20, adjust=False).mean()
     data['SMA_50'] = price.rolling(window=50).mean()
 
-    weights = np.arange(1, 16)
-    data['WMA_15'] = price.rolling(window=15).apply(
-        lambda x: np.sum(weights[:len(x)] * x) / np.sum(weights[:len(x)])
-    )
+    data['WMA_15'] = weighted_moving_average(price, 15)
 
     def hull_moving_average(series, window=9):
         half_length = int(window / 2)
         sqrt_length = int(np.sqrt(window))
 
-        wmaf = series.rolling(window=half_length).apply(
-            lambda x: np.sum(np.arange(1, len(x) + 1) * x) / np.sum(np.arange(1, len(x) + 1))
-        )
-        wmas = series.rolling(window=window).apply(
-            lambda x: np.sum(np.arange(1, len(x) + 1) * x) / np.sum(np.arange(1, len(x) + 1))
-        )
+        wmaf = weighted_moving_average(series, half_length)
+        wmas = weighted_moving_average(series, window)
 
         hull = (2 * wmaf - wmas).rolling(window=sqrt_length).mean()
         return hull
@@ -48,9 +57,9 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     data['Stochastic'] = 100 * ((price - low_14) / (high_14 - low_14))
 
 
-    exp1 = price.ewm(span=12, adjust=False).mean()
-    exp2 = price.ewm(span=26, adjust=False).mean()
-    data['MACD'] = exp1 - exp2
+    data['EMA_12'] = price.ewm(span=12, adjust=False).mean()
+    data['EMA_26'] = price.ewm(span=26, adjust=False).mean()
+    data['MACD'] = data['EMA_12'] - data['EMA_26']
 
 
     high = data['Max'].rolling(window=14).max()
@@ -60,47 +69,121 @@ def calculate_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return data
 
 
+def continue_ema(series: pd.Series, span: int, previous: float, gap: int = 0) -> pd.Series:
+    """EMA of series that carries on from the previous EMA value instead of restarting
+
+    gap is the number of rows with a missing price between the previous EMA and series; they
+    still discount the previous value, as they do when the whole history is recomputed.
+    """
+    seeded = pd.concat([pd.Series([previous] + [np.nan] * gap), series], ignore_index=True)
+    ema = seeded.ewm(span=span, adjust=False).mean().iloc[gap + 1:]
+    ema.index = series.index
+    return ema
+
+
+def update_technical_indicators(df_with_indicators: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+    """Extend stored indicators to the rows of df after their last date, computing only those rows"""
+    start = int(df['Date'].searchsorted(df_with_indicators['Date'].iloc[-1], side='right'))
+    if start == len(df):
+        return df_with_indicators
+
+    context_start = max(0, start - INDICATOR_LOOKBACK)
+    new_rows = calculate_technical_indicators(df.iloc[context_start:]).iloc[start - context_start:]
+
+    # The EMAs continue from the last stored row with a price, across any missing prices after it
+    valid = np.flatnonzero(df_with_indicators['Avg Price'].notna().to_numpy())
+    last = df_with_indicators.iloc[valid[-1] if valid.size else -1]
+    gap = len(df_with_indicators) - 1 - valid[-1] if valid.size else 0
+    price = new_rows['Avg Price']
+    new_rows['EMA_20'] = continue_ema(price, 20, last['EMA_20'], gap)
+    new_rows['EMA_12'] = continue_ema(price, 12, last['EMA_12'], gap)
+    new_rows['EMA_26'] = continue_ema(price, 26, last['EMA_26'], gap)
+    new_rows['MACD'] = new_rows['EMA_12'] - new_rows['EMA_26']
+
+    return pd.concat([df_with_indicators, new_rows[df_with_indicators.columns]], ignore_index=True)
+
+
+def sync_indicators(company: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Bring the persisted indicator columns of a company up to date with its price data"""
+    columns = list(price_store.INDICATOR_COLUMNS)
+    stored = None
+    if price_store.has_ticker(company, price_store.INDICATOR_DIR):
+        stored = price_store.load_frame(company, store_dir=price_store.INDICATOR_DIR,
+                                        schema=price_store.INDICATOR_COLUMNS)
+
+    # Recompute everything when the stored rows no longer line up with the price history
+    if stored is not None and not stored.empty:
+        matched = int(df['Date'].searchsorted(stored['Date'].iloc[-1], side='right'))
+        if matched == len(stored) and df['Date'].iloc[matched - 1] == stored['Date'].iloc[-1]:
+            updated = update_technical_indicators(stored, df)
+            if len(updated) > len(stored):
+                price_store.write_frame(company, updated, price_store.INDICATOR_DIR, price_store.INDICATOR_COLUMNS)
+            return updated
+
+    updated = calculate_technical_indicators(df)[columns]
+    price_store.write_frame(company, updated, price_store.INDICATOR_DIR, price_store.INDICATOR_COLUMNS)
+    return updated
+
+
+def load_stored_indicators(company: str, df: pd.DataFrame, rows: int) -> Optional[pd.DataFrame]:
+    """Read the last stored indicator rows up to df's latest date, or None when they are not stored"""
+    if df.empty or not price_store.has_ticker(company, price_store.INDICATOR_DIR):
+        return None
+    return price_store.load_tail(company, df['Date'].iloc[-1], rows, price_store.INDICATOR_DIR,
+                                 price_store.INDICATOR_COLUMNS)
+
+
+# (buy rule, sell rule) per indicator, shared by the row-wise and vectorized signal functions
+SIGNAL_RULES = {
+    'RSI': ((operator.lt, 30), (operator.gt, 70)),
+    'Stochastic': ((operator.lt, 20), (operator.gt, 80)),
+    'MACD': ((operator.gt, 0), (operator.lt, 0)),
+    'Williams_R': ((operator.lt, -80), (operator.gt, -20)),
+}
+
+
 def generate_signal(row: pd.Series) -> str:
 
     signals = []
 
 
-    if pd.notna(row['RSI']):
-        if row['RSI'] > 70:
-            signals.append('sell')
-        elif row['RSI'] < 30:
-            signals.append('buy')
-        else:
-            signals.append('hold')
+    for column, ((buy_op, buy_at), (sell_op, sell_at)) in SIGNAL_RULES.items():
+        if pd.notna(row[column]):
+            if sell_op(row[column], sell_at):
+                signals.append('sell')
+            elif buy_op(row[column], buy_at):
+                signals.append('buy')
+            else:
+                signals.append('hold')
 
 
-    if pd.notna(row['Stochastic']):
-        if row['Stochastic'] > 80:
-            signals.append('sell')
-        elif row['Stochastic'] < 20:
-            signals.append('buy')
-        else:
-            signals.append('hold')
+    return vote_signals(signals)
 
 
-    if pd.notna(row['MACD']):
-        if row['MACD'] > 0:
-            signals.append('buy')
-        elif row['MACD'] < 0:
-            signals.append('sell')
-        else:
-            signals.append('hold')
+def generate_signals(df: pd.DataFrame) -> pd.Series:
+    """Vectorized generate_signal: the voted signal of every row as a categorical series"""
+    buy_count = np.zeros(len(df), dtype=int)
+    sell_count = np.zeros(len(df), dtype=int)
+    hold_count = np.zeros(len(df), dtype=int)
 
+    # Missing indicator values do not vote, as in generate_signal
+    for column, ((buy_op, buy_at), (sell_op, sell_at)) in SIGNAL_RULES.items():
+        values = df[column].to_numpy(dtype=float)
+        is_sell = sell_op(values, sell_at)
+        is_buy = buy_op(values, buy_at) & ~is_sell
+        sell_count += is_sell
+        buy_count += is_buy
+        hold_count += ~np.isnan(values) & ~is_sell & ~is_buy
 
-    if pd.notna(row['Williams_R']):
-        if row['Williams_R'] > -20:
-            signals.append('sell')
-        elif row['Williams_R'] < -80:
-            signals.append('buy')
-        else:
-            signals.append('hold')
+    signals = np.select(
+        [(buy_count > sell_count) & (buy_count > hold_count), (sell_count > buy_count) & (sell_count > hold_count)],
+        ['buy', 'sell'],
+        'hold'
+    )
+    return pd.Series(pd.Categorical(signals, categories=['buy', 'hold', 'sell']), index=df.index)
 
 
+def vote_signals(signals: List[str]) -> str:
     if signals:
         buy_count = signals.count('buy')
         sell_count = signals.count('sell')
@@ -115,22 +198,25 @@ def generate_signal(row: pd.Series) -> str:
     return 'hold'
 
 
-def analyze_timeframe(df: pd.DataFrame, period_days: int) -> Dict[str, Any]:
+def analyze_timeframe(
+        df: pd.DataFrame,
+        period_days: int,
+        df_with_indicators: Optional[pd.DataFrame] = None
+) -> Dict[str, Any]:
     """Analyze a specific timeframe and return the results"""
     if len(df) < period_days:
         return None
 
+    # Indicators come from the whole series so their windows are filled; the period is only a slice
+    if df_with_indicators is None:
+        df_with_indicators = calculate_technical_indicators(df)
+    df_period = df_with_indicators.tail(period_days)
 
-    df_period = df.tail(period_days)
-
-
-    df_with_indicators = calculate_technical_indicators(df_period)
 
+    latest_data = df_period.iloc[-1]
 
-    latest_data = df_with_indicators.iloc[-1]
 
-
-    latest_date = df_period['Date'].iloc[-1]
+    latest_date = latest_data['Date']
     date_str = latest_date.strftime('%Y-%m-%d') if isinstance(latest_date, pd.Timestamp) else str(latest_date)
 
 
@@ -149,6 +235,26 @@ def analyze_timeframe(df: pd.DataFrame, period_days: int) -> Dict[str, Any]:
     }
 
 
+def analyze_timeframes(
+        df: pd.DataFrame,
+        timeframes: Dict[str, int],
+        warmup: Optional[int] = None,
+        df_with_indicators: Optional[pd.DataFrame] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Compute the indicators once (unless already given) and read every timeframe from that frame"""
+    if df_with_indicators is None:
+        if warmup is not None:
+            df = df.tail(max(timeframes.values()) + warmup)
+        df_with_indicators = calculate_technical_indicators(df)
+
+    results = {}
+    for period_name, days in timeframes.items():
+        analysis = analyze_timeframe(df, days, df_with_indicators)
+        if analysis:
+            results[period_name] = analysis
+    return results
+
+
 def perform_technical_analysis(df: pd.DataFrame, company: str) -> str:
 
     timeframes = {
@@ -157,11 +263,8 @@ def perform_technical_analysis(df: pd.DataFrame, company: str) -> str:
         '1 month': 22
     }
 
-    results = {}
-    for period_name, days in timeframes.items():
-        analysis = analyze_timeframe(df, days)
-        if analysis:
-            results[period_name] = analysis
+    stored = load_stored_indicators(company, df, max(timeframes.values()))
+    results = analyze_timeframes(df, timeframes, df_with_indicators=stored)
 
     html_output = f"<h2>Technical Analysis Results for {company}</h2>"
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The Homework3 modules are flat scripts that import each other from their own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
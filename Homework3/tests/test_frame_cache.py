@@ -0,0 +1,66 @@
+import os
+import pandas as pd
+from frame_cache import FrameCache
+
+
+def counting_loader(calls):
+    def load(path):
+        calls.append(path)
+        return pd.read_csv(path)
+    return load
+
+
+def write_csv(path, rows):
+    pd.DataFrame({'Avg Price': [float(row) for row in range(rows)]}).to_csv(path, index=False)
+
+
+def test_repeated_reads_of_an_unchanged_file_hit_the_cache(tmp_path):
+    path = tmp_path / 'ALK.csv'
+    write_csv(path, 3)
+    cache, calls = FrameCache(), []
+
+    first = cache.get('ALK', str(path), counting_loader(calls))
+    second = cache.get('ALK', str(path), counting_loader(calls))
+
+    assert second is first
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_a_changed_file_is_loaded_again(tmp_path):
+    path = tmp_path / 'ALK.csv'
+    write_csv(path, 3)
+    cache, calls = FrameCache(), []
+    cache.get('ALK', str(path), counting_loader(calls))
+
+    write_csv(path, 4)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert len(cache.get('ALK', str(path), counting_loader(calls))) == 4
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache, calls = FrameCache(max_entries=2), []
+    for ticker in ('A', 'B', 'C'):
+        write_csv(tmp_path / f'{ticker}.csv', 2)
+
+    cache.get('A', str(tmp_path / 'A.csv'), counting_loader(calls))
+    cache.get('B', str(tmp_path / 'B.csv'), counting_loader(calls))
+    cache.get('A', str(tmp_path / 'A.csv'), counting_loader(calls))
+    cache.get('C', str(tmp_path / 'C.csv'), counting_loader(calls))
+
+    assert list(cache.entries) == ['A', 'C']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_frames_larger_than_the_byte_budget_are_not_kept(tmp_path):
+    path = tmp_path / 'ALK.csv'
+    write_csv(path, 100)
+    cache = FrameCache(max_bytes=100)
+
+    cache.get('ALK', str(path), counting_loader([]))
+
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
@@ -0,0 +1,168 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import price_store
+
+LEGACY_CSV = (
+    'Date,Last trade price,Max,Min,Avg Price,%chg.,Volume,TurnoverBEST_MKD,TotalTurnoverMKD\n'
+    '11/8/2024,"23,299.00","23,400.00","23,010.00","23,193.84","0,85",64,"1,484,406","1,484,406"\n'
+    '3/25/2022,"102,00","102,00","97,00","97,31","-0,90","2,430","236,46","236,46"\n'
+    '3/24/2022,"4,00",,,"4,00","0,00",0,"0,00","0,00"\n'
+)
+
+
+def typed_frame(days=5):
+    dates = pd.date_range('2024-01-01', periods=days, freq='D')
+    prices = np.arange(1, days + 1, dtype=float) * 100
+    return pd.DataFrame({
+        'Date': dates, 'Last trade price': prices, 'Max': prices + 1, 'Min': prices - 1, 'Avg Price': prices,
+        '%chg.': np.zeros(days), 'Volume': np.arange(days, dtype='int64'),
+        'TurnoverBEST_MKD': prices * 10, 'TotalTurnoverMKD': prices * 10
+    })
+
+
+@pytest.mark.parametrize('column, text, expected', [
+    ('Avg Price', '23,193.84', 23193.84),
+    ('Avg Price', '577,00', 577.0),
+    ('Avg Price', '5,5', 5.5),
+    ('%chg.', '-0,90', -0.9),
+    ('Volume', '1,061', 1061.0),
+    ('TotalTurnoverMKD', '1,484,406', 1484406.0),
+    ('TotalTurnoverMKD', '715,66', 715660.0),
+    ('TotalTurnoverMKD', '0,00', 0.0),
+])
+def test_old_scraper_text_is_parsed_by_its_format(column, text, expected):
+    assert price_store.parse_number_column(pd.Series([text], dtype=object), column).iloc[0] == pytest.approx(expected)
+
+
+def test_numbers_are_taken_as_they_are_next_to_old_text():
+    values = pd.Series([850.0, '850,00', 5.5, None], dtype=object)
+
+    parsed = price_store.parse_number_column(values, 'TotalTurnoverMKD')
+
+    assert parsed.iloc[:3].tolist() == [850.0, 850000.0, 5.5]
+    assert np.isnan(parsed.iloc[3])
+
+
+def test_parse_csv_reads_the_old_format(tmp_path):
+    path = tmp_path / 'ALK.csv'
+    path.write_text(LEGACY_CSV)
+
+    typed = price_store.parse_csv(str(path))
+
+    assert typed['Date'].dt.strftime('%Y-%m-%d').tolist() == ['2022-03-24', '2022-03-25', '2024-11-08']
+    assert typed['Avg Price'].tolist() == [4.0, 97.31, 23193.84]
+    assert typed['%chg.'].tolist() == [0.0, -0.9, 0.85]
+    assert typed['Volume'].tolist() == [0, 2430, 64]
+    assert typed['TotalTurnoverMKD'].tolist() == [0.0, 236460.0, 1484406.0]
+    assert np.isnan(typed['Max'].iloc[0])
+
+
+def test_write_csv_round_trips_through_parse_csv(tmp_path):
+    path = str(tmp_path / 'ALK.csv')
+    data = typed_frame()
+
+    price_store.write_csv(data, path)
+
+    pd.testing.assert_frame_equal(price_store.parse_csv(path), data)
+
+
+def test_write_frame_round_trips_through_load_frame(tmp_path):
+    data = typed_frame()
+
+    price_store.write_frame('ALK', data, str(tmp_path))
+
+    # Dates are stored as days, so only their unit differs
+    pd.testing.assert_frame_equal(price_store.load_frame('ALK', store_dir=str(tmp_path)), data, check_dtype=False)
+
+
+def test_write_frame_repoints_current_and_keeps_only_the_replaced_version(tmp_path):
+    store_dir = str(tmp_path)
+    for days in (3, 4, 5):
+        price_store.write_frame('ALK', typed_frame(days), store_dir)
+
+    versions = sorted(name for name in os.listdir(tmp_path / 'ALK') if name != price_store.CURRENT_FILE)
+    assert len(versions) == 2
+    assert (tmp_path / 'ALK' / price_store.CURRENT_FILE).read_text() == versions[-1]
+    assert len(price_store.load_frame('ALK', store_dir=store_dir)) == 5
+
+
+def test_stores_without_versions_are_read_and_replaced(tmp_path):
+    flat = tmp_path / 'ALK'
+    flat.mkdir()
+    for column, (file_name, dtype) in price_store.COLUMNS.items():
+        np.save(flat / f'{file_name}.npy', typed_frame(3)[column].to_numpy(dtype=dtype))
+    assert len(price_store.load_frame('ALK', store_dir=str(tmp_path))) == 3
+
+    price_store.write_frame('ALK', typed_frame(4), str(tmp_path))
+    assert len(price_store.load_frame('ALK', store_dir=str(tmp_path))) == 4
+
+    price_store.write_frame('ALK', typed_frame(5), str(tmp_path))
+    assert not any(name.endswith('.npy') for name in os.listdir(flat))
+    assert len(price_store.load_frame('ALK', store_dir=str(tmp_path))) == 5
+
+
+def trading_days():
+    # Weekdays only, so range bounds also fall on days that are not stored
+    data = typed_frame(60)
+    return data[data['Date'].dt.dayofweek < 5].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('date_from, date_to', [
+    ('2024-01-10', '2024-01-20'),
+    ('2024-01-06', '2024-01-07'),
+    (None, '2024-01-15'),
+    ('2024-02-20', None),
+    (None, None),
+    ('2024-01-20', '2024-01-10'),
+    ('2023-01-01', '2023-12-31'),
+])
+def test_load_matches_a_date_mask_over_the_whole_frame(tmp_path, date_from, date_to):
+    data = trading_days()
+    price_store.write_frame('ALK', data, str(tmp_path))
+    mask = pd.Series(True, index=data.index)
+    if date_from:
+        mask &= data['Date'] >= date_from
+    if date_to:
+        mask &= data['Date'] <= date_to
+
+    loaded = price_store.load('ALK', date_from, date_to, ['Date', 'Avg Price'], store_dir=str(tmp_path))
+
+    expected = data.loc[mask, ['Date', 'Avg Price']].reset_index(drop=True)
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+
+
+def test_load_tail_reads_the_rows_ending_at_a_stored_day(tmp_path):
+    data = trading_days()
+    price_store.write_frame('ALK', data, str(tmp_path))
+
+    tail = price_store.load_tail('ALK', data['Date'].iloc[20], 5, store_dir=str(tmp_path))
+
+    assert tail['Avg Price'].tolist() == data['Avg Price'].iloc[16:21].tolist()
+    assert price_store.load_tail('ALK', '2024-01-06', 5, store_dir=str(tmp_path)) is None
+
+
+def test_row_range_pages_add_up_to_the_loaded_range(tmp_path):
+    data = trading_days()
+    price_store.write_frame('ALK', data, str(tmp_path))
+    start, end = price_store.row_range('ALK', '2024-01-08', '2024-02-16', store_dir=str(tmp_path))
+
+    pages = [
+        price_store.load_rows('ALK', first, min(first + 7, end), ['Date', 'Avg Price'], store_dir=str(tmp_path))
+        for first in range(start, end, 7)
+    ]
+
+    assert [len(page) for page in pages] == [7, 7, 7, 7, 2]
+    pd.testing.assert_frame_equal(
+        pd.concat(pages, ignore_index=True),
+        price_store.load('ALK', '2024-01-08', '2024-02-16', ['Date', 'Avg Price'], store_dir=str(tmp_path))
+    )
+
+
+def test_row_range_of_an_inverted_range_is_empty(tmp_path):
+    price_store.write_frame('ALK', trading_days(), str(tmp_path))
+
+    start, end = price_store.row_range('ALK', '2024-02-01', '2024-01-01', store_dir=str(tmp_path))
+
+    assert start == end
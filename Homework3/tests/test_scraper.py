@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from bs4 import BeautifulSoup
+import scraper
+
+HEADER = 'Date,Last trade price,Max,Min,Avg Price,%chg.,Volume,TurnoverBEST_MKD,TotalTurnoverMKD\n'
+
+
+def scraped_rows(prices):
+    # Rows as parse_table returns them: date text and numbers
+    return pd.DataFrame([
+        {'Date': date, 'Last trade price': price, 'Max': price, 'Min': price, 'Avg Price': price,
+         '%chg.': 0.0, 'Volume': 1.0, 'TurnoverBEST_MKD': price, 'TotalTurnoverMKD': price}
+        for date, price in prices.items()
+    ])
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    return tmp_path / 'data'
+
+
+def test_plan_company_requests_only_days_after_the_stored_ones(data_dir):
+    last_date = datetime.today() - timedelta(days=3)
+    (data_dir / 'ALK.csv').write_text(
+        HEADER + f'{last_date:%m/%d/%Y},"577,00","577,00","577,00","577,00","0,00",1,"0,58","0,58"\n'
+    )
+
+    ranges, stored = scraper.plan_company('ALK', years_back=10, incremental=True)
+
+    assert stored.date() == last_date.date()
+    assert ranges == [(scraper.format_date(last_date + timedelta(days=1)), scraper.format_date(datetime.today()))]
+
+
+def test_plan_company_requests_full_history_without_incremental(data_dir):
+    (data_dir / 'ALK.csv').write_text(HEADER + '11/8/2024,1,1,1,1,0,1,1,1\n')
+
+    ranges, stored = scraper.plan_company('ALK', years_back=3, incremental=False)
+
+    assert stored is None
+    assert len(ranges) == 3
+
+
+def test_plan_company_without_a_csv_falls_back_to_full_history(data_dir):
+    ranges, stored = scraper.plan_company('ALK', years_back=2, incremental=True)
+
+    assert stored is None
+    assert len(ranges) == 2
+
+
+def test_save_company_merges_new_days_into_the_stored_csv(data_dir):
+    (data_dir / 'ALK.csv').write_text(
+        HEADER
+        + '11/7/2024,"23,000.00","23,000.00","22,990.00","22,997.62","2,28",130,"2,989,691","2,989,691"\n'
+        + '11/6/2024,"577,00","577,00","577,00","577,00","0,00",1,"0,58","0,58"\n'
+    )
+    last_date = scraper.last_stored_date(str(data_dir / 'ALK.csv'))
+
+    # The newly scraped 11/7 row replaces the stored one
+    scraper.save_company('ALK', [scraped_rows({'11/08/2024': 23193.84, '11/07/2024': 23000.0})], last_date)
+
+    saved = pd.read_csv(data_dir / 'ALK.csv')
+    assert saved['Date'].tolist() == ['11/08/2024', '11/07/2024', '11/06/2024']
+    assert saved['Avg Price'].tolist() == [23193.84, 23000.0, 577.0]
+    assert saved['TotalTurnoverMKD'].tolist() == [23193.84, 23000.0, 580.0]
+
+
+PAGE = b"""<!DOCTYPE html><html><head><title>Symbol history</title></head><body>
+<table id="resultsTable"><thead><tr><th>Date</th><th>Last trade price</th></tr></thead>
+<tbody>
+<tr><td>11/8/2024</td><td>23,299.00</td><td>23,400.00</td><td>23,010.00</td><td>23,193.84</td><td>0.85</td><td>64</td><td>1,484,406</td><td>1,484,406</td></tr>
+<tr><td> 11/7/2024 </td><td><span>23,000.00</span></td><td></td><td></td><td>22,997.62</td><td>-2.28</td><td>1,061</td><td>0</td><td>2,989,691</td></tr>
+<tr><td>11/6/2024</td><td>577.00</td><td>577.00</td><td>577.00</td><td>577.00</td><td>0.00</td><td>1</td><td>577</td><td>&nbsp;</td></tr>
+</tbody></table>
+<table><tbody><tr><td>1/1/2000</td><td>1</td><td>1</td><td>1</td><td>1</td><td>0</td><td>1</td><td>1</td><td>1</td></tr></tbody></table>
+</body></html>"""
+
+
+def bs4_rows(page):
+    # The parse path parse_table replaced: a BeautifulSoup tree and parse_cells per row
+    soup = BeautifulSoup(page.decode('utf-8'), 'html.parser')
+    return pd.DataFrame([scraper.parse_cells(row) for row in soup.find_all('tbody')[0].find_all('tr')])
+
+
+def test_parse_table_matches_the_beautifulsoup_rows():
+    rows = scraper.parse_table(PAGE)
+
+    pd.testing.assert_frame_equal(rows, bs4_rows(PAGE))
+    assert rows['Date'].tolist() == ['11/8/2024', '11/7/2024', '11/6/2024']
+    assert rows['Last trade price'].tolist() == [23299.0, 23000.0, 577.0]
+
+
+def test_parse_table_of_a_page_without_rows_is_empty():
+    assert scraper.parse_table(b'<html><body><p>No data</p></body></html>').empty
+    assert scraper.parse_table(b'<html><body><table><tbody></tbody></table></body></html>').empty
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('23,299.00', 23299.0), ('1,484,406', 1484406.0), ('-2.28', -2.28), (' 64 ', 64.0)
+])
+def test_parse_number_reads_the_site_format(text, expected):
+    assert scraper.parse_number(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', ' ', '\xa0', 'n/a'])
+def test_parse_number_reads_empty_or_malformed_cells_as_nan(text):
+    assert np.isnan(scraper.parse_number(text))
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+import technical_analysis_refactored as ta
+
+
+def prices(days=120, seed=0):
+    rng = np.random.default_rng(seed)
+    avg = 100 + rng.normal(0, 1, days).cumsum()
+    return pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=days, freq='D'),
+        'Avg Price': avg,
+        'Max': avg + rng.uniform(0, 1, days),
+        'Min': avg - rng.uniform(0, 1, days),
+    })
+
+
+def rolling_wma(series, window):
+    # The rolling().apply implementation the kernel replaced
+    weights = np.arange(1, window + 1)
+    return series.rolling(window).apply(lambda values: np.dot(values, weights) / weights.sum(), raw=True)
+
+
+@pytest.mark.parametrize('window', [1, 4, 9, 15])
+def test_weighted_moving_average_matches_rolling_apply(window):
+    series = prices()['Avg Price']
+    series.iloc[30] = np.nan
+
+    pd.testing.assert_series_equal(ta.weighted_moving_average(series, window), rolling_wma(series, window), check_names=False)
+
+
+def test_weighted_moving_average_of_a_short_series_is_all_nan():
+    assert ta.weighted_moving_average(pd.Series([1.0, 2.0]), 3).isna().all()
+
+
+def test_indicator_frame_moving_averages_match_rolling_apply():
+    data = ta.calculate_technical_indicators(prices())
+    price = data['Avg Price']
+
+    pd.testing.assert_series_equal(data['WMA_15'], rolling_wma(price, 15), check_names=False)
+    expected_hma = (2 * rolling_wma(price, 4) - rolling_wma(price, 9)).rolling(window=3).mean()
+    pd.testing.assert_series_equal(data['HMA_9'], expected_hma, check_names=False)
+
+
+def test_timeframes_read_the_latest_row_of_the_full_series_indicators():
+    df = prices()
+    full = ta.calculate_technical_indicators(df)
+    latest = full.iloc[-1]
+
+    results = ta.analyze_timeframes(df, {'1 day': 1, '1 month': 22})
+
+    for analysis in results.values():
+        assert analysis['Date'] == latest['Date'].strftime('%Y-%m-%d')
+        assert analysis['RSI'] == round(latest['RSI'], 2)
+        assert analysis['SMA_10'] == round(latest['SMA_10'], 2)
+        assert analysis['Signal'] == ta.generate_signal(latest)
+
+
+def test_timeframes_longer_than_the_history_are_left_out():
+    assert list(ta.analyze_timeframes(prices(10), {'1 week': 5, '1 month': 22})) == ['1 week']
+
+
+@pytest.mark.parametrize('stored_rows', [1, 60, 119])
+def test_incremental_update_matches_a_full_recompute(stored_rows):
+    df = prices()
+    full = ta.calculate_technical_indicators(df)
+
+    updated = ta.update_technical_indicators(ta.calculate_technical_indicators(df.iloc[:stored_rows]), df)
+
+    pd.testing.assert_frame_equal(updated, full)
+
+
+@pytest.mark.parametrize('stored_rows, missing', [
+    (60, slice(55, 60)),   # stored rows end in missing prices
+    (60, slice(60, 63)),   # new rows start with missing prices
+    (60, slice(57, 64)),   # the gap spans the cut
+    (5, slice(0, 5)),      # no stored price at all
+])
+def test_incremental_update_matches_a_full_recompute_across_missing_prices(stored_rows, missing):
+    df = prices()
+    df.loc[df.index[missing], 'Avg Price'] = np.nan
+    full = ta.calculate_technical_indicators(df)
+
+    updated = ta.update_technical_indicators(ta.calculate_technical_indicators(df.iloc[:stored_rows]), df)
+
+    pd.testing.assert_frame_equal(updated, full)
+
+
+def test_sync_indicators_extends_the_stored_columns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = prices()
+    ta.sync_indicators('ALK', df.iloc[:100])
+
+    synced = ta.sync_indicators('ALK', df)
+    stored = ta.price_store.load_frame('ALK', store_dir=ta.price_store.INDICATOR_DIR,
+                                       schema=ta.price_store.INDICATOR_COLUMNS)
+
+    expected = ta.calculate_technical_indicators(df)[list(ta.price_store.INDICATOR_COLUMNS)]
+    pd.testing.assert_frame_equal(synced, expected, check_dtype=False)
+    pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_vectorized_signals_match_the_row_loop(seed):
+    data = ta.calculate_technical_indicators(prices(days=200, seed=seed))
+
+    signals = ta.generate_signals(data)
+
+    # The leading rows have missing indicators, which must not vote
+    assert signals.tolist() == [ta.generate_signal(row) for _, row in data.iterrows()]
+    assert list(signals.cat.categories) == ['buy', 'hold', 'sell']
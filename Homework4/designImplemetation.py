@@ -1,7 +1,25 @@
 from abc import ABC, abstractmethod
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+
+# Signal codes of the vectorized signal functions; SIGNAL_LABELS[1 - code] is the label
+BUY, HOLD, SELL = 1, 0, -1
+SIGNAL_LABELS = ['buy', 'hold', 'sell']
+
+
+def vote_signal_codes(codes: List[np.ndarray]) -> np.ndarray:
+    """Majority vote over per-indicator signal codes, element-wise."""
+    stacked = np.stack(codes)
+    buy_count = (stacked == BUY).sum(axis=0)
+    sell_count = (stacked == SELL).sum(axis=0)
+    hold_count = (stacked == HOLD).sum(axis=0)
+    return np.select(
+        [(buy_count > sell_count) & (buy_count > hold_count), (sell_count > buy_count) & (sell_count > hold_count)],
+        [BUY, SELL],
+        HOLD
+    )
 
 
 class TechnicalIndicator(ABC):
@@ -13,8 +31,20 @@ class TechnicalIndicator(ABC):
     def generate_signal(self, value: float) -> str:
         pass
 
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized generate_signal returning a BUY/HOLD/SELL code per value.
+
+        The default asks generate_signal value by value, anything but 'buy' or 'sell' is HOLD;
+        subclasses override it with array operations.
+        """
+        codes = {'buy': BUY, 'sell': SELL}
+        return np.array([codes.get(self.generate_signal(value), HOLD) for value in values], dtype=int)
+
 
 class RSIIndicator(TechnicalIndicator):
+    SELL_ABOVE = 70
+    BUY_BELOW = 30
+
     def calculate(self, data: pd.DataFrame) -> pd.Series:
         price = data['Avg Price']
         delta = price.diff()
@@ -26,14 +56,20 @@ class RSIIndicator(TechnicalIndicator):
     def generate_signal(self, value: float) -> str:
         if pd.isna(value):
             return 'hold'
-        if value > 70:
+        if value > self.SELL_ABOVE:
             return 'sell'
-        if value < 30:
+        if value < self.BUY_BELOW:
             return 'buy'
         return 'hold'
 
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.SELL_ABOVE, values < self.BUY_BELOW], [SELL, BUY], HOLD)
+
 
 class StochasticIndicator(TechnicalIndicator):
+    SELL_ABOVE = 80
+    BUY_BELOW = 20
+
     def calculate(self, data: pd.DataFrame) -> pd.Series:
         price = data['Avg Price']
         low_14 = data['Min'].rolling(window=14).min()
@@ -43,15 +79,25 @@ class StochasticIndicator(TechnicalIndicator):
     def generate_signal(self, value: float) -> str:
         if pd.isna(value):
             return 'hold'
-        if value > 80:
+        if value > self.SELL_ABOVE:
             return 'sell'
-        if value < 20:
+        if value < self.BUY_BELOW:
             return 'buy'
         return 'hold'
 
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.SELL_ABOVE, values < self.BUY_BELOW], [SELL, BUY], HOLD)
+
 
 class MACDIndicator(TechnicalIndicator):
+    BUY_ABOVE = 0
+    SELL_BELOW = 0
+
     def calculate(self, data: pd.DataFrame) -> pd.Series:
+        # The analyzer stores EMA_12 and EMA_26, reuse them instead of running both EMAs again
+        if 'EMA_12' in data and 'EMA_26' in data:
+            return data['EMA_12'] - data['EMA_26']
+
         price = data['Avg Price']
         exp1 = price.ewm(span=12, adjust=False).mean()
         exp2 = price.ewm(span=26, adjust=False).mean()
@@ -60,14 +106,20 @@ class MACDIndicator(TechnicalIndicator):
     def generate_signal(self, value: float) -> str:
         if pd.isna(value):
             return 'hold'
-        if value > 0:
+        if value > self.BUY_ABOVE:
             return 'buy'
-        if value < 0:
+        if value < self.SELL_BELOW:
             return 'sell'
         return 'hold'
 
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.BUY_ABOVE, values < self.SELL_BELOW], [BUY, SELL], HOLD)
+
 
 class WilliamsRIndicator(TechnicalIndicator):
+    SELL_ABOVE = -20
+    BUY_BELOW = -80
+
     def calculate(self, data: pd.DataFrame) -> pd.Series:
         price = data['Avg Price']
         high = data['Max'].rolling(window=14).max()
@@ -77,12 +129,26 @@ class WilliamsRIndicator(TechnicalIndicator):
     def generate_signal(self, value: float) -> str:
         if pd.isna(value):
             return 'hold'
-        if value > -20:
+        if value > self.SELL_ABOVE:
             return 'sell'
-        if value < -80:
+        if value < self.BUY_BELOW:
             return 'buy'
         return 'hold'
 
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.SELL_ABOVE, values < self.BUY_BELOW], [SELL, BUY], HOLD)
+
+
+def weighted_moving_average(series: pd.Series, window: int) -> pd.Series:
+    """Linearly weighted moving average; any NaN inside a window gives NaN, like rolling().apply."""
+    weights = np.arange(1, window + 1, dtype=float)
+    values = series.to_numpy(dtype=float)
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        result[window - 1:] = windows @ weights / weights.sum()
+    return pd.Series(result, index=series.index)
+
 
 class MovingAverageFactory:
     @staticmethod
@@ -90,35 +156,36 @@ class MovingAverageFactory:
         return price.rolling(window=window).mean()
 
     @staticmethod
-    def create_ema(price: pd.Series, span: int = 20) -> pd.Series:
-        return price.ewm(span=span, adjust=False).mean()
+    def create_ema(price: pd.Series, span: int = 20, previous: Optional[float] = None, gap: int = 0) -> pd.Series:
+        if previous is None:
+            return price.ewm(span=span, adjust=False).mean()
+
+        # Carry on from the last stored EMA value instead of restarting the recursion; the gap
+        # rows of missing prices after it still discount that value like in a full recompute
+        seeded = pd.concat([pd.Series([previous] + [np.nan] * gap), price], ignore_index=True)
+        ema = seeded.ewm(span=span, adjust=False).mean().iloc[gap + 1:]
+        ema.index = price.index
+        return ema
 
     @staticmethod
     def create_wma(price: pd.Series, window: int = 15) -> pd.Series:
-        weights = np.arange(1, window + 1)
-        return price.rolling(window=window).apply(
-            lambda x: np.sum(weights[:len(x)] * x) / np.sum(weights[:len(x)])
-        )
+        return weighted_moving_average(price, window)
 
     @staticmethod
     def create_hma(price: pd.Series, window: int = 9) -> pd.Series:
         half_length = int(window / 2)
         sqrt_length = int(np.sqrt(window))
 
-        weights = np.arange(1, half_length + 1)
-        wmaf = price.rolling(window=half_length).apply(
-            lambda x: np.sum(weights[:len(x)] * x) / np.sum(weights[:len(x)])
-        )
-
-        weights = np.arange(1, window + 1)
-        wmas = price.rolling(window=window).apply(
-            lambda x: np.sum(weights[:len(x)] * x) / np.sum(weights[:len(x)])
-        )
+        wmaf = weighted_moving_average(price, half_length)
+        wmas = weighted_moving_average(price, window)
 
         return (2 * wmaf - wmas).rolling(window=sqrt_length).mean()
 
 
 class TechnicalAnalyzer:
+    # Rows of earlier prices the rolling indicators depend on (WMA is the longest window)
+    ROLLING_LOOKBACK = 15
+
     def __init__(self):
         self.indicators = {
             'RSI': RSIIndicator(),
@@ -138,18 +205,60 @@ class TechnicalAnalyzer:
         data['WMA'] = self.ma_factory.create_wma(price)
         data['HMA'] = self.ma_factory.create_hma(price)
 
+        # EMA state behind MACD, kept so stored indicators can be extended incrementally
+        data['EMA_12'] = self.ma_factory.create_ema(price, 12)
+        data['EMA_26'] = self.ma_factory.create_ema(price, 26)
+
         # Calculate technical indicators using strategy pattern
         for name, indicator in self.indicators.items():
             data[name] = indicator.calculate(data)
 
         return data
 
+    def update_technical_indicators(self, df_with_indicators: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+        """Extend previously computed indicators to the rows of ``df`` after their last date.
+
+        Only the new rows are computed: rolling indicators use the stored tail they depend on
+        and the EMAs continue from their last stored values.
+        """
+        start = int(df['Date'].searchsorted(df_with_indicators['Date'].iloc[-1], side='right'))
+        if start == len(df):
+            return df_with_indicators
+
+        context_start = max(0, start - self.ROLLING_LOOKBACK)
+        new_rows = self.calculate_technical_indicators(df.iloc[context_start:]).iloc[start - context_start:]
+
+        # The EMAs continue from the last stored row with a price, across any missing prices after it
+        valid = np.flatnonzero(df_with_indicators['Avg Price'].notna().to_numpy())
+        last = df_with_indicators.iloc[valid[-1] if valid.size else -1]
+        gap = len(df_with_indicators) - 1 - valid[-1] if valid.size else 0
+        price = new_rows['Avg Price']
+        new_rows['EMA'] = self.ma_factory.create_ema(price, previous=last['EMA'], gap=gap)
+        new_rows['EMA_12'] = self.ma_factory.create_ema(price, 12, previous=last['EMA_12'], gap=gap)
+        new_rows['EMA_26'] = self.ma_factory.create_ema(price, 26, previous=last['EMA_26'], gap=gap)
+        new_rows['MACD'] = self.indicators['MACD'].calculate(new_rows)
+
+        return pd.concat([df_with_indicators, new_rows[df_with_indicators.columns]], ignore_index=True)
+
     def generate_signal(self, row: pd.Series) -> str:
         signals = []
         for name, indicator in self.indicators.items():
             if name in row:
                 signals.append(indicator.generate_signal(row[name]))
 
+        return self._vote(signals)
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series:
+        """Vectorized generate_signal: the voted signal of every row as a categorical series."""
+        codes = [
+            indicator.generate_signals(df[name].to_numpy(dtype=float))
+            for name, indicator in self.indicators.items()
+            if name in df.columns
+        ]
+        voted = vote_signal_codes(codes) if codes else np.full(len(df), HOLD)
+        return pd.Series(pd.Categorical.from_codes(1 - voted, SIGNAL_LABELS), index=df.index)
+
+    def _vote(self, signals: List[str]) -> str:
         if signals:
             buy_count = signals.count('buy')
             sell_count = signals.count('sell')
@@ -161,14 +270,21 @@ class TechnicalAnalyzer:
                 return 'sell'
         return 'hold'
 
-    def analyze_timeframe(self, df: pd.DataFrame, period_days: int) -> Dict[str, Any]:
+    def analyze_timeframe(
+            self,
+            df: pd.DataFrame,
+            period_days: int,
+            df_with_indicators: Optional[pd.DataFrame] = None
+    ) -> Dict[str, Any]:
         if len(df) < period_days:
             return None
 
-        df_period = df.tail(period_days)
-        df_with_indicators = self.calculate_technical_indicators(df_period)
-        latest_data = df_with_indicators.iloc[-1]
-        latest_date = df_period['Date'].iloc[-1]
+        # Indicators come from the whole series so their windows are filled; the period is only a slice
+        if df_with_indicators is None:
+            df_with_indicators = self.calculate_technical_indicators(df)
+        df_period = df_with_indicators.tail(period_days)
+        latest_data = df_period.iloc[-1]
+        latest_date = latest_data['Date']
         date_str = latest_date.strftime('%Y-%m-%d') if isinstance(latest_date, pd.Timestamp) else str(latest_date)
 
         return {
@@ -185,6 +301,27 @@ class TechnicalAnalyzer:
             'Signal': self.generate_signal(latest_data)
         }
 
+    def analyze_timeframes(
+            self,
+            df: pd.DataFrame,
+            timeframes: Dict[str, int],
+            warmup: Optional[int] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Compute the indicators once and read every timeframe from that frame.
+
+        With ``warmup`` set, only the longest timeframe plus ``warmup`` earlier rows are used.
+        """
+        if warmup is not None:
+            df = df.tail(max(timeframes.values()) + warmup)
+        df_with_indicators = self.calculate_technical_indicators(df)
+
+        results = {}
+        for period_name, days in timeframes.items():
+            analysis = self.analyze_timeframe(df, days, df_with_indicators)
+            if analysis:
+                results[period_name] = analysis
+        return results
+
 
 def perform_technical_analysis(df: pd.DataFrame, company: str) -> str:
     analyzer = TechnicalAnalyzer()
@@ -194,12 +331,7 @@ def perform_technical_analysis(df: pd.DataFrame, company: str) -> str:
         '1 month': 22
     }
 
-    results = {}
-    for period_name, days in timeframes.items():
-        analysis = analyzer.analyze_timeframe(df, days)
-        if analysis:
-            results[period_name] = analysis
-
+    results = analyzer.analyze_timeframes(df, timeframes)
     return generate_html_output(results, company)
 
 
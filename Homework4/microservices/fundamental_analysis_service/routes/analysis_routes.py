@@ -1,9 +1,24 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from ..services.fundamental_analyzer import FundamentalAnalyzer
+from ..services.price_store import PriceStore
+from ..utils.wire_format import read_payload, respond
 import pandas as pd
 
 analysis_bp = Blueprint('analysis', __name__)
 analyzer = FundamentalAnalyzer()
+store = PriceStore()
+STORE_COLUMNS = ['Date', 'Last trade price', 'Volume']
+
+
+def _request_frame(data: dict) -> pd.DataFrame:
+    """Rows to analyze: the posted historical_data, or the stored rows of {ticker, date_from, date_to}."""
+    if data.get('historical_data'):
+        return pd.DataFrame(data['historical_data'])
+
+    ticker = data.get('ticker') or data.get('company')
+    frame = store.load_range(ticker, data.get('date_from'), data.get('date_to'), STORE_COLUMNS)
+    # Days without trades have no prices in the store
+    return frame.dropna().reset_index(drop=True)
 
 
 @analysis_bp.route('/health', methods=['GET'])
@@ -14,12 +29,16 @@ def health_check():
 @analysis_bp.route('/api/fundamental/analyze', methods=['POST'])
 def analyze():
     try:
-        data = request.get_json()
-        if not data or 'historical_data' not in data:
-            return jsonify({"error": "No historical data provided"}), 400
+        data = read_payload()
+        if not data or not (data.get('historical_data') or data.get('ticker') or data.get('company')):
+            return jsonify({"error": "No historical data or ticker provided"}), 400
 
-        df = pd.DataFrame(data['historical_data'])
+        df = _request_frame(data)
+        if df.empty:
+            return jsonify({"error": "No stock data available for the selected date range"}), 400
         results = analyzer.analyze(df)
-        return jsonify(results), 200
+        return respond(results)
+    except FileNotFoundError:
+        return jsonify({"error": "Unknown ticker"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
+from typing import Dict, Sequence
 
 
 class FundamentalAnalyzer:
-    def analyze(self, data: pd.DataFrame) -> dict:
+    def analyze(self, data: pd.DataFrame, windows: Sequence[int] = (5, 22)) -> dict:
         try:
             # Calculate basic metrics
             avg_price = data['Last trade price'].mean()
@@ -12,29 +14,47 @@ class FundamentalAnalyzer:
             # Analyze price movements
             movement_counter = self._analyze_stock_movement(data)
             recommendation = self._generate_recommendation(movement_counter)
+            window_movements = self._analyze_window_movements(data, windows)
 
             return {
                 'average_price': round(avg_price, 2),
                 'price_volatility': round(price_std, 2),
-                'total_volume': total_volume,
+                'total_volume': total_volume.item() if hasattr(total_volume, 'item') else total_volume,
                 'price_movement_indicator': movement_counter,
-                'recommendation': recommendation
+                'recommendation': recommendation,
+                'window_movement_indicators': window_movements,
+                'window_recommendations': {
+                    days: self._generate_recommendation(counter) for days, counter in window_movements.items()
+                }
             }
 
         except Exception as e:
             raise ValueError(f"Error performing fundamental analysis: {str(e)}")
 
+    def _movement_steps(self, data: pd.DataFrame) -> np.ndarray:
+        """+1 for every day the price rose and -1 for every day it fell, in chronological order.
+
+        Days where either price is missing count as 0.
+        """
+        prices = data['Last trade price']
+        if 'Date' in data.columns:
+            dates = pd.to_datetime(data['Date'], errors='coerce')
+            prices = prices.iloc[np.argsort(dates.to_numpy(), kind='stable')]
+
+        steps = np.sign(np.diff(prices.to_numpy(dtype=float)))
+        return np.nan_to_num(steps)
+
     def _analyze_stock_movement(self, data: pd.DataFrame) -> int:
-        movement_counter = 0
-        prices = data['Last trade price'].values
+        return int(self._movement_steps(data).sum())
 
-        for i in range(1, len(prices)):
-            if prices[i] < prices[i - 1]:
-                movement_counter += 1
-            elif prices[i] > prices[i - 1]:
-                movement_counter -= 1
+    def rolling_stock_movement(self, data: pd.DataFrame, window: int) -> pd.Series:
+        """Movement indicator over each trailing span of ``window`` daily moves."""
+        steps = pd.Series(self._movement_steps(data))
+        return steps.rolling(window=window).sum()
 
-        return movement_counter
+    def _analyze_window_movements(self, data: pd.DataFrame, windows: Sequence[int]) -> Dict[str, int]:
+        steps = self._movement_steps(data)
+        return {f'{days}d': int(steps[-days:].sum()) for days in windows}
 
     def _generate_recommendation(self, movement_counter: int) -> str:
         if movement_counter > 0:
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fundamental_analysis_service.services.fundamental_analyzer import FundamentalAnalyzer
+
+
+def newest_first(days=60, seed=0):
+    # Rows in the order of the scraped CSVs, with rounded prices so some days do not move
+    rng = np.random.default_rng(seed)
+    prices = np.round(100 + rng.normal(0, 1, days).cumsum())
+    prices[[10, 25]] = np.nan
+    return pd.DataFrame({
+        'Date': pd.date_range(end='2024-11-08', periods=days, freq='D')[::-1].strftime('%m/%d/%Y'),
+        'Last trade price': prices[::-1],
+        'Volume': np.ones(days, dtype='int64'),
+    })
+
+
+def loop_movement(data):
+    # The loop the vectorized counter replaced, written for newest-first rows
+    movement_counter = 0
+    prices = data['Last trade price'].values
+    for i in range(1, len(prices)):
+        if prices[i] < prices[i - 1]:
+            movement_counter += 1
+        elif prices[i] > prices[i - 1]:
+            movement_counter -= 1
+    return movement_counter
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_movement_counter_matches_the_old_loop_in_either_order(seed):
+    analyzer = FundamentalAnalyzer()
+    data = newest_first(seed=seed)
+
+    assert analyzer._analyze_stock_movement(data) == loop_movement(data)
+    assert analyzer._analyze_stock_movement(data.iloc[::-1]) == loop_movement(data)
+
+
+def test_window_movements_count_the_latest_daily_moves():
+    analyzer = FundamentalAnalyzer()
+    data = newest_first()
+
+    results = analyzer.analyze(data, windows=(5, 22))
+
+    for days in (5, 22):
+        # days moves need days + 1 prices
+        latest = data.iloc[:days + 1]
+        assert results['window_movement_indicators'][f'{days}d'] == loop_movement(latest)
+    assert results['window_recommendations'] == {
+        days: analyzer._generate_recommendation(counter)
+        for days, counter in results['window_movement_indicators'].items()
+    }
+
+
+def test_rolling_movement_ends_with_the_window_counter():
+    analyzer = FundamentalAnalyzer()
+    data = newest_first()
+
+    rolling = analyzer.rolling_stock_movement(data, window=5)
+
+    assert rolling.iloc[:4].isna().all()
+    assert rolling.iloc[-1] == loop_movement(data.iloc[:6])
+    assert rolling.iloc[4] == loop_movement(data.iloc[-6:])
@@ -0,0 +1,66 @@
+import importlib
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from fundamental_analysis_service.services.price_store import PriceStore
+from fundamental_analysis_service.utils.wire_format import NPZ_MIMETYPE, encode_payload
+
+
+def typed_frame(days=30):
+    price = 100 + np.arange(days, dtype=float)
+    frame = pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=days, freq='D'), 'Last trade price': price,
+        'Max': price, 'Min': price, 'Avg Price': price, '%chg.': np.zeros(days),
+        'Volume': np.ones(days, dtype='int64'), 'TurnoverBEST_MKD': price, 'TotalTurnoverMKD': price
+    })
+    frame.loc[5, ['Last trade price', 'Max', 'Min', 'Avg Price']] = np.nan
+    return frame
+
+
+@pytest.fixture
+def analyze(tmp_path, monkeypatch):
+    # Importing the routes creates their default store under ./data
+    monkeypatch.chdir(tmp_path)
+    routes = importlib.import_module('fundamental_analysis_service.routes.analysis_routes')
+    store = PriceStore(str(tmp_path / 'shared'))
+    store.write_frame('ALK', typed_frame())
+    monkeypatch.setattr(routes, 'store', store)
+
+    app = Flask(__name__)
+    app.register_blueprint(routes.analysis_bp)
+    client = app.test_client()
+
+    def post(npz=False, **body):
+        if npz:
+            return client.post('/api/fundamental/analyze', data=encode_payload(body), content_type=NPZ_MIMETYPE)
+        return client.post('/api/fundamental/analyze', json=body)
+    return post
+
+
+def test_a_ticker_range_is_analyzed_without_days_lacking_a_price(analyze):
+    response = analyze(ticker='ALK', date_from='2024-01-03', date_to='2024-01-10')
+
+    assert response.status_code == 200
+    results = response.get_json()
+    # 102..109 without the missing 105, every day rises
+    assert results['average_price'] == pytest.approx(np.mean([102, 103, 104, 106, 107, 108, 109]), abs=0.01)
+    assert results['price_movement_indicator'] == 6
+    assert results['total_volume'] == 7
+
+
+@pytest.mark.parametrize('npz', [False, True])
+def test_the_dashboard_body_with_empty_historical_data_loads_the_ticker(analyze, npz):
+    response = analyze(npz=npz, ticker='ALK', date_from='2024-01-03', date_to='2024-01-10', historical_data=[])
+
+    assert response.status_code == 200
+    assert response.get_json()['total_volume'] == 7
+
+
+@pytest.mark.parametrize('ticker', ['XYZ', '../ALK', 'alk', ['ALK']])
+def test_unknown_or_invalid_tickers_are_not_found(analyze, ticker):
+    assert analyze(ticker=ticker).status_code == 404
+
+
+def test_a_request_without_data_or_ticker_is_a_bad_request(analyze):
+    assert analyze(date_from='2024-01-01').status_code == 400
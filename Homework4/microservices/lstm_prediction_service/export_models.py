@@ -0,0 +1,25 @@
+import argparse
+from services.model_registry import ModelRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export registry models to model.npz for the NumPy inference path.')
+    parser.add_argument('--model-dir', default='./models')
+    parser.add_argument('--force', action='store_true', help='Re-export entries that already have an export')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.model_dir, backend='keras')
+    for key in registry.keys():
+        meta = registry.load_meta(key)
+        if not args.force and meta.get('export', {}).get('format') == 'npz':
+            continue
+
+        export = registry.export(key)
+        if export['format'] == 'npz':
+            print(f"Exported {key}: max error {export['max_error']:.2e}")
+        else:
+            print(f"Kept {key} on Keras: {export['reason']}")
+
+
+if __name__ == '__main__':
+    main()
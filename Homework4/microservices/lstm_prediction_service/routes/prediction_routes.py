@@ -1,9 +1,64 @@
-from flask import Blueprint, request, jsonify
-from ..services.lstm_model import LSTMPredictor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import time
+from flask import Blueprint, jsonify
+from ..services.batch_predictor import BatchPredictor
+from ..services.lstm_model import LSTMPredictor, ModelNotReadyError
+from ..services.price_store import PriceStore
+from ..utils.wire_format import read_payload, respond
 import pandas as pd
 
 prediction_bp = Blueprint('prediction', __name__)
 predictor = LSTMPredictor()
+# Every prediction goes through the batcher, so concurrent requests for the same model share a forward pass
+batcher = BatchPredictor(predictor)
+store = PriceStore()
+STORE_COLUMNS = ['Date', 'Last trade price']
+MAX_BATCH_ITEMS = 200
+# Seconds a request waits for the batcher before answering 503
+PREDICT_TIMEOUT = 30
+
+
+def _request_frame(data: dict) -> pd.DataFrame:
+    """Rows to analyze: the posted historical_data, or the stored rows of {ticker, date_from, date_to}."""
+    ticker = data.get('ticker') or data.get('company')
+    # The ticker also names the model files, even for posted historical_data
+    if ticker is not None and not store.valid_ticker(ticker):
+        raise FileNotFoundError(f"Unknown ticker: {ticker!r}")
+    if data.get('historical_data'):
+        return pd.DataFrame(data['historical_data'])
+
+    frame = store.load_range(ticker, data.get('date_from'), data.get('date_to'), STORE_COLUMNS)
+    # Days without trades have no prices in the store
+    return frame.dropna().reset_index(drop=True)
+
+
+def _batch_items(data: dict) -> list:
+    """Items of a batch request: {"requests": [{...}, ...]} or {"tickers": [...], "date_from", "date_to"}."""
+    if data.get('tickers') is not None:
+        return [
+            {'ticker': ticker, 'date_from': data.get('date_from'), 'date_to': data.get('date_to')}
+            for ticker in data['tickers']
+        ]
+    return list(data.get('requests') or [])
+
+
+def _result_names(items: list) -> list:
+    """Unique result keys: each item's id, else its ticker, else its position.
+
+    Repeats get '#<position>' appended, skipping any key another item asks for.
+    """
+    preferred = [
+        str(item.get('id') or item.get('ticker') or item.get('company') or index)
+        for index, item in enumerate(items)
+    ]
+    taken, names = set(preferred), []
+    for index, name in enumerate(preferred):
+        if name in names:
+            while name in taken:
+                name = f'{name}#{index}'
+            taken.add(name)
+        names.append(name)
+    return names
 
 
 @prediction_bp.route('/health', methods=['GET'])
@@ -14,12 +69,88 @@ def health_check():
 @prediction_bp.route('/api/lstm/predict', methods=['POST'])
 def predict():
     try:
-        data = request.get_json()
-        if not data or 'historical_data' not in data:
-            return jsonify({"error": "No historical data provided"}), 400
+        data = read_payload()
+        if not data or not (data.get('historical_data') or data.get('ticker') or data.get('company')):
+            return jsonify({"error": "No historical data or ticker provided"}), 400
+
+        df = _request_frame(data)
+        if df.empty:
+            return jsonify({"error": "No stock data available for the selected date range"}), 400
+        ticker = data.get('ticker') or data.get('company')
+        predictions = batcher.predict(df, ticker, timeout=PREDICT_TIMEOUT)
+        return respond(predictions)
+    except FutureTimeoutError:
+        return jsonify({"error": "Prediction timed out"}), 503
+    except ModelNotReadyError as e:
+        return jsonify({"status": "training", "message": str(e)}), 202
+    except FileNotFoundError:
+        return jsonify({"error": "Unknown ticker"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@prediction_bp.route('/api/lstm/predict_batch', methods=['POST'])
+def predict_batch():
+    try:
+        items = _batch_items(read_payload() or {})
+        if not items:
+            return jsonify({"error": "No tickers or requests provided"}), 400
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({"error": f"At most {MAX_BATCH_ITEMS} items per batch"}), 400
+
+        # Queue every item before waiting on any, so they all land in the same micro-batches
+        results, pending = {}, {}
+        for item, name in zip(items, _result_names(items)):
+            ticker = item.get('ticker') or item.get('company')
+            try:
+                df = _request_frame(item)
+                if df.empty:
+                    results[name] = {"error": "No stock data available for the selected date range"}
+                    continue
+                pending[name] = batcher.submit(df, ticker)
+            except ModelNotReadyError as e:
+                results[name] = {"status": "training", "message": str(e)}
+            except FileNotFoundError:
+                results[name] = {"error": "Unknown ticker"}
+            except Exception as e:
+                results[name] = {"error": str(e)}
+
+        deadline = time.monotonic() + PREDICT_TIMEOUT
+        timed_out = 0
+        for name, future in pending.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                results[name] = {"error": "Prediction timed out"}
+                timed_out += 1
+            except Exception as e:
+                results[name] = {"error": str(e)}
+        if pending and timed_out == len(pending):
+            return jsonify({"error": "Prediction timed out", "results": results}), 503
+        return respond({"results": results})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@prediction_bp.route('/api/lstm/batch_stats', methods=['GET'])
+def batch_stats():
+    return jsonify(batcher.stats())
+
+
+@prediction_bp.route('/api/lstm/train', methods=['POST'])
+def train():
+    try:
+        data = read_payload()
+        if not data or not (data.get('historical_data') or data.get('ticker') or data.get('company')):
+            return jsonify({"error": "No historical data or ticker provided"}), 400
 
-        df = pd.DataFrame(data['historical_data'])
-        predictions = predictor.predict(df)
-        return jsonify(predictions), 200
+        df = _request_frame(data)
+        if df.empty:
+            return jsonify({"error": "No stock data available for the selected date range"}), 400
+        ticker = data.get('ticker') or data.get('company') or 'adhoc'
+        started = predictor.train_in_background(df, ticker)
+        return jsonify({"status": "training" if started else "already training", "ticker": ticker}), 202
+    except FileNotFoundError:
+        return jsonify({"error": "Unknown ticker"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .lstm_model import LSTMPredictor
+
+
+class BatchPredictor:
+    """Coalesces concurrent predictions into one forward pass per model.
+
+    Requests are queued and a single worker thread collects whatever arrives within
+    ``max_wait`` seconds of the first one, up to ``max_windows`` windows. Jobs that
+    resolved to the same stored model have their windows stacked into one tensor and
+    go through ``predict_on_batch`` together, so a dashboard asking for the same
+    tickers from many clients pays the per-call Keras overhead once per model and batch.
+    """
+
+    def __init__(self, predictor: LSTMPredictor, max_wait: float = 0.005, max_windows: int = 8192):
+        self.predictor = predictor
+        self.max_wait = max_wait
+        self.max_windows = max_windows
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._counts = {'predictions': 0, 'windows': 0, 'batches': 0, 'forward_passes': 0}
+        self._worker = threading.Thread(target=self._run, name='lstm-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, data: pd.DataFrame, ticker: Optional[str] = None) -> Future:
+        """Queue a prediction; model lookup errors (ModelNotReadyError, ValueError) are raised right here."""
+        job = self.predictor.prepare_prediction(data, ticker)
+        future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def predict(self, data: pd.DataFrame, ticker: Optional[str] = None, timeout: Optional[float] = None) -> dict:
+        return self.submit(data, ticker).result(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        counts['predictions_per_pass'] = round(counts['predictions'] / counts['forward_passes'], 2) if counts['forward_passes'] else None
+        return counts
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            windows = len(batch[0][0]['X'])
+            deadline = time.monotonic() + self.max_wait
+            while windows < self.max_windows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                windows += len(item[0]['X'])
+            self._forward(batch)
+
+    def _forward(self, batch: List[Tuple[dict, Future]]):
+        groups = defaultdict(list)
+        for job, future in batch:
+            groups[job['key']].append((job, future))
+
+        for items in groups.values():
+            try:
+                X = np.concatenate([job['X'] for job, _ in items])
+                scaled_predictions = np.asarray(items[0][0]['model'].predict_on_batch(X))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(ValueError(f"Error in LSTM prediction: {str(e)}"))
+                continue
+
+            offset = 0
+            for job, future in items:
+                count = len(job['X'])
+                try:
+                    future.set_result(self.predictor.finish_prediction(job, scaled_predictions[offset:offset + count]))
+                except Exception as e:
+                    future.set_exception(ValueError(f"Error in LSTM prediction: {str(e)}"))
+                offset += count
+
+        with self._lock:
+            self._counts['batches'] += 1
+            self._counts['forward_passes'] += len(groups)
+            self._counts['predictions'] += len(batch)
+            self._counts['windows'] += sum(len(job['X']) for job, _ in batch)
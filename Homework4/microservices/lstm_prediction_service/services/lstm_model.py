@@ -1,54 +1,157 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-from keras._tf_keras.keras.layers import LSTM, Dense, Dropout
-from keras._tf_keras.keras.models import Sequential
+from .model_registry import ModelRegistry
+from .numpy_lstm import NumpyLSTM
+
+# scikit-learn, TensorFlow and Keras are imported where a model is trained or read back from
+# Keras, so a process that serves exported models starts without them
+
+
+class ModelNotReadyError(Exception):
+    """Raised when no trained model exists yet; training has been started in the background."""
 
 
 class LSTMPredictor:
-    def __init__(self, window_size=60):
+    def __init__(self, window_size=60, registry: Optional[ModelRegistry] = None):
         self.window_size = window_size
-        self.scaler = MinMaxScaler(feature_range=(0, 1))
+        self.registry = registry or ModelRegistry()
+        self._training = set()
+        self._training_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1)
 
-    def predict(self, data: pd.DataFrame) -> dict:
-        try:
-            # Prepare data
-            X, y = self._prepare_data(data)
+    def train(self, data: pd.DataFrame, ticker: str) -> dict:
+        """Train a model on the first 70% of the windows and store it in the registry."""
+        from sklearn.preprocessing import MinMaxScaler
+        from .window_sequence import WindowSequence
+
+        prices = data[['Last trade price']].values.astype(float)
+        scaler = MinMaxScaler(feature_range=(0, 1))
+        X, y = self._prepare_data(scaler.fit_transform(prices))
+
+        split_idx = int(len(X) * 0.7)
+        model = self._build_model((X.shape[1], 1))
+        model.fit(WindowSequence(X[:split_idx], y[:split_idx], batch_size=32, shuffle=True), epochs=20, verbose=0)
+
+        results = self._evaluate(model, scaler, X[split_idx:], y[split_idx:])
+        fingerprint = self.registry.fingerprint(prices)
+        self.registry.save(ticker, self.window_size, fingerprint, model, scaler, {'rmse': results['rmse']})
+        return results
+
+    def train_in_background(self, data: pd.DataFrame, ticker: str) -> bool:
+        """Queue a training job unless one for the same ticker is already running."""
+        with self._training_lock:
+            if ticker in self._training:
+                return False
+            self._training.add(ticker)
+
+        def job():
+            try:
+                self.train(data, ticker)
+            except Exception as e:
+                print(f"Error while training LSTM model for {ticker}: {e}")
+            finally:
+                with self._training_lock:
+                    self._training.discard(ticker)
+
+        self._executor.submit(job)
+        return True
+
+    def prepare_prediction(self, data: pd.DataFrame, ticker: Optional[str] = None) -> dict:
+        """Find the model for this data and cut its test windows, leaving the forward pass to the caller.
+
+        The returned job carries the model's registry key, so callers can run the
+        windows of several jobs that share a model through it at once.
+        """
+        prices = data[['Last trade price']].values.astype(float)
+        fingerprint = self.registry.fingerprint(prices)
+        model_ticker = ticker or 'adhoc'
 
-            # Split data
+        # Serve the exact model when this data was trained on; otherwise retrain in the background
+        # and answer with the newest model of the ticker, if there is one
+        entry = self.registry.load(model_ticker, self.window_size, fingerprint)
+        stale = False
+        if entry is None:
+            self.train_in_background(data, model_ticker)
+            entry = self.registry.latest(ticker, self.window_size) if ticker else None
+            stale = True
+            if entry is None:
+                raise ModelNotReadyError(f"No trained LSTM model for {model_ticker} yet, training has started")
+
+        try:
+            model, scaler, meta = entry
+            X, y = self._prepare_data(scaler.transform(prices))
             split_idx = int(len(X) * 0.7)
-            X_train, X_test = X[:split_idx], X[split_idx:]
-            y_train, y_test = y[:split_idx], y[split_idx:]
+        except Exception as e:
+            raise ValueError(f"Error in LSTM prediction: {str(e)}")
 
-            # Build and train model
-            model = self._build_model((X_train.shape[1], 1))
-            model.fit(X_train, y_train, epochs=20, batch_size=32, verbose=0)
+        return {
+            'key': self.registry.key(meta['ticker'], meta['window_size'], meta['fingerprint']),
+            'model': model,
+            'scaler': scaler,
+            'meta': meta,
+            'stale': stale,
+            'X': X[split_idx:],
+            'y': y[split_idx:]
+        }
 
-            # Make predictions
-            predictions = model.predict(X_test)
-            predictions = self.scaler.inverse_transform(predictions)
-            actual = self.scaler.inverse_transform(y_test.reshape(-1, 1))
+    def finish_prediction(self, job: dict, scaled_predictions: np.ndarray) -> dict:
+        """Turn the model's output for a job's windows into the prediction response."""
+        results = self._results(job['scaler'], scaled_predictions, job['y'])
+        results['model'] = {'fingerprint': job['meta']['fingerprint'], 'stale': job['stale']}
+        return results
 
-            return {
-                'predictions': predictions.tolist(),
-                'actual': actual.tolist(),
-                'rmse': float(np.sqrt(np.mean((predictions - actual) ** 2)))
-            }
+    def predict(self, data: pd.DataFrame, ticker: Optional[str] = None) -> dict:
+        job = self.prepare_prediction(data, ticker)
+        try:
+            return self.finish_prediction(job, self._forward(job['model'], job['X']))
 
         except Exception as e:
             raise ValueError(f"Error in LSTM prediction: {str(e)}")
 
-    def _prepare_data(self, data: pd.DataFrame):
-        scaled_data = self.scaler.fit_transform(data[['Last trade price']].values)
+    def _evaluate(self, model, scaler, X_test, y_test) -> dict:
+        return self._results(scaler, self._forward(model, X_test), y_test)
+
+    @staticmethod
+    def _forward(model, X: np.ndarray) -> np.ndarray:
+        if isinstance(model, NumpyLSTM):
+            return model.predict_on_batch(X)
 
-        X, y = [], []
-        for i in range(self.window_size, len(scaled_data)):
-            X.append(scaled_data[i - self.window_size:i, 0])
-            y.append(scaled_data[i, 0])
+        from .window_sequence import WindowSequence
+        return model.predict(WindowSequence(X, batch_size=256), verbose=0)
 
-        return np.array(X), np.array(y)
+    def _results(self, scaler, scaled_predictions: np.ndarray, y_test: np.ndarray) -> dict:
+        predictions = scaler.inverse_transform(scaled_predictions)
+        actual = scaler.inverse_transform(y_test.reshape(-1, 1))
+
+        return {
+            'predictions': predictions,
+            'actual': actual,
+            'rmse': float(np.sqrt(np.mean((predictions - actual) ** 2)))
+        }
+
+    def _prepare_data(self, scaled_data: np.ndarray, materialize: bool = False):
+        """Windows of the previous window_size prices (X) and the price that follows each (y).
+
+        X is a read-only strided view of shape (samples, window_size, 1) over scaled_data;
+        pass materialize=True for an independent contiguous copy.
+        """
+        series = scaled_data[:, 0]
+        if len(series) <= self.window_size:
+            raise ValueError("Insufficient data for LSTM preprocessing. Consider using a larger date range.")
+
+        X = np.lib.stride_tricks.sliding_window_view(series[:-1], self.window_size)[..., np.newaxis]
+        y = series[self.window_size:]
+        if materialize:
+            return np.ascontiguousarray(X), y.copy()
+        return X, y
 
     def _build_model(self, input_shape):
+        from keras._tf_keras.keras.layers import LSTM, Dense, Dropout
+        from keras._tf_keras.keras.models import Sequential
+
         model = Sequential()
         model.add(LSTM(units=50, return_sequences=True, input_shape=input_shape))
         model.add(Dropout(0.2))
@@ -56,4 +159,4 @@ class LSTMPredictor:
         model.add(Dropout(0.2))
         model.add(Dense(units=1))
         model.compile(optimizer='adam', loss='mean_squared_error')
-        return model
\ No newline at end of file
+        return model
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from .numpy_lstm import EXPORT_TOLERANCE, NumpyLSTM
+
+
+class ModelRegistry:
+    """Trained LSTM models on disk, keyed by ticker, window size and a fingerprint of the training data.
+
+    Every entry holds the Keras model together with the MinMaxScaler it was trained with,
+    and an export of both to model.npz for the NumPy inference path. With the default
+    ``numpy`` backend entries are served from that export, so loading never imports
+    TensorFlow; entries without one are exported on first load. The ``keras`` backend
+    always loads the Keras model. Loaded entries stay in memory so repeated predictions
+    skip the disk as well.
+    """
+
+    def __init__(self, model_dir: str = './models', backend: Optional[str] = None):
+        self.model_dir = model_dir
+        self.backend = backend or os.environ.get('LSTM_INFERENCE_BACKEND', 'numpy')
+        os.makedirs(self.model_dir, exist_ok=True)
+        self._loaded: Dict[str, Tuple[object, object, dict]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(prices: np.ndarray) -> str:
+        return hashlib.sha1(np.ascontiguousarray(prices, dtype=np.float64).tobytes()).hexdigest()[:16]
+
+    @staticmethod
+    def key(ticker: str, window_size: int, fingerprint: str) -> str:
+        return f'{ticker}_w{window_size}_{fingerprint}'
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.model_dir, key)
+
+    def save(self, ticker: str, window_size: int, fingerprint: str, model, scaler, metrics: Optional[dict] = None) -> str:
+        """Persist a trained model and its scaler, replacing any entry with the same key."""
+        key = self.key(ticker, window_size, fingerprint)
+        target = self._entry_dir(key)
+        tmp_dir = f'{target}.tmp-{os.getpid()}-{threading.get_ident()}'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        model.save(os.path.join(tmp_dir, 'model.keras'))
+        with open(os.path.join(tmp_dir, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(scaler, f)
+        meta = {
+            'ticker': ticker,
+            'window_size': window_size,
+            'fingerprint': fingerprint,
+            'trained_at': time.time(),
+            'metrics': metrics or {},
+            'export': self._export(model, scaler, window_size, tmp_dir)
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(tmp_dir, target)
+        with self._lock:
+            if self.backend == 'numpy' and meta['export']['format'] == 'npz':
+                self._loaded[key] = (*NumpyLSTM.load(os.path.join(target, 'model.npz')), meta)
+            else:
+                self._loaded[key] = (model, scaler, meta)
+        return key
+
+    @staticmethod
+    def _export(model, scaler, window_size: int, entry_dir: str) -> dict:
+        """Write model.npz next to the Keras model if the NumPy copy reproduces its output."""
+        try:
+            exported = NumpyLSTM.from_keras(model)
+            max_error = exported.max_error(model, window_size)
+        except ValueError as e:
+            return {'format': None, 'reason': str(e)}
+
+        if max_error > EXPORT_TOLERANCE:
+            return {'format': None, 'max_error': max_error, 'reason': 'output differs from the Keras model'}
+        exported.save(os.path.join(entry_dir, 'model.npz'), scaler)
+        return {'format': 'npz', 'max_error': max_error}
+
+    def export(self, key: str) -> dict:
+        """Export an existing entry to model.npz (needs TensorFlow) and record the result in its meta."""
+        entry_dir = self._entry_dir(key)
+        model, scaler, meta = self._read_keras_entry(entry_dir)
+        meta['export'] = self._export(model, scaler, meta['window_size'], entry_dir)
+        self._write_meta(entry_dir, meta)
+        with self._lock:
+            self._loaded.pop(key, None)
+        return meta['export']
+
+    def load_meta(self, key: str) -> dict:
+        with open(os.path.join(self._entry_dir(key), 'meta.json')) as f:
+            return json.load(f)
+
+    def keys(self) -> List[str]:
+        return sorted(
+            name for name in os.listdir(self.model_dir)
+            if os.path.exists(os.path.join(self.model_dir, name, 'meta.json'))
+        )
+
+    def has(self, ticker: str, window_size: int, fingerprint: str) -> bool:
+        """Whether an entry exists on disk, without loading its model."""
+        return os.path.exists(os.path.join(self._entry_dir(self.key(ticker, window_size, fingerprint)), 'meta.json'))
+
+    def load(self, ticker: str, window_size: int, fingerprint: str) -> Optional[Tuple[object, object, dict]]:
+        """Return (model, scaler, meta) for an exact key, or None if it was never trained."""
+        return self._load_key(self.key(ticker, window_size, fingerprint))
+
+    def latest(self, ticker: str, window_size: int) -> Optional[Tuple[object, object, dict]]:
+        """Return the most recently trained entry for a ticker and window size, whatever its data."""
+        prefix = f'{ticker}_w{window_size}_'
+        newest_key, newest_time = None, -1.0
+        for name in os.listdir(self.model_dir):
+            meta_path = os.path.join(self.model_dir, name, 'meta.json')
+            if name.startswith(prefix) and os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    trained_at = json.load(f)['trained_at']
+                if trained_at > newest_time:
+                    newest_key, newest_time = name, trained_at
+        return self._load_key(newest_key) if newest_key else None
+
+    def _load_key(self, key: str) -> Optional[Tuple[object, object, dict]]:
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+
+        entry_dir = self._entry_dir(key)
+        if not os.path.exists(os.path.join(entry_dir, 'meta.json')):
+            return None
+
+        meta = self.load_meta(key)
+        if self.backend == 'numpy' and 'export' not in meta:
+            # Trained before exports existed
+            self.export(key)
+            meta = self.load_meta(key)
+        entry = self._read_entry(entry_dir, meta) if self.backend == 'numpy' else self._read_keras_entry(entry_dir)
+
+        with self._lock:
+            self._loaded[key] = entry
+        return entry
+
+    def _read_entry(self, entry_dir: str, meta: dict) -> Tuple[object, object, dict]:
+        """The NumPy export of an entry, or its Keras model when it could not be exported."""
+        if meta.get('export', {}).get('format') != 'npz':
+            return self._read_keras_entry(entry_dir)
+        model, scaler = NumpyLSTM.load(os.path.join(entry_dir, 'model.npz'))
+        return model, scaler, meta
+
+    @staticmethod
+    def _read_keras_entry(entry_dir: str) -> Tuple[object, object, dict]:
+        from keras._tf_keras.keras.models import load_model
+
+        model = load_model(os.path.join(entry_dir, 'model.keras'))
+        with open(os.path.join(entry_dir, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        with open(os.path.join(entry_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        return model, scaler, meta
+
+    @staticmethod
+    def _write_meta(entry_dir: str, meta: dict) -> None:
+        tmp_path = os.path.join(entry_dir, f'meta.json.tmp-{os.getpid()}-{threading.get_ident()}')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(entry_dir, 'meta.json'))
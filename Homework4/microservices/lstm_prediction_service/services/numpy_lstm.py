@@ -0,0 +1,124 @@
+from typing import List, Tuple
+import numpy as np
+
+# Largest difference from the Keras model's output that an export may have
+EXPORT_TOLERANCE = 1e-4
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    # Same function as 1 / (1 + exp(-x)), without overflow for large negative inputs
+    return 0.5 * (np.tanh(0.5 * values) + 1)
+
+
+class NumpyMinMaxScaler:
+    """transform and inverse_transform of a fitted sklearn MinMaxScaler, from its min_ and scale_."""
+
+    def __init__(self, min_: np.ndarray, scale_: np.ndarray):
+        self.min_ = np.asarray(min_, dtype=float)
+        self.scale_ = np.asarray(scale_, dtype=float)
+
+    @classmethod
+    def from_sklearn(cls, scaler) -> 'NumpyMinMaxScaler':
+        return cls(scaler.min_, scaler.scale_)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=float) * self.scale_ + self.min_
+
+    def inverse_transform(self, X: np.ndarray) -> np.ndarray:
+        return (np.asarray(X, dtype=float) - self.min_) / self.scale_
+
+
+class NumpyLSTM:
+    """Inference-only copy of the stacked LSTM network, evaluated with NumPy.
+
+    Holds the weights of the LSTM layers (Keras gate order i, f, c, o with tanh and
+    sigmoid activations) and of the final Dense layer; Dropout does nothing at
+    inference and is left out. Serving with it needs neither TensorFlow nor Keras.
+    """
+
+    def __init__(self, lstm_layers: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 dense: Tuple[np.ndarray, np.ndarray]):
+        self.lstm_layers = lstm_layers
+        self.dense = dense
+
+    @classmethod
+    def from_keras(cls, model) -> 'NumpyLSTM':
+        lstm_layers, dense = [], None
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == 'LSTM':
+                if layer.activation.__name__ != 'tanh' or layer.recurrent_activation.__name__ != 'sigmoid':
+                    raise ValueError(f"Unsupported LSTM activations in layer {layer.name}")
+                lstm_layers.append(tuple(layer.get_weights()))
+            elif kind == 'Dense' and dense is None:
+                dense = tuple(layer.get_weights())
+            elif kind != 'Dropout':
+                raise ValueError(f"Cannot export layer {layer.name} of type {kind}")
+
+        if not lstm_layers or dense is None:
+            raise ValueError("Expected LSTM layers followed by a Dense layer")
+        return cls(lstm_layers, dense)
+
+    def save(self, path: str, scaler) -> None:
+        """Write the weights and the scaler's parameters to one .npz file."""
+        arrays = {
+            'dense_kernel': self.dense[0],
+            'dense_bias': self.dense[1],
+            'scaler_min': np.asarray(scaler.min_, dtype=float),
+            'scaler_scale': np.asarray(scaler.scale_, dtype=float)
+        }
+        for index, (kernel, recurrent_kernel, bias) in enumerate(self.lstm_layers):
+            arrays[f'lstm_{index}_kernel'] = kernel
+            arrays[f'lstm_{index}_recurrent_kernel'] = recurrent_kernel
+            arrays[f'lstm_{index}_bias'] = bias
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple['NumpyLSTM', NumpyMinMaxScaler]:
+        with np.load(path) as archive:
+            count = sum(name.endswith('_recurrent_kernel') for name in archive.files)
+            lstm_layers = [
+                (archive[f'lstm_{index}_kernel'], archive[f'lstm_{index}_recurrent_kernel'], archive[f'lstm_{index}_bias'])
+                for index in range(count)
+            ]
+            model = cls(lstm_layers, (archive['dense_kernel'], archive['dense_bias']))
+            scaler = NumpyMinMaxScaler(archive['scaler_min'], archive['scaler_scale'])
+        return model, scaler
+
+    def predict_on_batch(self, X: np.ndarray) -> np.ndarray:
+        """Outputs of shape (samples, 1) for windows X of shape (samples, window_size, 1)."""
+        dtype = self.dense[0].dtype
+        # Time-major (steps, samples, features), so every step reads one contiguous block
+        sequence = np.ascontiguousarray(np.asarray(X, dtype=dtype).transpose(1, 0, 2))
+        last = len(self.lstm_layers) - 1
+
+        for index, (kernel, recurrent_kernel, bias) in enumerate(self.lstm_layers):
+            steps, samples, features = sequence.shape
+            units = recurrent_kernel.shape[0]
+            # The input part of every gate, for all time steps in one 2-D product
+            projected = (sequence.reshape(-1, features) @ kernel + bias).reshape(steps, samples, 4 * units)
+            state = np.zeros((samples, units), dtype=dtype)
+            carry = np.zeros((samples, units), dtype=dtype)
+            outputs = np.empty((steps, samples, units), dtype=dtype) if index < last else None
+
+            for step in range(steps):
+                gates = projected[step] + state @ recurrent_kernel
+                input_gate = _sigmoid(gates[:, :units])
+                forget_gate = _sigmoid(gates[:, units:2 * units])
+                candidate = np.tanh(gates[:, 2 * units:3 * units])
+                output_gate = _sigmoid(gates[:, 3 * units:])
+                carry = forget_gate * carry + input_gate * candidate
+                state = output_gate * np.tanh(carry)
+                if outputs is not None:
+                    outputs[step] = state
+
+            sequence = outputs if outputs is not None else state
+
+        return sequence @ self.dense[0] + self.dense[1]
+
+    def max_error(self, model, window_size: int, samples: int = 64) -> float:
+        """Largest difference from the Keras model's output on random windows."""
+        probe = np.random.default_rng(0).random((samples, window_size, 1), dtype=np.float32)
+        expected = np.asarray(model.predict_on_batch(probe))
+        return float(np.max(np.abs(self.predict_on_batch(probe) - expected)))
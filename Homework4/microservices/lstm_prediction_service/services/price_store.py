@@ -0,0 +1,210 @@
+import os
+import re
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+
+class PriceStore:
+    """Typed columnar price store, one memory-mappable .npy file per column."""
+
+    COLUMNS = {
+        'Date': ('date', 'datetime64[D]'),
+        'Last trade price': ('last_trade_price', 'float64'),
+        'Max': ('max', 'float64'),
+        'Min': ('min', 'float64'),
+        'Avg Price': ('avg_price', 'float64'),
+        '%chg.': ('pct_change', 'float64'),
+        'Volume': ('volume', 'int64'),
+        'TurnoverBEST_MKD': ('turnover_best_mkd', 'float64'),
+        'TotalTurnoverMKD': ('total_turnover_mkd', 'float64'),
+    }
+    TURNOVER_COLUMNS = ['TurnoverBEST_MKD', 'TotalTurnoverMKD']
+    # Tickers end up in file paths, so only plain exchange symbols are accepted
+    TICKER_PATTERN = re.compile(r'[A-Z0-9]+')
+    # A ticker's columns live in a versioned directory under store/<ticker>, and this file
+    # names the current one, so a write replaces every column at once by rewriting it
+    CURRENT_FILE = 'CURRENT'
+
+    def __init__(self, data_dir: str = './data'):
+        self.data_dir = data_dir
+        self.store_dir = os.path.join(data_dir, 'store')
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def ticker_dir(self, ticker: str) -> str:
+        """Directory with the ticker's current column files; resolve it once per read."""
+        root = os.path.join(self.store_dir, ticker)
+        try:
+            with open(os.path.join(root, self.CURRENT_FILE)) as f:
+                return os.path.join(root, f.read().strip())
+        except FileNotFoundError:
+            # Stores written before versioned directories keep the columns in store/<ticker> itself
+            return root
+
+    def has_ticker(self, ticker: str) -> bool:
+        return os.path.exists(os.path.join(self.ticker_dir(ticker), 'date.npy'))
+
+    @classmethod
+    def valid_ticker(cls, ticker) -> bool:
+        return isinstance(ticker, str) and cls.TICKER_PATTERN.fullmatch(ticker) is not None
+
+    def require_ticker(self, ticker: str) -> None:
+        """Raise FileNotFoundError unless ticker is a valid symbol with stored or CSV data."""
+        if not self.valid_ticker(ticker) or not (
+                self.has_ticker(ticker) or os.path.exists(os.path.join(self.data_dir, f'{ticker}.csv'))):
+            raise FileNotFoundError(f"Unknown ticker: {ticker!r}")
+
+    def tickers(self) -> List[str]:
+        """List the tickers that are stored or still only available as CSV."""
+        stored = {name for name in os.listdir(self.store_dir) if self.has_ticker(name)}
+        csvs = {file[:-len('.csv')] for file in os.listdir(self.data_dir) if file.endswith('.csv')}
+        return sorted(stored | csvs)
+
+    def is_stale(self, ticker: str) -> bool:
+        """Check whether the ticker's CSV is newer than its stored columns."""
+        csv_path = os.path.join(self.data_dir, f'{ticker}.csv')
+        if not self.has_ticker(ticker):
+            return True
+        if not os.path.exists(csv_path):
+            return False
+        store_mtime = os.path.getmtime(os.path.join(self.ticker_dir(ticker), 'date.npy'))
+        return os.path.getmtime(csv_path) > store_mtime
+
+    def _parse_number_column(self, values: pd.Series, column: str) -> pd.Series:
+        if pd.api.types.is_numeric_dtype(values):
+            return values.astype('float64')
+
+        # Numbers (new scrapes, CSVs written by write_csv) are taken as they are;
+        # text in a number column only comes from CSVs saved by the old scraper
+        is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+        numbers = pd.to_numeric(values.where(~is_text), errors='coerce')
+        text = values[is_text].str.strip().str.replace('"', '', regex=False)
+        return numbers.where(~is_text, self._parse_legacy_text(text, column))
+
+    def _parse_legacy_text(self, text: pd.Series, column: str) -> pd.Series:
+        """Parse number text in the old scraper's CSV format.
+
+        The old scraper saved the site's text, except that it read every price, %chg. and
+        turnover value it could parse as a float (one comma, no point) and wrote it back with
+        two decimals and a decimal comma. So prices are "23,299.00" or, for "577,00", 577.00;
+        %chg. always has a decimal comma; Volume is always grouped; turnovers are "1,484,406"
+        or, for "715,66", the site's "715,664" read as 715.664.
+        """
+        grouped = pd.to_numeric(text.str.replace(',', '', regex=False), errors='coerce')
+        if column == 'Volume':
+            return grouped
+        decimal = pd.to_numeric(text.str.replace(',', '.', regex=False), errors='coerce')
+        if column == '%chg.':
+            return decimal
+
+        reformatted = (text.str.count(',') == 1) & ~text.str.contains('.', regex=False)
+        if column in self.TURNOVER_COLUMNS:
+            decimal = decimal * 1000
+        return grouped.where(~reformatted, decimal)
+
+    def to_typed_frame(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Convert scraped rows into typed columns sorted by ascending date."""
+        typed = pd.DataFrame({'Date': pd.to_datetime(data['Date'], format='%m/%d/%Y', errors='coerce')})
+        for column, (_, dtype) in self.COLUMNS.items():
+            if column == 'Date':
+                continue
+            values = self._parse_number_column(data[column], column)
+            typed[column] = values.fillna(0).astype(dtype) if dtype == 'int64' else values
+
+        typed = typed.dropna(subset=['Date'])
+        return typed.sort_values('Date', kind='stable').drop_duplicates('Date', keep='last').reset_index(drop=True)
+
+    def write_frame(self, ticker: str, data: pd.DataFrame) -> None:
+        """Write a typed frame, replacing the ticker's columns atomically."""
+        root = os.path.join(self.store_dir, ticker)
+        # Versions sort by creation time, which _remove_old_versions relies on
+        version = f"{time.time_ns():020d}-{os.getpid()}"
+        os.makedirs(os.path.join(root, version))
+
+        for column, (file_name, dtype) in self.COLUMNS.items():
+            np.save(os.path.join(root, version, f"{file_name}.npy"), data[column].to_numpy(dtype=dtype))
+
+        # Repointing CURRENT is one atomic rename, so readers see either the old or the new columns
+        previous = self.ticker_dir(ticker)
+        pointer_tmp = os.path.join(root, f"{self.CURRENT_FILE}.tmp-{os.getpid()}")
+        with open(pointer_tmp, 'w') as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(root, self.CURRENT_FILE))
+        self._remove_old_versions(root, os.path.basename(previous) if previous != root else None)
+
+    @staticmethod
+    def _remove_old_versions(root: str, previous: Optional[str]) -> None:
+        # Keep the version just replaced for readers that resolved it a moment ago, and anything
+        # newer that a concurrent write may still be filling; older versions are removed
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if os.path.isdir(path):
+                if previous is not None and name < previous:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif name.endswith('.npy') and previous is not None:
+                # Columns of the unversioned layout, replaced by an earlier versioned write
+                os.remove(path)
+
+    def write_csv(self, ticker: str, data: pd.DataFrame) -> str:
+        """Write a typed frame as the ticker's CSV, newest day first with month/day/year dates."""
+        csv_path = os.path.join(self.data_dir, f'{ticker}.csv')
+        newest_first = data.iloc[::-1]
+        newest_first.assign(Date=newest_first['Date'].dt.strftime('%m/%d/%Y')).to_csv(csv_path, index=False)
+        return csv_path
+
+    def convert_csv(self, ticker: str) -> pd.DataFrame:
+        """Parse a ticker's CSV once and store it as typed columns."""
+        self.require_ticker(ticker)
+        data = pd.read_csv(os.path.join(self.data_dir, f'{ticker}.csv'))
+        typed = self.to_typed_frame(data)
+        self.write_frame(ticker, typed)
+        return typed
+
+    def load_columns(self, ticker: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Memory-map the requested columns of a ticker."""
+        columns = columns or list(self.COLUMNS)
+        path = self.ticker_dir(ticker)
+        return {
+            column: np.load(os.path.join(path, f"{self.COLUMNS[column][0]}.npy"), mmap_mode='r')
+            for column in columns
+        }
+
+    def load_frame(self, ticker: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load a ticker as a DataFrame, converting its CSV first if needed."""
+        self.require_ticker(ticker)
+        if self.is_stale(ticker):
+            typed = self.convert_csv(ticker)
+            return typed[columns] if columns else typed
+        return pd.DataFrame(self.load_columns(ticker, columns))
+
+    def load_range(self, ticker: str, date_from=None, date_to=None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load a ticker's rows between two dates (inclusive) by slicing the sorted Date column."""
+        self.require_ticker(ticker)
+        if self.is_stale(ticker):
+            self.convert_csv(ticker)
+        columns = columns or list(self.COLUMNS)
+        data = self.load_columns(ticker, list(dict.fromkeys(['Date'] + columns)))
+
+        dates = data['Date']
+        start = int(np.searchsorted(dates, self._day(date_from), side='left')) if date_from else 0
+        end = int(np.searchsorted(dates, self._day(date_to), side='right')) if date_to else len(dates)
+        return pd.DataFrame({column: data[column][start:end] for column in columns})
+
+    @staticmethod
+    def _day(value) -> np.datetime64:
+        return pd.Timestamp(value).to_datetime64().astype('datetime64[D]')
+
+    def convert_all(self) -> List[str]:
+        """Convert every CSV in the data directory into the store."""
+        tickers = [file[:-len('.csv')] for file in sorted(os.listdir(self.data_dir)) if file.endswith('.csv')]
+        for ticker in tickers:
+            self.convert_csv(ticker)
+        return tickers
+
+
+if __name__ == '__main__':
+    store = PriceStore()
+    converted = store.convert_all()
+    print(f"Converted {len(converted)} tickers into {store.store_dir}")
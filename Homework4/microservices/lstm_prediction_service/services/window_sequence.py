@@ -0,0 +1,34 @@
+from typing import Optional
+import numpy as np
+from keras._tf_keras.keras.utils import Sequence
+
+
+class WindowSequence(Sequence):
+    """Feeds (window, target) batches to Keras from strided window views.
+
+    Only one batch at a time is copied into a contiguous array, so the full
+    (samples x window) matrix is never materialised.
+    """
+
+    def __init__(self, X: np.ndarray, y: Optional[np.ndarray] = None, batch_size: int = 32, shuffle: bool = False):
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.order = np.arange(len(X))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.X) / self.batch_size))
+
+    def __getitem__(self, index):
+        rows = self.order[index * self.batch_size:(index + 1) * self.batch_size]
+        X_batch = self.X[rows]
+        if self.y is None:
+            return X_batch
+        return X_batch, self.y[rows]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.order)
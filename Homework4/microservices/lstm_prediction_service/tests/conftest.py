@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The service is imported as a package from the microservices directory, like its relative imports expect
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
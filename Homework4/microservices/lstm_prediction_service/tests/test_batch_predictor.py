@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+from lstm_prediction_service.services.batch_predictor import BatchPredictor
+from lstm_prediction_service.services.lstm_model import ModelNotReadyError
+
+
+class FakeModel:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def predict_on_batch(self, X):
+        self.batches.append(len(X))
+        if self.fail:
+            raise RuntimeError('model exploded')
+        return X[:, -1, :] * 2
+
+
+class FakePredictor:
+    """Jobs whose windows are the ticker's prices, one window of length 1 per price."""
+
+    def __init__(self, models):
+        self.models = models
+
+    def prepare_prediction(self, data, ticker=None):
+        if ticker not in self.models:
+            raise ModelNotReadyError(f'No trained LSTM model for {ticker} yet')
+        prices = data['Last trade price'].to_numpy(dtype=float)
+        return {'key': ticker, 'model': self.models[ticker], 'X': prices.reshape(-1, 1, 1), 'ticker': ticker}
+
+    def finish_prediction(self, job, scaled_predictions):
+        return {'ticker': job['ticker'], 'predictions': scaled_predictions[:, 0].tolist()}
+
+
+def prices(*values):
+    return pd.DataFrame({'Last trade price': values})
+
+
+def test_concurrent_requests_for_one_model_share_a_forward_pass():
+    model = FakeModel()
+    batcher = BatchPredictor(FakePredictor({'ALK': model}), max_wait=0.2)
+
+    futures = [batcher.submit(prices(index, index + 0.5), 'ALK') for index in range(5)]
+
+    assert [future.result(5)['predictions'] for future in futures] == [[2 * i, 2 * i + 1] for i in range(5)]
+    assert model.batches == [10]
+    assert batcher.stats() == {'predictions': 5, 'windows': 10, 'batches': 1, 'forward_passes': 1,
+                               'predictions_per_pass': 5.0}
+
+
+def test_each_model_gets_its_own_forward_pass():
+    models = {'ALK': FakeModel(), 'KMB': FakeModel()}
+    batcher = BatchPredictor(FakePredictor(models), max_wait=0.2)
+
+    alk, kmb = batcher.submit(prices(1.0), 'ALK'), batcher.submit(prices(2.0, 3.0), 'KMB')
+
+    assert alk.result(5) == {'ticker': 'ALK', 'predictions': [2.0]}
+    assert kmb.result(5) == {'ticker': 'KMB', 'predictions': [4.0, 6.0]}
+    assert models['ALK'].batches == [1] and models['KMB'].batches == [2]
+
+
+def test_a_failing_model_fails_only_its_own_requests():
+    models = {'ALK': FakeModel(fail=True), 'KMB': FakeModel()}
+    batcher = BatchPredictor(FakePredictor(models), max_wait=0.2)
+
+    alk, kmb = batcher.submit(prices(1.0), 'ALK'), batcher.submit(prices(2.0), 'KMB')
+
+    with pytest.raises(ValueError, match='model exploded'):
+        alk.result(5)
+    assert kmb.result(5)['predictions'] == [4.0]
+
+
+def test_batches_stop_growing_at_max_windows():
+    model = FakeModel()
+    batcher = BatchPredictor(FakePredictor({'ALK': model}), max_wait=0.2, max_windows=4)
+
+    futures = [batcher.submit(prices(1.0, 2.0, 3.0), 'ALK') for _ in range(3)]
+    for future in futures:
+        future.result(5)
+
+    # The first batch closes once it holds at least max_windows windows
+    assert model.batches == [6, 3]
+
+
+def test_model_lookup_errors_are_raised_on_submit():
+    batcher = BatchPredictor(FakePredictor({}))
+
+    with pytest.raises(ModelNotReadyError):
+        batcher.submit(prices(1.0), 'ALK')
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from lstm_prediction_service.services.lstm_model import LSTMPredictor
+from lstm_prediction_service.services.model_registry import ModelRegistry
+
+
+def loop_windows(scaled_data, window_size):
+    # The list-building implementation the strided view replaced
+    X, y = [], []
+    for i in range(window_size, len(scaled_data)):
+        X.append(scaled_data[i - window_size:i, 0])
+        y.append(scaled_data[i, 0])
+    X = np.array(X)
+    return np.reshape(X, (X.shape[0], X.shape[1], 1)), np.array(y)
+
+
+def predictor(tmp_path, window_size):
+    return LSTMPredictor(window_size, registry=ModelRegistry(str(tmp_path)))
+
+
+@pytest.mark.parametrize('window_size, length', [(60, 61), (60, 250), (5, 6), (5, 40)])
+def test_windows_match_the_old_loop(tmp_path, window_size, length):
+    scaled = np.random.default_rng(0).random((length, 1))
+    expected_X, expected_y = loop_windows(scaled, window_size)
+
+    X, y = predictor(tmp_path, window_size)._prepare_data(scaled)
+
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+    assert not X.flags.writeable
+    assert np.shares_memory(X, scaled)
+
+
+def test_materialized_windows_are_independent_copies(tmp_path):
+    scaled = np.random.default_rng(0).random((40, 1))
+    expected_X, expected_y = loop_windows(scaled, 5)
+
+    X, y = predictor(tmp_path, 5)._prepare_data(scaled, materialize=True)
+
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+    assert X.flags.c_contiguous
+    assert not np.shares_memory(X, scaled) and not np.shares_memory(y, scaled)
+
+
+@pytest.mark.parametrize('length', [0, 5])
+def test_too_few_prices_for_one_window_are_rejected(tmp_path, length):
+    with pytest.raises(ValueError, match='Insufficient data'):
+        predictor(tmp_path, 5)._prepare_data(np.zeros((length, 1)))
+
+
+def test_window_sequence_batches_every_window_once(tmp_path):
+    pytest.importorskip('tensorflow')
+    from lstm_prediction_service.services.window_sequence import WindowSequence
+    scaled = np.random.default_rng(0).random((40, 1))
+    X, y = predictor(tmp_path, 5)._prepare_data(scaled)
+
+    sequence = WindowSequence(X, y, batch_size=8, shuffle=True)
+    batches = [sequence[index] for index in range(len(sequence))]
+
+    assert len(sequence) == 5
+    assert [len(batch_X) for batch_X, _ in batches] == [8, 8, 8, 8, 3]
+    batch_X = np.concatenate([batch_X for batch_X, _ in batches])
+    batch_y = np.concatenate([batch_y for _, batch_y in batches])
+    order = np.argsort(batch_y)
+    np.testing.assert_array_equal(batch_X[order], X[np.argsort(y)])
+    # Without targets only the windows are returned, in order
+    np.testing.assert_array_equal(WindowSequence(X, batch_size=8)[4], X[32:])
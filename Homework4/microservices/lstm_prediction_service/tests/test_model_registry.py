@@ -0,0 +1,102 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('tensorflow')
+from sklearn.preprocessing import MinMaxScaler
+from lstm_prediction_service.services.lstm_model import LSTMPredictor, ModelNotReadyError
+from lstm_prediction_service.services.model_registry import ModelRegistry
+from lstm_prediction_service.services.numpy_lstm import NumpyLSTM
+
+WINDOW = 5
+
+
+@pytest.fixture(scope='module')
+def trained():
+    # An untrained network is enough: the registry only stores and reloads it
+    prices = np.linspace(100, 120, 40).reshape(-1, 1)
+    return LSTMPredictor(window_size=WINDOW)._build_model((WINDOW, 1)), MinMaxScaler().fit(prices), prices
+
+
+def test_saved_entries_are_found_by_their_data(tmp_path, trained):
+    model, scaler, prices = trained
+    registry = ModelRegistry(str(tmp_path))
+    fingerprint = registry.fingerprint(prices)
+
+    key = registry.save('ALK', WINDOW, fingerprint, model, scaler, {'rmse': 1.5})
+
+    assert key == f'ALK_w{WINDOW}_{fingerprint}'
+    assert registry.has('ALK', WINDOW, fingerprint)
+    assert not registry.has('ALK', WINDOW, registry.fingerprint(prices + 1))
+    assert not registry.has('KMB', WINDOW, fingerprint)
+    assert registry.keys() == [key]
+    meta = registry.load_meta(key)
+    assert meta['metrics'] == {'rmse': 1.5}
+    assert meta['export']['format'] == 'npz'
+
+
+@pytest.mark.parametrize('backend, exported', [('numpy', True), ('keras', False)])
+def test_a_new_registry_loads_entries_from_disk(tmp_path, trained, backend, exported):
+    model, scaler, prices = trained
+    fingerprint = ModelRegistry.fingerprint(prices)
+    ModelRegistry(str(tmp_path)).save('ALK', WINDOW, fingerprint, model, scaler)
+
+    registry = ModelRegistry(str(tmp_path), backend=backend)
+    loaded_model, loaded_scaler, meta = registry.load('ALK', WINDOW, fingerprint)
+
+    assert isinstance(loaded_model, NumpyLSTM) == exported
+    assert meta['fingerprint'] == fingerprint
+    np.testing.assert_allclose(loaded_scaler.transform(prices), scaler.transform(prices))
+    assert registry.load('ALK', WINDOW, fingerprint) is registry.load('ALK', WINDOW, fingerprint)
+    assert registry.load('ALK', WINDOW, ModelRegistry.fingerprint(prices + 1)) is None
+
+
+def test_latest_returns_the_newest_entry_of_a_ticker(tmp_path, trained):
+    model, scaler, prices = trained
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('ALK', WINDOW, 'old', model, scaler)
+    registry.save('ALK', WINDOW, 'new', model, scaler)
+    registry.save('KMB', WINDOW, 'other', model, scaler)
+
+    assert registry.latest('ALK', WINDOW)[2]['fingerprint'] == 'new'
+    assert registry.latest('ALK', WINDOW + 1) is None
+
+
+def test_entries_without_an_export_are_exported_on_first_load(tmp_path, trained):
+    model, scaler, prices = trained
+    key = ModelRegistry(str(tmp_path)).save('ALK', WINDOW, 'legacy', model, scaler)
+    os.remove(tmp_path / key / 'model.npz')
+    meta = ModelRegistry(str(tmp_path)).load_meta(key)
+    del meta['export']
+    ModelRegistry._write_meta(str(tmp_path / key), meta)
+
+    loaded_model, _, meta = ModelRegistry(str(tmp_path)).load('ALK', WINDOW, 'legacy')
+
+    assert isinstance(loaded_model, NumpyLSTM)
+    assert meta['export']['format'] == 'npz'
+    assert (tmp_path / key / 'model.npz').exists()
+
+
+def test_predict_without_a_model_starts_training(tmp_path, monkeypatch):
+    predictor = LSTMPredictor(window_size=WINDOW, registry=ModelRegistry(str(tmp_path)))
+    queued = []
+    monkeypatch.setattr(predictor, 'train_in_background', lambda data, ticker: queued.append(ticker))
+
+    with pytest.raises(ModelNotReadyError):
+        predictor.predict(pd.DataFrame({'Last trade price': np.linspace(100, 120, 40)}), 'ALK')
+    assert queued == ['ALK']
+
+
+def test_predict_serves_the_stored_model_of_the_same_data(tmp_path, trained, monkeypatch):
+    model, scaler, prices = trained
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('ALK', WINDOW, registry.fingerprint(prices), model, scaler)
+    predictor = LSTMPredictor(window_size=WINDOW, registry=registry)
+    monkeypatch.setattr(predictor, 'train_in_background', lambda data, ticker: pytest.fail('retrained'))
+
+    results = predictor.predict(pd.DataFrame({'Last trade price': prices[:, 0]}), 'ALK')
+
+    assert results['model'] == {'fingerprint': registry.fingerprint(prices), 'stale': False}
+    # 35 windows, the last 30% of them are predicted
+    assert results['predictions'].shape == (11, 1)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from lstm_prediction_service.services.numpy_lstm import EXPORT_TOLERANCE, NumpyLSTM, NumpyMinMaxScaler, _sigmoid
+
+WINDOW = 60
+
+
+def test_scaler_matches_sklearn():
+    sklearn_preprocessing = pytest.importorskip('sklearn.preprocessing')
+    prices = np.random.default_rng(0).uniform(50, 25000, (500, 1))
+    fitted = sklearn_preprocessing.MinMaxScaler(feature_range=(0, 1)).fit(prices)
+    scaler = NumpyMinMaxScaler.from_sklearn(fitted)
+    probe = np.random.default_rng(1).uniform(0, 30000, (50, 1))
+
+    np.testing.assert_allclose(scaler.transform(probe), fitted.transform(probe), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(scaler.inverse_transform(probe / 30000), fitted.inverse_transform(probe / 30000), rtol=1e-12)
+
+
+def test_sigmoid_is_stable_for_large_inputs():
+    with np.errstate(over='raise'):
+        values = _sigmoid(np.array([-1000.0, 0.0, 1000.0]))
+
+    np.testing.assert_array_equal(values, [0.0, 0.5, 1.0])
+
+
+@pytest.fixture(scope='module')
+def keras_model(tmp_path_factory):
+    pytest.importorskip('tensorflow')
+    from lstm_prediction_service.services.lstm_model import LSTMPredictor
+    from lstm_prediction_service.services.model_registry import ModelRegistry
+
+    model = LSTMPredictor(WINDOW, registry=ModelRegistry(str(tmp_path_factory.mktemp('models'))))._build_model((WINDOW, 1))
+    # Weights larger than the initial ones, so the gates leave their linear range
+    rng = np.random.default_rng(0)
+    model.set_weights([rng.normal(0, 0.3, weights.shape).astype(weights.dtype) for weights in model.get_weights()])
+    return model
+
+
+def test_export_reproduces_the_keras_model(keras_model):
+    exported = NumpyLSTM.from_keras(keras_model)
+    windows = np.random.default_rng(2).random((257, WINDOW, 1), dtype=np.float32)
+
+    expected = np.asarray(keras_model.predict_on_batch(windows))
+
+    assert exported.predict_on_batch(windows).shape == (257, 1)
+    np.testing.assert_allclose(exported.predict_on_batch(windows), expected, rtol=0, atol=EXPORT_TOLERANCE)
+    assert exported.max_error(keras_model, WINDOW) <= EXPORT_TOLERANCE
+
+
+def test_saved_exports_load_with_their_scaler(keras_model, tmp_path):
+    exported = NumpyLSTM.from_keras(keras_model)
+    scaler = NumpyMinMaxScaler(np.array([-0.5]), np.array([0.01]))
+    windows = np.random.default_rng(3).random((8, WINDOW, 1))
+
+    exported.save(str(tmp_path / 'model.npz'), scaler)
+    loaded, loaded_scaler = NumpyLSTM.load(str(tmp_path / 'model.npz'))
+
+    np.testing.assert_array_equal(loaded.predict_on_batch(windows), exported.predict_on_batch(windows))
+    np.testing.assert_array_equal(loaded_scaler.min_, scaler.min_)
+    np.testing.assert_array_equal(loaded_scaler.scale_, scaler.scale_)
+
+
+def test_models_with_other_layers_are_not_exported():
+    pytest.importorskip('tensorflow')
+    from keras._tf_keras.keras.layers import GRU, LSTM, Dense, Input
+    from keras._tf_keras.keras.models import Sequential
+
+    with pytest.raises(ValueError, match='type GRU'):
+        NumpyLSTM.from_keras(Sequential([Input((5, 1)), GRU(4), Dense(1)]))
+    with pytest.raises(ValueError, match='activations'):
+        NumpyLSTM.from_keras(Sequential([Input((5, 1)), LSTM(4, activation='relu'), Dense(1)]))
+    with pytest.raises(ValueError, match='Dense layer'):
+        NumpyLSTM.from_keras(Sequential([Input((5, 1)), LSTM(4)]))
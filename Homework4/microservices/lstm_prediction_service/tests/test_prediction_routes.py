@@ -0,0 +1,162 @@
+import importlib
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from lstm_prediction_service.services.price_store import PriceStore
+from lstm_prediction_service.utils.wire_format import NPZ_MIMETYPE, encode_payload
+
+
+def typed_frame(days=30):
+    price = 100 + np.arange(days, dtype=float)
+    frame = pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=days, freq='D'), 'Last trade price': price,
+        'Max': price, 'Min': price, 'Avg Price': price, '%chg.': np.zeros(days),
+        'Volume': np.ones(days, dtype='int64'), 'TurnoverBEST_MKD': price, 'TotalTurnoverMKD': price
+    })
+    frame.loc[5, ['Last trade price', 'Max', 'Min', 'Avg Price']] = np.nan
+    return frame
+
+
+class RecordingBatcher:
+    def __init__(self):
+        self.frames = []
+
+    def predict(self, data, ticker=None, timeout=None):
+        self.frames.append((ticker, data))
+        return {'rows': len(data)}
+
+
+@pytest.fixture
+def routes(tmp_path, monkeypatch):
+    # Importing the routes creates their default store under ./data and registry under ./models
+    monkeypatch.chdir(tmp_path)
+    routes = importlib.import_module('lstm_prediction_service.routes.prediction_routes')
+    store = PriceStore(str(tmp_path / 'shared'))
+    store.write_frame('ALK', typed_frame())
+    monkeypatch.setattr(routes, 'store', store)
+    monkeypatch.setattr(routes, 'batcher', RecordingBatcher())
+    return routes
+
+
+@pytest.fixture
+def client(routes):
+    app = Flask(__name__)
+    app.register_blueprint(routes.prediction_bp)
+    return app.test_client()
+
+
+def test_a_ticker_range_is_loaded_from_the_store(routes, client):
+    response = client.post('/api/lstm/predict', json={'ticker': 'ALK', 'date_from': '2024-01-03', 'date_to': '2024-01-10'})
+
+    assert response.get_json() == {'rows': 7}
+    ticker, frame = routes.batcher.frames[0]
+    assert ticker == 'ALK'
+    assert frame['Last trade price'].tolist() == [102, 103, 104, 106, 107, 108, 109]
+
+
+@pytest.mark.parametrize('npz', [False, True])
+def test_the_dashboard_body_with_empty_historical_data_loads_the_ticker(routes, client, npz):
+    body = {'ticker': 'ALK', 'date_from': '2024-01-03', 'date_to': '2024-01-10', 'historical_data': []}
+
+    if npz:
+        response = client.post('/api/lstm/predict', data=encode_payload(body), content_type=NPZ_MIMETYPE)
+    else:
+        response = client.post('/api/lstm/predict', json=body)
+
+    assert response.status_code == 200
+    assert routes.batcher.frames[0][1]['Last trade price'].tolist() == [102, 103, 104, 106, 107, 108, 109]
+
+
+@pytest.mark.parametrize('npz', [False, True])
+def test_training_with_empty_historical_data_trains_on_the_ticker(routes, client, monkeypatch, npz):
+    trained = []
+    monkeypatch.setattr(routes.predictor, 'train_in_background', lambda df, ticker: trained.append((ticker, len(df))) or True)
+    body = {'ticker': 'ALK', 'historical_data': []}
+
+    if npz:
+        response = client.post('/api/lstm/train', data=encode_payload(body), content_type=NPZ_MIMETYPE)
+    else:
+        response = client.post('/api/lstm/train', json=body)
+
+    assert response.status_code == 202
+    assert trained == [('ALK', 29)]
+
+
+@pytest.mark.parametrize('ticker', ['XYZ', '../ALK', 'alk', 7])
+def test_unknown_or_invalid_tickers_are_not_found(routes, client, ticker):
+    response = client.post('/api/lstm/predict', json={'ticker': ticker})
+
+    assert response.status_code == 404
+    assert routes.batcher.frames == []
+
+
+@pytest.mark.parametrize('ticker', ['../ALK', 'A LK'])
+def test_invalid_tickers_are_rejected_with_posted_data(routes, client, ticker):
+    # The ticker names the model files even when the prices are posted
+    response = client.post('/api/lstm/predict', json={'ticker': ticker, 'historical_data': [{'Last trade price': 1.0}]})
+
+    assert response.status_code == 404
+    assert routes.batcher.frames == []
+
+
+@pytest.mark.parametrize('items, names', [
+    ([{'ticker': 'ALK'}, {'ticker': 'KMB'}], ['ALK', 'KMB']),
+    ([{'ticker': 'ALK'}, {'ticker': 'ALK'}], ['ALK', 'ALK#1']),
+    ([{'ticker': 'ALK'}, {'ticker': 'ALK'}, {'id': 'ALK#1'}], ['ALK', 'ALK#1#1', 'ALK#1']),
+    ([{'id': 'a', 'ticker': 'ALK'}, {}, {'company': 'KMB'}], ['a', '1', 'KMB']),
+])
+def test_batch_result_names_are_unique(routes, items, names):
+    assert routes._result_names(items) == names
+
+
+class BlockingBatcher:
+    """Answers every ticker except those in `slow`, whose futures never finish."""
+
+    def __init__(self, slow):
+        self.slow = slow
+
+    def submit(self, data, ticker=None):
+        future = Future()
+        if ticker not in self.slow:
+            future.set_result({'rows': len(data)})
+        return future
+
+
+def batch(client, tickers):
+    items = [{'ticker': ticker, 'historical_data': [{'Last trade price': 1.0}]} for ticker in tickers]
+    return client.post('/api/lstm/predict_batch', json={'requests': items})
+
+
+def test_batch_items_that_time_out_get_their_own_error(routes, client, monkeypatch):
+    monkeypatch.setattr(routes, 'PREDICT_TIMEOUT', 0.1)
+    monkeypatch.setattr(routes, 'batcher', BlockingBatcher({'KMB'}))
+
+    response = batch(client, ['ALK', 'KMB', 'ALK', '../x'])
+
+    assert response.status_code == 200
+    assert response.get_json()['results'] == {
+        'ALK': {'rows': 1}, 'KMB': {'error': 'Prediction timed out'},
+        'ALK#2': {'rows': 1}, '../x': {'error': 'Unknown ticker'}
+    }
+
+
+def test_a_batch_where_every_item_times_out_is_unavailable(routes, client, monkeypatch):
+    monkeypatch.setattr(routes, 'PREDICT_TIMEOUT', 0.1)
+    monkeypatch.setattr(routes, 'batcher', BlockingBatcher({'ALK', 'KMB'}))
+
+    response = batch(client, ['ALK', 'KMB'])
+
+    assert response.status_code == 503
+
+
+def test_a_single_prediction_that_times_out_is_unavailable(routes, client, monkeypatch):
+    monkeypatch.setattr(routes, 'PREDICT_TIMEOUT', 0.1)
+    batcher = BlockingBatcher({'ALK'})
+    batcher.predict = lambda data, ticker=None, timeout=None: batcher.submit(data, ticker).result(timeout)
+    monkeypatch.setattr(routes, 'batcher', batcher)
+
+    response = client.post('/api/lstm/predict', json={'ticker': 'ALK', 'historical_data': [{'Last trade price': 1.0}]})
+
+    assert response.status_code == 503
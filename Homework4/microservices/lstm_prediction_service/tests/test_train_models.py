@@ -0,0 +1,87 @@
+import importlib
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def script_modules():
+    return [name for name in sys.modules if name in ('train_models', 'services') or name.startswith('services.')]
+
+
+@pytest.fixture
+def train_models(monkeypatch):
+    # The script runs from the service directory and imports `services` from there, a name
+    # every service uses, so it is only importable for the duration of a test
+    for name in script_modules():
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.syspath_prepend(SERVICE_DIR)
+    yield importlib.import_module('train_models')
+    for name in script_modules():
+        del sys.modules[name]
+
+
+def typed_frame(days):
+    price = 100 + np.arange(days, dtype=float)
+    return pd.DataFrame({
+        'Date': pd.date_range('2020-01-01', periods=days, freq='D'), 'Last trade price': price,
+        'Max': price, 'Min': price, 'Avg Price': price, '%chg.': np.zeros(days),
+        'Volume': np.ones(days, dtype='int64'), 'TurnoverBEST_MKD': price, 'TotalTurnoverMKD': price
+    })
+
+
+@pytest.fixture
+def store(train_models, tmp_path):
+    store = train_models.PriceStore(str(tmp_path / 'data'))
+    for ticker, days in (('ALK', 100), ('KMB', 30), ('TEL', 200)):
+        store.write_frame(ticker, typed_frame(days))
+    # Only a CSV so far: plan converts it
+    store.write_csv('ADIN', typed_frame(80))
+    return store
+
+
+def test_plan_skips_short_histories_and_orders_largest_first(train_models, store):
+    jobs = train_models.plan(store, ['ADIN', 'ALK', 'KMB', 'TEL'], window_size=60)
+
+    assert jobs == [('TEL', 200), ('ALK', 100), ('ADIN', 80)]
+    assert store.has_ticker('ADIN')
+
+
+class FakePredictor:
+    window_size = 60
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.trained = []
+
+    def train(self, data, ticker):
+        self.trained.append((ticker, len(data)))
+        return {'rmse': 1.25}
+
+
+@pytest.mark.parametrize('stored, force, status', [
+    (False, False, 'trained'), (True, False, 'up to date'), (True, True, 'trained')
+])
+def test_train_ticker_skips_data_that_already_has_a_model(train_models, store, monkeypatch, tmp_path, stored, force, status):
+    registry = importlib.import_module('services.model_registry').ModelRegistry(str(tmp_path / 'models'))
+    monkeypatch.setattr(registry, 'has', lambda ticker, window_size, fingerprint: stored)
+    predictor = FakePredictor(registry)
+    monkeypatch.setattr(train_models, '_predictor', predictor)
+
+    report = train_models.train_ticker('ALK', store.data_dir, force)
+
+    assert report['status'] == status
+    assert report['rows'] == 100
+    assert predictor.trained == ([('ALK', 100)] if status == 'trained' else [])
+    assert report['rmse'] == (1.25 if status == 'trained' else None)
+
+
+def test_format_report_lines(train_models):
+    trained = {'ticker': 'ALK', 'rows': 2449, 'status': 'trained', 'rmse': 312.456, 'seconds': 41.23}
+    failed = {'ticker': 'KMB', 'rows': None, 'status': 'failed: out of memory', 'rmse': None, 'seconds': None}
+
+    assert train_models.format_report(trained) == 'ALK        2449 rows    41.2s  RMSE     312.46  trained'
+    assert train_models.format_report(failed) == 'KMB           - rows        -  RMSE          -  failed: out of memory'
@@ -0,0 +1,126 @@
+"""Train LSTM models for many tickers in parallel and store them in the model registry.
+
+Every worker process trains one ticker at a time with its TensorFlow thread pools
+pinned to --threads, so workers x threads matches the cores instead of every worker
+spreading over all of them. Tickers whose data already has a model are skipped
+unless --force is given, which keeps nightly runs to the tickers that changed.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+from services.price_store import PriceStore
+
+# One predictor per worker process, created after TensorFlow's threads are pinned
+_predictor = None
+
+
+def init_worker(threads: int, window_size: int, model_dir: str):
+    # Must run before TensorFlow is imported or has executed anything in this process
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    from services.lstm_model import LSTMPredictor
+    from services.model_registry import ModelRegistry
+
+    global _predictor
+    _predictor = LSTMPredictor(window_size=window_size, registry=ModelRegistry(model_dir))
+
+
+def train_ticker(ticker: str, data_dir: str, force: bool) -> dict:
+    """Train one ticker in a worker process and return its report line."""
+    start = time.perf_counter()
+    data = PriceStore(data_dir).load_frame(ticker, ['Date', 'Last trade price']).dropna()
+    fingerprint = _predictor.registry.fingerprint(data[['Last trade price']].values.astype(float))
+
+    if not force and _predictor.registry.has(ticker, _predictor.window_size, fingerprint):
+        return {'ticker': ticker, 'rows': len(data), 'status': 'up to date', 'rmse': None,
+                'seconds': time.perf_counter() - start}
+
+    results = _predictor.train(data, ticker)
+    return {'ticker': ticker, 'rows': len(data), 'status': 'trained', 'rmse': results['rmse'],
+            'seconds': time.perf_counter() - start}
+
+
+def plan(store: PriceStore, tickers: List[str], window_size: int) -> List[Tuple[str, int]]:
+    """Tickers with enough data and their row counts, largest first.
+
+    Converting stale CSVs happens here, once, and starting the longest jobs first
+    keeps one big ticker from finishing alone at the end of the run.
+    """
+    jobs = []
+    for ticker in tickers:
+        rows = len(store.load_frame(ticker, ['Last trade price']).dropna())
+        if rows <= window_size:
+            print(f"Skipping {ticker}: not enough data points")
+            continue
+        jobs.append((ticker, rows))
+    return sorted(jobs, key=lambda job: job[1], reverse=True)
+
+
+def train_all(tickers: List[str], data_dir: str, model_dir: str, window_size: int,
+              workers: int, threads: int, force: bool) -> List[dict]:
+    jobs = plan(PriceStore(data_dir), tickers, window_size)
+    reports = []
+
+    # TensorFlow does not survive fork, so workers start from a fresh interpreter
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                             initargs=(threads, window_size, model_dir)) as pool:
+        futures = {pool.submit(train_ticker, ticker, data_dir, force): ticker for ticker, _ in jobs}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                report = {'ticker': ticker, 'rows': None, 'status': f'failed: {e}', 'rmse': None, 'seconds': None}
+            reports.append(report)
+            print(format_report(report), flush=True)
+
+    return reports
+
+
+def format_report(report: dict) -> str:
+    rmse = f"{report['rmse']:.2f}" if report['rmse'] is not None else '-'
+    seconds = f"{report['seconds']:.1f}s" if report['seconds'] is not None else '-'
+    rows = report['rows'] if report['rows'] is not None else '-'
+    return f"{report['ticker']:8} {rows:>6} rows {seconds:>8}  RMSE {rmse:>10}  {report['status']}"
+
+
+def main(argv: Optional[List[str]] = None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('tickers', nargs='*', help='Tickers to train (default: every ticker in --data-dir)')
+    parser.add_argument('--window-size', type=int, default=60)
+    parser.add_argument('--data-dir', default='./data')
+    parser.add_argument('--model-dir', default='./models')
+    parser.add_argument('--threads', type=int, default=1, help='TensorFlow threads per worker')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: cores / threads)')
+    parser.add_argument('--force', action='store_true', help='Retrain tickers that already have a model')
+    args = parser.parse_args(argv)
+
+    workers = args.workers or max(1, cores // args.threads)
+    tickers = args.tickers or PriceStore(args.data_dir).tickers()
+    print(f"Training {len(tickers)} tickers with {workers} workers x {args.threads} threads on {cores} cores")
+
+    start = time.perf_counter()
+    reports = train_all(tickers, args.data_dir, args.model_dir, args.window_size, workers, args.threads, args.force)
+    wall = time.perf_counter() - start
+
+    trained = [report for report in reports if report['status'] == 'trained']
+    busy = sum(report['seconds'] for report in reports if report['seconds'] is not None)
+    print(f"Trained {len(trained)}, up to date {sum(report['status'] == 'up to date' for report in reports)}, "
+          f"failed {sum(report['status'].startswith('failed') for report in reports)}")
+    print(f"Wall time {wall:.1f}s, training time {busy:.1f}s, parallel speed-up {busy / wall if wall else 0:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 from flask import Flask
-from routes.scraper_routes import scraper_bp
+from routes.scraper_routes import jobs, scraper_bp
 
 app = Flask(__name__)
 app.register_blueprint(scraper_bp)
 
 if __name__ == '__main__':
+    jobs.resume_unfinished()
     app.run(host='0.0.0.0', port=5004)
\ No newline at end of file
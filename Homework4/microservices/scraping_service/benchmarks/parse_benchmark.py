@@ -0,0 +1,102 @@
+"""Compare the BeautifulSoup row parser with the streaming lxml table parser.
+
+Run from the scraping_service directory:
+
+    python -m benchmarks.parse_benchmark [saved mse.mk pages ...]
+
+Without pages, yearly pages are synthesized from the CSVs in --data-dir using the
+symbol history table layout. Real pages carry more markup around the table, so the
+synthesized ones understate the BeautifulSoup cost.
+"""
+import argparse
+import html
+import os
+import time
+from typing import Callable, List
+import pandas as pd
+from bs4 import BeautifulSoup
+from services.scraper import StockScraper
+
+ROWS_PER_PAGE = 250
+
+
+def bs4_parse(scraper: StockScraper, page: bytes) -> pd.DataFrame:
+    """The previous parse path of scrape_data_from_url."""
+    soup = BeautifulSoup(page.decode('utf-8'), 'html.parser')
+    rows = soup.find_all('tbody')[0].find_all('tr') if soup.find_all('tbody') else []
+    return pd.DataFrame([scraper.parse_cells(row) for row in rows])
+
+
+def render_page(rows: pd.DataFrame) -> bytes:
+    header = ''.join(f'<th>{html.escape(column)}</th>' for column in rows.columns)
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in row) + '</tr>\n'
+        for row in rows.itertuples(index=False)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Symbol history</title></head><body>'
+        f'<table id="resultsTable" class="table"><thead><tr>{header}</tr></thead><tbody>\n{body}</tbody></table>'
+        '</body></html>'
+    ).encode('utf-8')
+
+
+def synthesize_pages(data_dir: str, limit: int) -> List[bytes]:
+    pages = []
+    for file in sorted(os.listdir(data_dir)):
+        if not file.endswith('.csv'):
+            continue
+        data = pd.read_csv(os.path.join(data_dir, file), dtype=str, keep_default_na=False)
+        for start in range(0, len(data), ROWS_PER_PAGE):
+            pages.append(render_page(data.iloc[start:start + ROWS_PER_PAGE][StockScraper.COLUMNS]))
+            if len(pages) == limit:
+                return pages
+    return pages
+
+
+def best_time(parse: Callable[[bytes], pd.DataFrame], pages: List[bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            parse(page)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help='Saved symbol history pages')
+    parser.add_argument('--data-dir', default='./data')
+    parser.add_argument('--limit', type=int, default=200, help='Pages to synthesize')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scraper = StockScraper()
+    if args.pages:
+        pages = []
+        for path in args.pages:
+            with open(path, 'rb') as f:
+                pages.append(f.read())
+    else:
+        pages = synthesize_pages(args.data_dir, args.limit)
+    if not pages:
+        parser.error('no pages given and no CSVs found to synthesize them from')
+
+    for page in pages:
+        pd.testing.assert_frame_equal(scraper.parse_table(page), bs4_parse(scraper, page))
+
+    rows = sum(len(scraper.parse_table(page)) for page in pages)
+    results = {
+        'BeautifulSoup (html.parser)': best_time(lambda page: bs4_parse(scraper, page), pages, args.repeat),
+        'lxml streaming': best_time(scraper.parse_table, pages, args.repeat)
+    }
+
+    print(f"{len(pages)} pages, {rows} rows, identical output")
+    for name, seconds in results.items():
+        print(f"{name:28} {seconds * 1000 / len(pages):8.2f} ms/page  {rows / seconds:10.0f} rows/s")
+    baseline, fast = results.values()
+    print(f"Speed-up: {baseline / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""Local stand-in for the mse.mk symbol history pages, for scraping without the network.
+
+Run from the scraping_service directory:
+
+    python -m benchmarks.replay_server --data-dir ../../../data --latency 0.05 --rate-limit 20
+
+Serves the two pages the scraper reads, under the same paths as www.mse.mk:
+
+- /en/stats/symbolhistory/<TICKER> without a date range: the page whose company
+  dropdown fetch_companies reads, listing every ticker found in --data-dir.
+- /en/stats/symbolhistory/<TICKER>?FromDate=&ToDate=: the history table of that range.
+  A page recorded in --fixtures is served as is; otherwise the rows are cut from the
+  ticker's CSV in --data-dir, which holds the values as the site formatted them.
+
+With --record URL, ranges missing from --fixtures are fetched from that upstream once
+and saved, so later runs replay them offline. Latency, errors and throttling are
+injected per request, and /_stats reports what was served.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+import pandas as pd
+from aiohttp import web
+from benchmarks.parse_benchmark import render_page
+from services.scraper import StockScraper
+
+HISTORY_PATH = '/en/stats/symbolhistory/{ticker}'
+DATE_FORMAT = '%m/%d/%Y'
+
+
+class ReplayServer:
+    def __init__(
+            self,
+            data_dir: str,
+            fixtures_dir: Optional[str] = None,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            rate_limit: Optional[float] = None,
+            max_concurrent: Optional[int] = None,
+            limit: Optional[int] = None,
+            record_url: Optional[str] = None
+    ):
+        self.fixtures_dir = fixtures_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.max_concurrent = max_concurrent
+        self.record_url = record_url
+        self.histories = self._load_histories(data_dir, limit)
+        self.pages: Dict[Tuple[str, str, str], bytes] = {}
+        self.statuses = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._tokens = rate_limit or 0.0
+        self._updated = time.monotonic()
+
+    @staticmethod
+    def _load_histories(data_dir: str, limit: Optional[int]) -> Dict[str, Tuple[pd.Series, Tuple[bytes, List[bytes], bytes]]]:
+        """Every ticker's parsed dates and its whole table rendered once, as the site formats the values.
+
+        A range's page only has to slice that table, so serving stays cheap next to the scraper.
+        """
+        histories = {}
+        for file in sorted(os.listdir(data_dir)):
+            if not file.endswith('.csv'):
+                continue
+            data = pd.read_csv(os.path.join(data_dir, file), dtype=str, keep_default_na=False)
+            page = render_page(data[StockScraper.COLUMNS])
+            head, _, rest = page.partition(b'<tbody>\n')
+            rows, _, tail = rest.rpartition(b'</tbody>')
+            histories[file[:-len('.csv')]] = (
+                pd.to_datetime(data['Date'], format=DATE_FORMAT, errors='coerce'),
+                (head + b'<tbody>\n', rows.splitlines(keepends=True), b'</tbody>' + tail)
+            )
+            if len(histories) == limit:
+                break
+        return histories
+
+    def _fixture_path(self, ticker: str, date_from: str, date_to: str) -> Optional[str]:
+        if not self.fixtures_dir:
+            return None
+        name = f"{date_from.replace('/', '-')}_{date_to.replace('/', '-')}.html"
+        return os.path.join(self.fixtures_dir, ticker, name)
+
+    def company_list_page(self) -> bytes:
+        options = ''.join(f'<option value="{ticker}">{ticker}</option>' for ticker in self.histories)
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Symbol history</title></head><body>'
+            f'<select id="Code" name="Code" class="form-control">{options}</select>'
+            '</body></html>'
+        ).encode('utf-8')
+
+    def history_page(self, ticker: str, date_from: str, date_to: str) -> Optional[bytes]:
+        key = (ticker, date_from, date_to)
+        if key in self.pages:
+            return self.pages[key]
+
+        fixture = self._fixture_path(ticker, date_from, date_to)
+        if fixture and os.path.exists(fixture):
+            with open(fixture, 'rb') as f:
+                page = f.read()
+        elif ticker in self.histories:
+            days, (head, rows, tail) = self.histories[ticker]
+            start = pd.to_datetime(date_from, format=DATE_FORMAT)
+            end = pd.to_datetime(date_to, format=DATE_FORMAT)
+            selected = ((days >= start) & (days <= end)).to_numpy()
+            page = head + b''.join(row for row, keep in zip(rows, selected) if keep) + tail
+        else:
+            return None
+
+        self.pages[key] = page
+        return page
+
+    async def record(self, ticker: str, date_from: str, date_to: str) -> Optional[bytes]:
+        """Fetch a range from the upstream site and keep it as a fixture."""
+        url = f"{self.record_url}{HISTORY_PATH.format(ticker=ticker)}"
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, params={'FromDate': date_from, 'ToDate': date_to}) as response:
+                if response.status != 200:
+                    return None
+                page = await response.read()
+
+        fixture = self._fixture_path(ticker, date_from, date_to)
+        os.makedirs(os.path.dirname(fixture), exist_ok=True)
+        with open(fixture, 'wb') as f:
+            f.write(page)
+        self.pages[(ticker, date_from, date_to)] = page
+        return page
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def _reply(self, status: int, body: bytes = b'', headers: Optional[dict] = None) -> web.Response:
+        self.statuses[status] += 1
+        return web.Response(status=status, body=body, headers=headers, content_type='text/html')
+
+    async def handle_history(self, request: web.Request) -> web.Response:
+        if self.rate_limit and not self._take_token():
+            return self._reply(429, headers={'Retry-After': '1'})
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return self._reply(429, headers={'Retry-After': '1'})
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            delay = self.latency + random.uniform(-self.jitter, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if random.random() < self.error_rate:
+                return self._reply(500)
+
+            ticker = request.match_info['ticker']
+            date_from = request.query.get('FromDate')
+            date_to = request.query.get('ToDate')
+            if not date_from or not date_to:
+                return self._reply(200, self.company_list_page())
+
+            page = self.history_page(ticker, date_from, date_to)
+            if page is None and self.record_url:
+                page = await self.record(ticker, date_from, date_to)
+            if page is None:
+                return self._reply(404)
+            return self._reply(200, page)
+        finally:
+            self.in_flight -= 1
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'peak_in_flight': self.peak_in_flight,
+            'tickers': len(self.histories)
+        })
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(HISTORY_PATH, self.handle_history)
+        app.router.add_get('/_stats', self.handle_stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--data-dir', default='./data', help='CSVs to serve history pages from')
+    parser.add_argument('--fixtures', help='Directory of recorded pages, <TICKER>/<from>_<to>.html')
+    parser.add_argument('--record', metavar='URL', help='Upstream to record missing ranges from, e.g. https://www.mse.mk')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Latency varies by up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with HTTP 500')
+    parser.add_argument('--rate-limit', type=float, help='Requests per second before answering HTTP 429')
+    parser.add_argument('--max-concurrent', type=int, help='Requests in flight before answering HTTP 429')
+    parser.add_argument('--limit', type=int, help='Only list the first N tickers')
+    args = parser.parse_args()
+
+    if args.record and not args.fixtures:
+        parser.error('--record needs --fixtures to save pages to')
+
+    server = ReplayServer(
+        args.data_dir, args.fixtures, args.latency, args.jitter, args.error_rate,
+        args.rate_limit, args.max_concurrent, args.limit, args.record
+    )
+    print(f"Replaying {len(server.histories)} tickers on http://{args.host}:{args.port}", flush=True)
+    web.run_app(server.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Drive the scraper against the local replay server and measure it.
+
+Run from the scraping_service directory:
+
+    python -m benchmarks.scrape_benchmark --data-dir ../../../data --latency 0.05 --modes async sequential
+
+Every mode gets a fresh replay server in its own process, so the CPU time measured
+here is the scraper's alone, and writes its CSVs and store to a temporary directory.
+
+- async: fetch_all_companies_data, the rate-limited asyncio crawl.
+- sequential: every date range requested and parsed one after another, as
+  fetch_data_for_company does, for a baseline.
+
+Reported per mode: pages/sec, p50/p99 request latency and CPU milliseconds per page.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+import numpy as np
+import requests
+from services.scraper import StockScraper
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    command = [
+        sys.executable, '-m', 'benchmarks.replay_server', '--port', str(port),
+        '--data-dir', os.path.abspath(args.data_dir),
+        '--latency', str(args.latency), '--jitter', str(args.jitter), '--error-rate', str(args.error_rate)
+    ]
+    for flag, value in (('--rate-limit', args.rate_limit), ('--max-concurrent', args.max_concurrent),
+                        ('--limit', args.companies), ('--fixtures', args.fixtures)):
+        if value is not None:
+            command += [flag, str(os.path.abspath(value) if flag == '--fixtures' else value)]
+
+    server = subprocess.Popen(command, cwd=SERVICE_DIR, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}/_stats', timeout=1)
+            return server
+        except requests.ConnectionError:
+            if server.poll() is not None:
+                raise RuntimeError('replay server exited during startup')
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('replay server did not start within 60s')
+
+
+def run_async(scraper: StockScraper, years_back: int) -> List[float]:
+    scraper.fetch_all_companies_data(years_back=years_back)
+    return scraper.crawler.latencies
+
+
+def run_sequential(scraper: StockScraper, years_back: int) -> List[float]:
+    latencies = []
+    for company in scraper.fetch_companies():
+        ranges, last_date = scraper.plan_company(company, years_back)
+        frames = []
+        for date_from, date_to in ranges:
+            start = time.monotonic()
+            response = requests.get(f"{scraper.base_url}{company}",
+                                    params={'FromDate': date_from, 'ToDate': date_to}, timeout=(30, 120))
+            latencies.append(time.monotonic() - start)
+            if response.status_code == 200:
+                frame = scraper.parse_table(response.content)
+                if not frame.empty:
+                    frames.append(frame)
+        scraper.save_company(company, frames, last_date)
+    return latencies
+
+
+MODES = {'async': run_async, 'sequential': run_sequential}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    return float(np.percentile(values, q)) * 1000 if values else None
+
+
+def benchmark(mode: str, args: argparse.Namespace) -> dict:
+    port = free_port()
+    server = start_server(args, port)
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            scraper = StockScraper()
+            scraper.base_url = scraper.crawler.base_url = f'http://127.0.0.1:{port}/en/stats/symbolhistory/'
+            scraper.crawler.concurrency = args.concurrency
+            scraper.crawler.rate = scraper.crawler.burst = args.crawl_rate
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            latencies = MODES[mode](scraper, args.years_back)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            os.chdir(cwd)
+
+        served = requests.get(f'http://127.0.0.1:{port}/_stats', timeout=5).json()
+    finally:
+        os.chdir(cwd)
+        server.terminate()
+        server.wait()
+
+    pages = served['statuses'].get('200', 0)
+    return {
+        'mode': mode,
+        'pages': pages,
+        'wall': wall,
+        'pages_per_sec': pages / wall,
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'cpu_ms_per_page': cpu * 1000 / pages if pages else None,
+        'statuses': served['statuses'],
+        'peak_in_flight': served['peak_in_flight']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=['async', 'sequential'])
+    parser.add_argument('--data-dir', default='./data', help='CSVs the replay server serves')
+    parser.add_argument('--fixtures', help='Recorded pages for the replay server')
+    parser.add_argument('--companies', type=int, default=20, help='Tickers the replay server lists')
+    parser.add_argument('--years-back', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, help='Server side requests per second')
+    parser.add_argument('--max-concurrent', type=int, help='Server side requests in flight')
+    parser.add_argument('--concurrency', type=int, default=16, help='Crawler requests in flight')
+    parser.add_argument('--crawl-rate', type=float, default=8.0, help='Crawler requests per second')
+    args = parser.parse_args()
+
+    print(f"{'mode':12} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'CPU ms/page':>12}  responses")
+    for mode in args.modes:
+        result = benchmark(mode, args)
+        fmt = lambda value: f"{value:.1f}" if value is not None else '-'
+        print(
+            f"{result['mode']:12} {result['pages']:6d} {result['wall']:8.1f} {result['pages_per_sec']:8.1f} "
+            f"{fmt(result['p50_ms']):>8} {fmt(result['p99_ms']):>8} {fmt(result['cpu_ms_per_page']):>12}  "
+            f"{result['statuses']} peak in flight {result['peak_in_flight']}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,19 @@
 from flask import Blueprint, request, jsonify
 from ..services.scraper import StockScraper
+from ..services.scrape_jobs import ScrapeJobManager
 
 scraper_bp = Blueprint('scraper', __name__)
 scraper = StockScraper()
+# Unfinished jobs are resumed by app.py once the server starts, not on import
+jobs = ScrapeJobManager(scraper.crawler, scraper.fetch_companies, scraper.plan_company, scraper.save_company)
+
+def _as_bool(value):
+    """JSON booleans as they are and "true"/"false" like the query string; anything else is None."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return None
 
 @scraper_bp.route('/health', methods=['GET'])
 def health_check():
@@ -20,7 +31,8 @@ def get_companies():
 def get_company_data(company):
     try:
         years = request.args.get('years', default=10, type=int)
-        data = scraper.fetch_data_for_company(company, years)
+        incremental = request.args.get('incremental', default='false').lower() == 'true'
+        data = scraper.fetch_data_for_company(company, years, incremental)
         return jsonify(data), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -28,8 +40,36 @@ def get_company_data(company):
 @scraper_bp.route('/api/scraper/refresh', methods=['POST'])
 def refresh_data():
     try:
-        years = request.json.get('years', 10)
-        results = scraper.fetch_all_companies_data(years)
-        return jsonify(results), 200
+        options = request.get_json(silent=True) or {}
+        years = options.get('years', 10)
+        incremental = _as_bool(options.get('incremental', True))
+        if incremental is None:
+            return jsonify({"error": "incremental must be true or false"}), 400
+        job = jobs.start(years, incremental)
+        return jsonify({**job, "status_url": f"/api/scraper/jobs/{job['id']}"}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@scraper_bp.route('/api/scraper/jobs', methods=['GET'])
+def list_jobs():
+    try:
+        return jsonify({"jobs": jobs.jobs()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@scraper_bp.route('/api/scraper/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job), 200
+
+@scraper_bp.route('/api/scraper/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    try:
+        job = jobs.resume(job_id)
+        if job is None:
+            return jsonify({"error": "Unknown job"}), 404
+        return jsonify(job), 202
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,18 +1,28 @@
+import io
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
+from lxml import etree
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import os
 from typing import List, Dict, Optional
+from .async_crawler import AsyncCrawler
+from .price_store import PriceStore
 
 
 class StockScraper:
+    COLUMNS = [
+        'Date', 'Last trade price', 'Max', 'Min', 'Avg Price', '%chg.', 'Volume',
+        'TurnoverBEST_MKD', 'TotalTurnoverMKD'
+    ]
+
     def __init__(self):
         self.base_url = 'https://www.mse.mk/en/stats/symbolhistory/'
         self.data_dir = './data'
         os.makedirs(self.data_dir, exist_ok=True)
+        self.store = PriceStore(self.data_dir)
+        self.crawler = AsyncCrawler(self.base_url, self.parse_table)
 
     def fetch_companies(self) -> List[str]:
         """Fetch list of available companies."""
@@ -26,28 +36,45 @@ class StockScraper:
             if not any(char.isdigit() for char in name.text)
         ]
 
+    @staticmethod
+    def parse_number(value: str) -> float:
+        """Read a number written as 23,299.00; empty or malformed cells are NaN."""
+        try:
+            return float(value.strip().replace(',', ''))
+        except ValueError:
+            return float('nan')
+
+    def parse_row(self, cells: List[str]) -> list:
+        """Date text and numbers of one row's cells, in COLUMNS order."""
+        return [cells[0].strip()] + [self.parse_number(cell) for cell in cells[1:9]]
+
     def parse_cells(self, row) -> Dict:
         """Parse table row cells into structured data."""
-        cells = row.find_all('td')
-
-        def format_price(value: str) -> str:
-            try:
-                return "{:,.2f}".format(float(value.replace(',', '.'))).replace(
-                    ',', 'X').replace('.', ',').replace('X', '.')
-            except ValueError:
-                return value
-
-        return {
-            'Date': cells[0].text,
-            'Last trade price': format_price(cells[1].text),
-            'Max': format_price(cells[2].text),
-            'Min': format_price(cells[3].text),
-            'Avg Price': format_price(cells[4].text),
-            '%chg.': cells[5].text.replace('.', ','),
-            'Volume': cells[6].text,
-            'TurnoverBEST_MKD': format_price(cells[7].text),
-            'TotalTurnoverMKD': format_price(cells[8].text)
-        }
+        return dict(zip(self.COLUMNS, self.parse_row([cell.text for cell in row.find_all('td')])))
+
+    def parse_table(self, page: bytes) -> pd.DataFrame:
+        """Stream the rows of the page's first table body straight into column lists.
+
+        Rows are handled as lxml finishes parsing them and then freed, so no document
+        tree is kept around; the result matches parsing the rows with parse_cells.
+        """
+        columns = [[] for _ in self.COLUMNS]
+        for _, element in etree.iterparse(io.BytesIO(page), events=('end',), tag=('tr', 'tbody'), html=True):
+            if element.tag == 'tbody':
+                break
+            if element.getparent().tag == 'tbody':
+                # Cells without child elements are plain text, the common case on these pages
+                cells = [
+                    (cell.text or '') if len(cell) == 0 else ''.join(cell.itertext())
+                    for cell in element.iter('td')
+                ]
+                for column, value in zip(columns, self.parse_row(cells)):
+                    column.append(value)
+            element.clear()
+
+        if not columns[0]:
+            return pd.DataFrame()
+        return pd.DataFrame(dict(zip(self.COLUMNS, columns)))
 
     def scrape_data_from_url(
             self,
@@ -63,10 +90,7 @@ class StockScraper:
             try:
                 response = requests.get(url, timeout=(30, 120))
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    rows = soup.find_all('tbody')[0].find_all('tr') if soup.find_all('tbody') else []
-                    data = [self.parse_cells(row) for row in rows]
-                    return pd.DataFrame(data)
+                    return self.parse_table(response.content)
                 else:
                     print(f"Failed to fetch data for {company}: HTTP {response.status_code}")
                     return pd.DataFrame()
@@ -77,53 +101,93 @@ class StockScraper:
         print(f"Failed to fetch data for {company} after {retries} retries")
         return pd.DataFrame()
 
+    def _date_ranges(self, start: datetime, end: datetime) -> List[tuple]:
+        """Split [start, end] into yearly windows, newest first."""
+        ranges = []
+        date_to = end
+        while date_to >= start:
+            date_from = max(date_to - timedelta(days=365), start)
+            ranges.append((date_from.strftime("%m/%d/%Y"), date_to.strftime("%m/%d/%Y")))
+            date_to = date_from - timedelta(days=1)
+        return ranges
+
+    def _last_stored_date(self, output_path: str) -> Optional[datetime]:
+        """Return the newest date already stored for a company."""
+        if not os.path.exists(output_path):
+            return None
+
+        dates = pd.read_csv(output_path, usecols=['Date'])['Date']
+        latest = pd.to_datetime(dates, format='%m/%d/%Y', errors='coerce').max()
+        return None if pd.isna(latest) else latest.to_pydatetime()
+
+    def _merge_rows(self, new_data: pd.DataFrame, stored: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Merge freshly scraped rows into the stored ones, newest first."""
+        if stored is not None:
+            new_data = pd.concat([new_data, stored], ignore_index=True)
+
+        dates = pd.to_datetime(new_data['Date'], format='%m/%d/%Y', errors='coerce')
+        keep = ~dates.duplicated(keep='first')
+        order = dates[keep].sort_values(ascending=False, kind='stable').index
+        return new_data.loc[order].reset_index(drop=True)
+
+    def plan_company(self, company: str, years_back: int = 10, incremental: bool = False) -> tuple:
+        """Return the date ranges to request for a company and the newest date already stored."""
+        today = datetime.today()
+        output_path = os.path.join(self.data_dir, f'{company}.csv')
+
+        last_date = self._last_stored_date(output_path) if incremental else None
+        if last_date is not None:
+            start = last_date + timedelta(days=1)
+        else:
+            start = today - timedelta(days=365 * years_back)
+        return self._date_ranges(start, today), last_date
+
+    def save_company(self, company: str, company_data: List[pd.DataFrame], last_date: Optional[datetime]) -> Optional[str]:
+        """Merge scraped frames into the company's CSV and store."""
+        output_path = os.path.join(self.data_dir, f'{company}.csv')
+        if company_data:
+            new_data = pd.concat(company_data, ignore_index=True)
+            stored = pd.read_csv(output_path) if last_date is not None else None
+            # Older CSVs hold formatted strings; to_typed_frame reads both, so they are rewritten as numbers
+            typed = self.store.to_typed_frame(self._merge_rows(new_data, stored))
+            self.store.write_csv(company, typed)
+            self.store.write_frame(company, typed)
+            return output_path
+
+        return output_path if last_date is not None else None
+
     def fetch_data_for_company(
             self,
             company: str,
-            years_back: int = 10
+            years_back: int = 10,
+            incremental: bool = False
     ) -> Optional[str]:
-        """Fetch historical data for a single company."""
-        today = datetime.today()
-
-        company_data = []
-        for year in range(years_back):
-            date_to = today - timedelta(days=365 * year)
-            date_from = today - timedelta(days=365 * (year + 1))
+        """Fetch historical data for a single company.
 
-            date_to_str = date_to.strftime("%m/%d/%Y")
-            date_from_str = date_from.strftime("%m/%d/%Y")
+        With ``incremental`` set, only the days after the newest date already
+        stored in the company's CSV are requested and merged into it.
+        """
+        ranges, last_date = self.plan_company(company, years_back, incremental)
 
+        company_data = []
+        for date_from_str, date_to_str in ranges:
             yearly_data = self.scrape_data_from_url(company, date_from_str, date_to_str)
             if not yearly_data.empty:
                 company_data.append(yearly_data)
 
-        if company_data:
-            final_df = pd.concat(company_data, ignore_index=True)
-            output_path = os.path.join(self.data_dir, f'{company}.csv')
-            final_df.to_csv(output_path, index=False)
-            return output_path
-
-        return None
-
-    def fetch_all_companies_data(self, years_back: int = 10) -> Dict[str, str]:
-        """Fetch data for all companies using multiple threads."""
-        companies = self.fetch_companies()
-        results = {}
+        return self.save_company(company, company_data, last_date)
 
-        def worker(company: str) -> tuple:
+    def fetch_all_companies_data(self, years_back: int = 10, incremental: bool = False) -> Dict[str, str]:
+        """Fetch data for all companies, every date range as its own rate-limited request."""
+        plans = {}
+        for company in self.fetch_companies():
             try:
-                output_path = self.fetch_data_for_company(company, years_back)
-                return company, output_path
+                plans[company] = self.plan_company(company, years_back, incremental)
             except Exception as e:
-                print(f"Error while fetching data for {company}: {e}")
-                return company, None
-
-        max_threads = 10
-        with ThreadPoolExecutor(max_threads) as executor:
-            futures = [executor.submit(worker, company) for company in companies]
-            for future in as_completed(futures):
-                company, path = future.result()
-                if path:
-                    results[company] = path
-
-        return results
\ No newline at end of file
+                print(f"Error while planning data for {company}: {e}")
+
+        def save(company: str, frames: List[pd.DataFrame]) -> Optional[str]:
+            return self.save_company(company, frames, plans[company][1])
+
+        paths = self.crawler.run({company: ranges for company, (ranges, _) in plans.items()}, save)
+        return {company: path for company, path in paths.items() if path}
\ No newline at end of file
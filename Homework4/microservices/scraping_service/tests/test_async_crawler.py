@@ -0,0 +1,155 @@
+import asyncio
+import threading
+from collections import defaultdict
+import pandas as pd
+import pytest
+from aiohttp import web
+from scraping_service.services.async_crawler import AsyncCrawler, RateLimiter
+
+RANGES = [('01/01/2023', '12/31/2023'), ('01/01/2024', '11/08/2024')]
+
+
+@pytest.fixture
+def server():
+    """A local history server; queue statuses per (company, FromDate) in `script`, 200 otherwise."""
+    script, requests = defaultdict(list), []
+
+    async def history(request):
+        company, date_from = request.match_info['company'], request.query['FromDate']
+        requests.append((company, date_from))
+        status = script[company, date_from].pop(0) if script[company, date_from] else 200
+        if status != 200:
+            return web.Response(status=status, headers={'Retry-After': '0'})
+        return web.Response(body=f'{company} {date_from}'.encode())
+
+    app = web.Application()
+    app.router.add_get('/{company}', history)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield f'http://127.0.0.1:{port}/', script, requests
+
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def parse_page(body):
+    company, date_from = body.decode().split()
+    if company == 'BROKEN':
+        raise ValueError('All arrays must be of the same length')
+    # The site answers ranges without trades with an empty table
+    return pd.DataFrame() if company == 'EMPTY' else pd.DataFrame({'page': [date_from]})
+
+
+def crawl(base_url, plan, retries=2, unrecorded=()):
+    saved, fetched = {}, []
+
+    def save(company, frames):
+        saved[company] = [frame['page'].iloc[0] for frame in frames]
+        return company
+
+    def record(company, date_from, date_to, frame):
+        if (company, date_from) in unrecorded:
+            raise OSError('No space left on device')
+        fetched.append((company, date_from))
+
+    crawler = AsyncCrawler(base_url, parse_page, concurrency=4, rate=1000, burst=100, retries=retries)
+    results = crawler.run(plan, save, record)
+    return results, saved, fetched, crawler
+
+
+def test_every_range_is_fetched_and_saved_once_per_company(server):
+    base_url, script, requests = server
+
+    results, saved, fetched, crawler = crawl(base_url, {'ALK': RANGES, 'KMB': RANGES[:1]})
+
+    assert results == {'ALK': 'ALK', 'KMB': 'KMB'}
+    assert saved == {'ALK': ['01/01/2023', '01/01/2024'], 'KMB': ['01/01/2023']}
+    assert sorted(fetched) == sorted(requests) == [('ALK', '01/01/2023'), ('ALK', '01/01/2024'), ('KMB', '01/01/2023')]
+    assert crawler.stats()['requests'] == 3
+
+
+def test_throttled_requests_are_retried(server):
+    base_url, script, requests = server
+    script['ALK', '01/01/2024'] = [429, 503]
+
+    results, saved, fetched, crawler = crawl(base_url, {'ALK': RANGES})
+
+    assert saved == {'ALK': ['01/01/2023', '01/01/2024']}
+    assert requests.count(('ALK', '01/01/2024')) == 3
+    assert crawler.stats()['throttled'] == 2
+
+
+@pytest.mark.parametrize('statuses', [[404], [503, 503, 503]])
+def test_a_company_with_a_failed_range_is_not_saved(server, statuses):
+    base_url, script, requests = server
+    script['ALK', '01/01/2024'] = statuses
+
+    results, saved, fetched, crawler = crawl(base_url, {'ALK': RANGES, 'KMB': RANGES})
+
+    assert results == {'ALK': None, 'KMB': 'KMB'}
+    assert 'ALK' not in saved
+    # The range that did arrive is still reported
+    assert ('ALK', '01/01/2023') in fetched
+
+
+def test_a_page_that_fails_to_parse_only_fails_its_company(server):
+    base_url, script, requests = server
+
+    results, saved, fetched, crawler = crawl(base_url, {'BROKEN': RANGES, 'ALK': RANGES})
+
+    assert results == {'BROKEN': None, 'ALK': 'ALK'}
+    assert saved == {'ALK': ['01/01/2023', '01/01/2024']}
+    assert sorted(fetched) == [('ALK', '01/01/2023'), ('ALK', '01/01/2024')]
+
+
+def test_a_range_that_cannot_be_recorded_only_fails_its_company(server):
+    base_url, script, requests = server
+
+    results, saved, fetched, crawler = crawl(base_url, {'ALK': RANGES, 'KMB': RANGES},
+                                             unrecorded={('ALK', '01/01/2024')})
+
+    assert results == {'ALK': None, 'KMB': 'KMB'}
+    assert 'ALK' not in saved
+
+
+def test_empty_pages_are_left_out_of_the_saved_frames(server):
+    base_url, script, requests = server
+
+    results, saved, fetched, crawler = crawl(base_url, {'EMPTY': RANGES})
+
+    assert results == {'EMPTY': 'EMPTY'}
+    assert saved == {'EMPTY': []}
+
+
+def test_rate_limiter_halves_on_throttling_and_recovers_on_success():
+    limiter = RateLimiter(rate=8.0, burst=8)
+
+    limiter.on_throttle()
+    limiter.on_throttle()
+    # A burst of rejections within a second counts once
+    assert limiter.rate == 4.0
+    assert limiter.throttled == 2
+
+    for _ in range(100):
+        limiter.on_success(0.1)
+    assert limiter.rate == 8.0
+    assert limiter.latency == pytest.approx(0.1)
+
+
+def test_backoff_follows_retry_after_and_grows_with_attempts():
+    limiter = RateLimiter(rate=8.0, burst=8)
+
+    assert limiter.backoff_delay(0, retry_after='3') == 3.0
+    # Twice the assumed 0.5 s latency before any was measured, jittered by 0.5-1.5x
+    assert 0.5 <= limiter.backoff_delay(0) <= 1.5
+    assert 2.0 <= limiter.backoff_delay(2) <= 6.0
+    assert limiter.backoff_delay(20) == 60.0
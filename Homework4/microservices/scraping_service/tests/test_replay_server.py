@@ -0,0 +1,123 @@
+import io
+import os
+import socket
+import subprocess
+import sys
+import time
+import pandas as pd
+import pytest
+import requests
+from scraping_service.services.scraper import StockScraper
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV = (
+    'Date,Last trade price,Max,Min,Avg Price,%chg.,Volume,TurnoverBEST_MKD,TotalTurnoverMKD\n'
+    '11/8/2024,"23,299.00","23,400.00","23,010.00","23,193.84",0.85,64,"1,484,406","1,484,406"\n'
+    '11/7/2024,"23,000.00",,,"22,997.62",-2.28,130,0,"2,989,691"\n'
+    '12/29/2023,"21,000.00","21,000.00","21,000.00","21,000.00",0.00,1,"21,000","21,000"\n'
+)
+
+
+def start(data_dir, *options):
+    """Run the replay server in its own process, as the scrape benchmark does; its modules import `services`."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.replay_server', '--port', str(port), '--data-dir', str(data_dir), *options],
+        cwd=SERVICE_DIR, stdout=subprocess.DEVNULL
+    )
+    for _ in range(150):
+        try:
+            requests.get(f'http://127.0.0.1:{port}/_stats', timeout=1)
+            return server, f'http://127.0.0.1:{port}'
+        except requests.ConnectionError:
+            if server.poll() is not None:
+                raise RuntimeError('replay server exited during startup')
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('replay server did not start')
+
+
+@pytest.fixture(scope='module')
+def data_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('data')
+    (data_dir / 'ALK.csv').write_text(CSV)
+    (data_dir / 'KMB.csv').write_text(CSV.splitlines()[0] + '\n')
+    return data_dir
+
+
+@pytest.fixture
+def replay(data_dir):
+    """Starts a server with extra options for one test."""
+    servers = []
+
+    def run(*options):
+        server, url = start(data_dir, *options)
+        servers.append(server)
+        return url
+    yield run
+    for server in servers:
+        server.terminate()
+        server.wait()
+
+
+@pytest.fixture(scope='module')
+def url(data_dir):
+    server, url = start(data_dir)
+    yield url
+    server.terminate()
+    server.wait()
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return StockScraper()
+
+
+def history(url, ticker, date_from, date_to):
+    return requests.get(f'{url}/en/stats/symbolhistory/{ticker}', params={'FromDate': date_from, 'ToDate': date_to})
+
+
+def csv_rows(scraper, positions):
+    # What parse_table should read back: the CSV's own cells, as the site writes them
+    data = pd.read_csv(io.StringIO(CSV), dtype=str, keep_default_na=False)
+    return pd.DataFrame([dict(zip(scraper.COLUMNS, scraper.parse_row(list(data.iloc[i])))) for i in positions])
+
+
+@pytest.mark.parametrize('date_from, date_to, positions', [
+    ('01/01/2024', '12/31/2024', [0, 1]),
+    ('11/08/2024', '11/08/2024', [0]),
+    ('01/01/2023', '12/31/2024', [0, 1, 2]),
+])
+def test_history_pages_parse_back_to_the_csv_rows(url, scraper, date_from, date_to, positions):
+    response = history(url, 'ALK', date_from, date_to)
+
+    assert response.status_code == 200
+    pd.testing.assert_frame_equal(scraper.parse_table(response.content), csv_rows(scraper, positions))
+
+
+def test_ranges_without_trades_and_unknown_tickers(url, scraper):
+    statuses = requests.get(f'{url}/_stats').json()['statuses']
+
+    assert scraper.parse_table(history(url, 'ALK', '01/01/2020', '12/31/2020').content).empty
+    assert scraper.parse_table(history(url, 'KMB', '01/01/2024', '12/31/2024').content).empty
+    assert history(url, 'XYZ', '01/01/2024', '12/31/2024').status_code == 404
+    after = requests.get(f'{url}/_stats').json()['statuses']
+    assert after['200'] - statuses.get('200', 0) == 2
+    assert after['404'] - statuses.get('404', 0) == 1
+
+
+def test_the_company_list_is_read_by_fetch_companies(url, scraper):
+    scraper.base_url = f"{url}/en/stats/symbolhistory/"
+
+    assert scraper.fetch_companies() == ['ALK', 'KMB']
+
+
+def test_injected_errors_and_throttling(replay):
+    assert history(replay('--error-rate', '1'), 'ALK', '01/01/2024', '12/31/2024').status_code == 500
+
+    url = replay('--rate-limit', '1')
+    statuses = [history(url, 'ALK', '01/01/2024', '12/31/2024').status_code for _ in range(3)]
+    assert statuses[0] == 200 and 429 in statuses
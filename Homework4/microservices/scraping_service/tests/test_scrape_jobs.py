@@ -0,0 +1,165 @@
+import json
+import os
+import time
+import pandas as pd
+import pytest
+from scraping_service.services.scrape_jobs import ScrapeJobManager
+
+RANGES = [('01/01/2023', '12/31/2023'), ('01/01/2024', '11/08/2024')]
+
+
+class FakeCrawler:
+    """Stands in for AsyncCrawler.run: ranges listed in `failing` are not fetched on the next run."""
+
+    def __init__(self):
+        self.failing = set()
+        self.requested = []
+
+    def run(self, plan, on_company_done, on_range_done):
+        results = {}
+        for company, ranges in plan.items():
+            frames = []
+            for date_from, date_to in ranges:
+                self.requested.append((company, date_from))
+                if (company, date_from) in self.failing:
+                    frames.append(None)
+                    continue
+                frame = pd.DataFrame({'Date': [date_from], 'Avg Price': [1.0]})
+                on_range_done(company, date_from, date_to, frame)
+                frames.append(frame)
+            results[company] = None if any(frame is None for frame in frames) else on_company_done(company, frames)
+        self.failing.clear()
+        return results
+
+
+@pytest.fixture
+def crawler():
+    return FakeCrawler()
+
+
+@pytest.fixture
+def saved():
+    return {}
+
+
+@pytest.fixture
+def new_manager(tmp_path, crawler, saved):
+    """Builds a manager over the same jobs directory, as a restarted service would."""
+    def save_company(company, frames, last_date):
+        saved[company] = sorted(date for frame in frames for date in frame['Date'])
+        return len(frames)
+
+    return lambda: ScrapeJobManager(
+        crawler, lambda: ['ALK', 'KMB'], lambda company, years, incremental: (RANGES, None),
+        save_company, jobs_dir=str(tmp_path / 'jobs')
+    )
+
+
+def finished(manager, job_id):
+    for _ in range(500):
+        status = manager.status(job_id)
+        if status['status'] not in ('queued', 'running'):
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f'Job {job_id} did not finish')
+
+
+def test_a_job_fetches_and_saves_every_company(new_manager, saved, tmp_path):
+    manager = new_manager()
+
+    status = finished(manager, manager.start(10, False)['id'])
+
+    assert status['status'] == 'completed'
+    assert status['progress'] == {'companies': 2, 'companies_saved': 2, 'ranges': 4, 'ranges_done': 4}
+    assert saved == {'ALK': ['01/01/2023', '01/01/2024'], 'KMB': ['01/01/2023', '01/01/2024']}
+    assert not os.path.exists(tmp_path / 'jobs' / status['id'] / 'ranges')
+
+
+def test_a_company_with_a_failed_range_leaves_the_job_interrupted(new_manager, crawler, saved):
+    manager = new_manager()
+    crawler.failing = {('ALK', '01/01/2024')}
+
+    status = finished(manager, manager.start(10, False)['id'])
+
+    assert status['status'] == 'interrupted'
+    assert 'ALK' in status['error']
+    assert status['progress']['companies_saved'] == 1
+    assert status['progress']['ranges_done'] == 3
+    assert list(saved) == ['KMB']
+
+
+def test_resuming_fetches_only_the_missing_ranges(new_manager, crawler, saved):
+    manager = new_manager()
+    crawler.failing = {('ALK', '01/01/2024')}
+    job_id = manager.start(10, False)['id']
+    finished(manager, job_id)
+    crawler.requested.clear()
+
+    manager.resume(job_id)
+    status = finished(manager, job_id)
+
+    assert status['status'] == 'completed'
+    assert crawler.requested == [('ALK', '01/01/2024')]
+    # The range fetched by the first run comes from its checkpoint
+    assert saved['ALK'] == ['01/01/2023', '01/01/2024']
+
+
+def test_a_restarted_service_resumes_the_unfinished_job(new_manager, crawler, saved):
+    first = new_manager()
+    crawler.failing = {('KMB', '01/01/2023')}
+    job_id = first.start(10, False)['id']
+    finished(first, job_id)
+    crawler.requested.clear()
+
+    restarted = new_manager()
+    assert restarted.resume_unfinished() == [job_id]
+    status = finished(restarted, job_id)
+
+    assert status['status'] == 'completed'
+    assert crawler.requested == [('KMB', '01/01/2023')]
+    assert saved == {'ALK': ['01/01/2023', '01/01/2024'], 'KMB': ['01/01/2023', '01/01/2024']}
+    assert new_manager().resume_unfinished() == []
+
+def test_checkpoints_append_progress_instead_of_rewriting_the_job(new_manager, tmp_path):
+    manager = new_manager()
+    replaced = []
+    replace = manager._replace
+    manager._replace = lambda job_id, name, content: replaced.append(name) or replace(job_id, name, content)
+
+    job_id = finished(manager, manager.start(10, False)['id'])['id']
+
+    job_dir = tmp_path / 'jobs' / job_id
+    # job.json is only rewritten by the queued, running and completed status changes
+    assert replaced == ['job.json', 'plan.json', 'job.json', 'job.json']
+    with open(job_dir / 'job.json') as f:
+        assert not {'plan', 'last_dates', 'done', 'saved'} & set(json.load(f))
+    with open(job_dir / 'progress.jsonl') as f:
+        entries = [json.loads(line) for line in f]
+    assert sorted(kind for kind, company, value in entries) == ['done'] * 4 + ['saved'] * 2
+
+
+def test_a_restarted_service_reads_the_progress_back(new_manager, crawler, tmp_path):
+    crawler.failing = {('ALK', '01/01/2024')}
+    first = new_manager()
+    job_id = first.start(10, False)['id']
+    before = finished(first, job_id)
+    # A crash while appending leaves the last line cut short
+    with open(tmp_path / 'jobs' / job_id / 'progress.jsonl', 'a') as f:
+        f.write('["done", "ALK", "010120')
+
+    status = new_manager().status(job_id)
+
+    assert status == before
+    assert status['progress'] == {'companies': 2, 'companies_saved': 1, 'ranges': 4, 'ranges_done': 3}
+
+
+
+def test_completed_jobs_are_not_resumed(new_manager, crawler):
+    manager = new_manager()
+    job_id = manager.start(10, False)['id']
+    finished(manager, job_id)
+    crawler.requested.clear()
+
+    assert manager.resume(job_id)['status'] == 'completed'
+    assert crawler.requested == []
+    assert manager.resume('missing') is None
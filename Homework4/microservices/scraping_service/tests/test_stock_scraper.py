@@ -0,0 +1,118 @@
+import importlib
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from bs4 import BeautifulSoup
+from flask import Flask
+from scraping_service.services.scraper import StockScraper
+
+HEADER = 'Date,Last trade price,Max,Min,Avg Price,%chg.,Volume,TurnoverBEST_MKD,TotalTurnoverMKD\n'
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return StockScraper()
+
+
+def test_plan_company_requests_only_days_after_the_stored_ones(scraper, tmp_path):
+    last_date = datetime.today() - timedelta(days=3)
+    (tmp_path / 'data' / 'ALK.csv').write_text(HEADER + f'{last_date:%m/%d/%Y},1,1,1,1,0,1,1,1\n')
+
+    ranges, stored = scraper.plan_company('ALK', years_back=10, incremental=True)
+
+    assert stored.date() == last_date.date()
+    assert ranges == [((last_date + timedelta(days=1)).strftime('%m/%d/%Y'), datetime.today().strftime('%m/%d/%Y'))]
+
+
+def test_plan_company_requests_full_history_without_incremental(scraper, tmp_path):
+    (tmp_path / 'data' / 'ALK.csv').write_text(HEADER + '11/8/2024,1,1,1,1,0,1,1,1\n')
+
+    ranges, stored = scraper.plan_company('ALK', years_back=3, incremental=False)
+
+    assert stored is None
+    assert len(ranges) == 3
+
+
+@pytest.fixture
+def refresh(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    routes = importlib.import_module('scraping_service.routes.scraper_routes')
+    started = []
+    monkeypatch.setattr(routes.jobs, 'start', lambda years, incremental: started.append(incremental) or {'id': 'job'})
+
+    app = Flask(__name__)
+    app.register_blueprint(routes.scraper_bp)
+    client = app.test_client()
+
+    def post(**body):
+        return client.post('/api/scraper/refresh', json=body), started
+    return post
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), ('true', True), ('False', False)
+])
+def test_refresh_reads_incremental_as_a_bool(refresh, value, expected):
+    response, started = refresh(incremental=value)
+
+    assert response.status_code == 202
+    assert started == [expected]
+
+
+def test_refresh_is_incremental_by_default(refresh):
+    response, started = refresh()
+
+    assert response.status_code == 202
+    assert started == [True]
+
+
+@pytest.mark.parametrize('value', [0, 1, 'no', None])
+def test_refresh_rejects_incremental_values_that_are_not_booleans(refresh, value):
+    response, started = refresh(incremental=value)
+
+    assert response.status_code == 400
+    assert started == []
+
+
+PAGE = b"""<!DOCTYPE html><html><head><title>Symbol history</title></head><body>
+<table id="resultsTable"><thead><tr><th>Date</th><th>Last trade price</th></tr></thead>
+<tbody>
+<tr><td>11/8/2024</td><td>23,299.00</td><td>23,400.00</td><td>23,010.00</td><td>23,193.84</td><td>0.85</td><td>64</td><td>1,484,406</td><td>1,484,406</td></tr>
+<tr><td> 11/7/2024 </td><td><span>23,000.00</span></td><td></td><td></td><td>22,997.62</td><td>-2.28</td><td>1,061</td><td>0</td><td>2,989,691</td></tr>
+<tr><td>11/6/2024</td><td>577.00</td><td>577.00</td><td>577.00</td><td>577.00</td><td>0.00</td><td>1</td><td>577</td><td>&nbsp;</td></tr>
+</tbody></table>
+<table><tbody><tr><td>1/1/2000</td><td>1</td><td>1</td><td>1</td><td>1</td><td>0</td><td>1</td><td>1</td><td>1</td></tr></tbody></table>
+</body></html>"""
+
+
+def bs4_rows(scraper, page):
+    # The parse path parse_table replaced: a BeautifulSoup tree and parse_cells per row
+    soup = BeautifulSoup(page.decode('utf-8'), 'html.parser')
+    return pd.DataFrame([scraper.parse_cells(row) for row in soup.find_all('tbody')[0].find_all('tr')])
+
+
+def test_parse_table_matches_the_beautifulsoup_rows(scraper):
+    rows = scraper.parse_table(PAGE)
+
+    pd.testing.assert_frame_equal(rows, bs4_rows(scraper, PAGE))
+    assert rows['Date'].tolist() == ['11/8/2024', '11/7/2024', '11/6/2024']
+    assert rows['Last trade price'].tolist() == [23299.0, 23000.0, 577.0]
+
+
+def test_parse_table_of_a_page_without_rows_is_empty(scraper):
+    assert scraper.parse_table(b'<html><body><p>No data</p></body></html>').empty
+    assert scraper.parse_table(b'<html><body><table><tbody></tbody></table></body></html>').empty
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('23,299.00', 23299.0), ('1,484,406', 1484406.0), ('-2.28', -2.28), (' 64 ', 64.0)
+])
+def test_parse_number_reads_the_site_format(text, expected):
+    assert StockScraper.parse_number(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', ' ', '\xa0', 'n/a'])
+def test_parse_number_reads_empty_or_malformed_cells_as_nan(text):
+    assert np.isnan(StockScraper.parse_number(text))
@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from scraping_service.services.price_store import PriceStore
+
+LEGACY_CSV = (
+    'Date,Last trade price,Max,Min,Avg Price,%chg.,Volume,TurnoverBEST_MKD,TotalTurnoverMKD\n'
+    '11/8/2024,"23,299.00","23,400.00","23,010.00","23,193.84","0,85",64,"1,484,406","1,484,406"\n'
+    '3/25/2022,"102,00","102,00","97,00","97,31","-0,90","2,430","236,46","236,46"\n'
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / 'ALK.csv').write_text(LEGACY_CSV)
+    return PriceStore(str(tmp_path))
+
+
+def test_convert_csv_reads_the_old_format(store):
+    typed = store.load_frame('ALK')
+
+    assert typed['Avg Price'].tolist() == [97.31, 23193.84]
+    assert typed['%chg.'].tolist() == [-0.9, 0.85]
+    assert typed['Volume'].tolist() == [2430, 64]
+    assert typed['TotalTurnoverMKD'].tolist() == [236460.0, 1484406.0]
+
+
+def test_write_csv_round_trips_through_the_store(store, tmp_path):
+    typed = store.load_frame('ALK')
+    store.write_csv('ALK', typed)
+    os.utime(tmp_path / 'ALK.csv', (1e10, 1e10))
+
+    assert store.is_stale('ALK')
+    pd.testing.assert_frame_equal(store.load_frame('ALK'), typed)
+
+
+def test_write_frame_repoints_current_and_keeps_only_the_replaced_version(store, tmp_path):
+    typed = store.load_frame('ALK')
+    for rows in (1, 2, 2):
+        store.write_frame('ALK', typed.head(rows))
+
+    root = tmp_path / 'store' / 'ALK'
+    versions = sorted(name for name in os.listdir(root) if name != PriceStore.CURRENT_FILE)
+    assert len(versions) == 2
+    assert (root / PriceStore.CURRENT_FILE).read_text() == versions[-1]
+    assert store.ticker_dir('ALK') == str(root / versions[-1])
+
+
+def test_load_range_slices_by_date(store):
+    rows = store.load_range('ALK', '2024-01-01', None, ['Avg Price'])
+
+    assert rows['Avg Price'].tolist() == [23193.84]
+    assert np.array_equal(store.load_range('ALK', None, '2022-03-25', ['Avg Price'])['Avg Price'], [97.31])
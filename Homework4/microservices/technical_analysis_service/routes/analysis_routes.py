@@ -1,9 +1,25 @@
 from flask import Blueprint, request, jsonify
 from ..services.technical_analyzer import TechnicalAnalyzer
+from ..services.batch_engine import BatchIndicatorEngine
+from ..utils.wire_format import read_payload, respond
 import pandas as pd
 
 analysis_bp = Blueprint('analysis', __name__)
 analyzer = TechnicalAnalyzer()
+batch_engine = BatchIndicatorEngine()
+store = batch_engine.store
+STORE_COLUMNS = ['Date', 'Avg Price', 'Max', 'Min']
+
+
+def _request_frame(data: dict) -> pd.DataFrame:
+    """Rows to analyze: the posted historical_data, or the stored rows of {ticker, date_from, date_to}."""
+    if data.get('historical_data'):
+        return pd.DataFrame(data['historical_data'])
+
+    ticker = data.get('ticker') or data.get('company')
+    frame = store.load_range(ticker, data.get('date_from'), data.get('date_to'), STORE_COLUMNS)
+    # Days without trades have no average price; Max/Min are often missing on days that do
+    return frame.dropna(subset=['Date', 'Avg Price']).reset_index(drop=True)
 
 
 @analysis_bp.route('/health', methods=['GET'])
@@ -14,12 +30,29 @@ def health_check():
 @analysis_bp.route('/api/technical/analyze', methods=['POST'])
 def analyze():
     try:
-        data = request.get_json()
-        if not data or 'historical_data' not in data:
-            return jsonify({"error": "No historical data provided"}), 400
+        data = read_payload()
+        if not data or not (data.get('historical_data') or data.get('ticker') or data.get('company')):
+            return jsonify({"error": "No historical data or ticker provided"}), 400
 
-        df = pd.DataFrame(data['historical_data'])
+        df = _request_frame(data)
+        if df.empty:
+            return jsonify({"error": "No stock data available for the selected date range"}), 400
         results = analyzer.analyze(df)
-        return jsonify(results), 200
+        return respond(results)
+    except FileNotFoundError:
+        return jsonify({"error": "Unknown ticker"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@analysis_bp.route('/api/technical/screen', methods=['GET'])
+def screen():
+    try:
+        tickers = request.args.get('tickers')
+        tickers = [ticker.strip() for ticker in tickers.split(',')] if tickers else None
+        results = batch_engine.screen(tickers)
+        return respond({"count": len(results), "results": results})
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from .price_store import PriceStore
+from .technical_indicators import (
+    TechnicalIndicator, RSIIndicator, StochasticIndicator, MACDIndicator, WilliamsRIndicator,
+    SIGNAL_LABELS, vote_signal_codes
+)
+
+
+class BatchIndicatorEngine:
+    """Computes the technical indicators of every ticker in one vectorized pass.
+
+    Each price column is loaded into one 2-D frame with a column per ticker. Series are
+    right-aligned on their latest trading day, so every column holds that ticker's own
+    trading sequence and the rolling windows match a per-ticker computation.
+    """
+
+    PANEL_COLUMNS = ['Avg Price', 'Min', 'Max']
+
+    def __init__(self, store: Optional[PriceStore] = None, indicators: Optional[Dict[str, TechnicalIndicator]] = None):
+        self.store = store or PriceStore()
+        self.indicators = indicators or {
+            'RSI': RSIIndicator(),
+            'Stochastic': StochasticIndicator(),
+            'MACD': MACDIndicator(),
+            'Williams_R': WilliamsRIndicator()
+        }
+        self._panel = None
+        self._signature = None
+
+    def _store_signature(self, tickers: List[str]) -> tuple:
+        signature = []
+        for ticker in tickers:
+            csv_path = os.path.join(self.store.data_dir, f'{ticker}.csv')
+            date_path = os.path.join(self.store.ticker_dir(ticker), 'date.npy')
+            mtimes = tuple(os.path.getmtime(path) if os.path.exists(path) else 0 for path in (csv_path, date_path))
+            signature.append((ticker, mtimes))
+        return tuple(signature)
+
+    def load_panel(self, tickers: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Load the aligned date x ticker frames, reusing them until the store changes."""
+        tickers = tickers or self.store.tickers()
+        # Unknown tickers raise FileNotFoundError before any of their paths are looked at
+        for ticker in tickers:
+            self.store.require_ticker(ticker)
+        signature = self._store_signature(tickers)
+        if self._panel is not None and signature == self._signature:
+            return self._panel
+
+        frames = {ticker: self.store.load_frame(ticker, ['Date'] + self.PANEL_COLUMNS) for ticker in tickers}
+        length = max((len(frame) for frame in frames.values()), default=0)
+
+        panel = {}
+        for column in self.PANEL_COLUMNS:
+            values = np.full((length, len(tickers)), np.nan)
+            for position, ticker in enumerate(tickers):
+                column_values = frames[ticker][column].to_numpy(dtype=float)
+                values[length - len(column_values):, position] = column_values
+            panel[column] = pd.DataFrame(values, columns=tickers)
+
+        panel['Date'] = pd.Series(
+            {ticker: frame['Date'].iloc[-1] if len(frame) else pd.NaT for ticker, frame in frames.items()}
+        )
+
+        self._panel, self._signature = panel, signature
+        return panel
+
+    def calculate(self, panel: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Run every indicator on the whole panel at once."""
+        return {name: indicator.calculate(panel) for name, indicator in self.indicators.items()}
+
+    def screen(self, tickers: Optional[List[str]] = None) -> List[dict]:
+        """Latest indicator values and signals for every ticker."""
+        panel = self.load_panel(tickers)
+        latest = {name: values.iloc[-1] for name, values in self.calculate(panel).items()}
+        latest_price = panel['Avg Price'].iloc[-1]
+        voted = vote_signal_codes([
+            indicator.generate_signals(latest[name].to_numpy(dtype=float))
+            for name, indicator in self.indicators.items()
+        ])
+
+        results = []
+        for position, (ticker, date) in enumerate(panel['Date'].items()):
+            values = {name: latest[name][ticker] for name in self.indicators}
+            results.append({
+                'ticker': ticker,
+                'date': date.strftime('%Y-%m-%d') if pd.notna(date) else None,
+                'avg_price': float(latest_price[ticker]) if pd.notna(latest_price[ticker]) else None,
+                'indicators': {name: float(value) if pd.notna(value) else None for name, value in values.items()},
+                'signal': SIGNAL_LABELS[1 - voted[position]].upper()
+            })
+
+        return results
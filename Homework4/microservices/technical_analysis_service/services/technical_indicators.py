@@ -1,6 +1,24 @@
 from abc import ABC, abstractmethod
+from typing import List
+import numpy as np
 import pandas as pd
 
+# Signal codes of the vectorized signal functions; SIGNAL_LABELS[1 - code] is the label
+BUY, HOLD, SELL = 1, 0, -1
+SIGNAL_LABELS = ['buy', 'hold', 'sell']
+
+def vote_signal_codes(codes: List[np.ndarray]) -> np.ndarray:
+    """Majority vote over per-indicator signal codes, element-wise."""
+    stacked = np.stack(codes)
+    buy_count = (stacked == BUY).sum(axis=0)
+    sell_count = (stacked == SELL).sum(axis=0)
+    hold_count = (stacked == HOLD).sum(axis=0)
+    return np.select(
+        [(buy_count > sell_count) & (buy_count > hold_count), (sell_count > buy_count) & (sell_count > hold_count)],
+        [BUY, SELL],
+        HOLD
+    )
+
 class TechnicalIndicator(ABC):
     @abstractmethod
     def calculate(self, data: pd.DataFrame) -> pd.Series:
@@ -10,7 +28,19 @@ class TechnicalIndicator(ABC):
     def generate_signal(self, value: float) -> str:
         pass
 
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized generate_signal returning a BUY/HOLD/SELL code per value.
+
+        The default asks generate_signal value by value, anything but 'buy' or 'sell' is HOLD;
+        subclasses override it with array operations.
+        """
+        codes = {'buy': BUY, 'sell': SELL}
+        return np.array([codes.get(self.generate_signal(value), HOLD) for value in values], dtype=int)
+
 class RSIIndicator(TechnicalIndicator):
+    SELL_ABOVE = 70
+    BUY_BELOW = 30
+
     def calculate(self, data: pd.DataFrame) -> pd.Series:
         price = data['Avg Price']
         delta = price.diff()
@@ -22,8 +52,77 @@ class RSIIndicator(TechnicalIndicator):
     def generate_signal(self, value: float) -> str:
         if pd.isna(value):
             return 'hold'
-        if value > 70:
+        if value > self.SELL_ABOVE:
+            return 'sell'
+        if value < self.BUY_BELOW:
+            return 'buy'
+        return 'hold'
+
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.SELL_ABOVE, values < self.BUY_BELOW], [SELL, BUY], HOLD)
+
+class StochasticIndicator(TechnicalIndicator):
+    SELL_ABOVE = 80
+    BUY_BELOW = 20
+
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        price = data['Avg Price']
+        low_14 = data['Min'].rolling(window=14).min()
+        high_14 = data['Max'].rolling(window=14).max()
+        return 100 * ((price - low_14) / (high_14 - low_14))
+
+    def generate_signal(self, value: float) -> str:
+        if pd.isna(value):
+            return 'hold'
+        if value > self.SELL_ABOVE:
+            return 'sell'
+        if value < self.BUY_BELOW:
+            return 'buy'
+        return 'hold'
+
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.SELL_ABOVE, values < self.BUY_BELOW], [SELL, BUY], HOLD)
+
+class MACDIndicator(TechnicalIndicator):
+    BUY_ABOVE = 0
+    SELL_BELOW = 0
+
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        price = data['Avg Price']
+        exp1 = price.ewm(span=12, adjust=False).mean()
+        exp2 = price.ewm(span=26, adjust=False).mean()
+        return exp1 - exp2
+
+    def generate_signal(self, value: float) -> str:
+        if pd.isna(value):
+            return 'hold'
+        if value > self.BUY_ABOVE:
+            return 'buy'
+        if value < self.SELL_BELOW:
             return 'sell'
-        if value < 30:
+        return 'hold'
+
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.BUY_ABOVE, values < self.SELL_BELOW], [BUY, SELL], HOLD)
+
+class WilliamsRIndicator(TechnicalIndicator):
+    SELL_ABOVE = -20
+    BUY_BELOW = -80
+
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        price = data['Avg Price']
+        high = data['Max'].rolling(window=14).max()
+        low = data['Min'].rolling(window=14).min()
+        return ((high - price) / (high - low)) * -100
+
+    def generate_signal(self, value: float) -> str:
+        if pd.isna(value):
+            return 'hold'
+        if value > self.SELL_ABOVE:
+            return 'sell'
+        if value < self.BUY_BELOW:
             return 'buy'
         return 'hold'
+
+    def generate_signals(self, values: np.ndarray) -> np.ndarray:
+        return np.select([values > self.SELL_ABOVE, values < self.BUY_BELOW], [SELL, BUY], HOLD)
@@ -0,0 +1,93 @@
+import importlib
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from technical_analysis_service.services.batch_engine import BatchIndicatorEngine
+from technical_analysis_service.services.price_store import PriceStore
+from technical_analysis_service.services.technical_indicators import SIGNAL_LABELS
+
+HISTORY = {'ALK': 200, 'KMB': 120, 'TEL': 40}
+
+
+def typed_frame(days, seed):
+    rng = np.random.default_rng(seed)
+    avg = 100 + rng.normal(0, 1, days).cumsum()
+    return pd.DataFrame({
+        'Date': pd.date_range(end='2024-11-08', periods=days, freq='D'), 'Last trade price': avg,
+        'Max': avg + rng.uniform(0, 1, days), 'Min': avg - rng.uniform(0, 1, days), 'Avg Price': avg,
+        '%chg.': np.zeros(days), 'Volume': np.ones(days, dtype='int64'),
+        'TurnoverBEST_MKD': avg, 'TotalTurnoverMKD': avg
+    })
+
+
+def majority(votes):
+    # The voting rule of the per-ticker analyzer
+    buy, sell, hold = (votes.count(label) for label in ('buy', 'sell', 'hold'))
+    if buy > sell and buy > hold:
+        return 'buy'
+    if sell > buy and sell > hold:
+        return 'sell'
+    return 'hold'
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PriceStore(str(tmp_path))
+    for seed, (ticker, days) in enumerate(HISTORY.items()):
+        store.write_frame(ticker, typed_frame(days, seed))
+    return store
+
+
+def test_screen_matches_indicators_computed_per_ticker(store):
+    engine = BatchIndicatorEngine(store)
+
+    results = {result['ticker']: result for result in engine.screen()}
+
+    assert list(results) == list(HISTORY)
+    for ticker in HISTORY:
+        frame = store.load_frame(ticker)
+        latest = {name: indicator.calculate(frame).iloc[-1] for name, indicator in engine.indicators.items()}
+        codes = [indicator.generate_signals(np.array([latest[name]])) for name, indicator in engine.indicators.items()]
+        expected = majority([SIGNAL_LABELS[1 - code[0]] for code in codes])
+
+        assert results[ticker]['date'] == '2024-11-08'
+        assert results[ticker]['avg_price'] == frame['Avg Price'].iloc[-1]
+        assert results[ticker]['indicators'] == pytest.approx(latest, nan_ok=True)
+        assert results[ticker]['signal'] == expected.upper()
+
+
+def test_the_panel_is_reused_until_the_store_changes(store):
+    engine = BatchIndicatorEngine(store)
+    panel = engine.load_panel()
+
+    assert engine.load_panel() is panel
+
+    store.write_frame('TEL', typed_frame(41, 3))
+    assert engine.load_panel() is not panel
+
+
+@pytest.fixture
+def screen(store, tmp_path, monkeypatch):
+    # Importing the routes creates their default store under ./data
+    monkeypatch.chdir(tmp_path)
+    routes = importlib.import_module('technical_analysis_service.routes.analysis_routes')
+    monkeypatch.setattr(routes, 'batch_engine', BatchIndicatorEngine(store))
+    app = Flask(__name__)
+    app.register_blueprint(routes.analysis_bp)
+    return lambda tickers: app.test_client().get('/api/technical/screen', query_string={'tickers': tickers})
+
+
+def test_screen_route_answers_the_requested_tickers(screen):
+    response = screen('KMB, TEL')
+
+    assert response.status_code == 200
+    assert [result['ticker'] for result in response.get_json()['results']] == ['KMB', 'TEL']
+
+
+@pytest.mark.parametrize('tickers', ['ALK,XYZ', 'ALK,../ALK'])
+def test_screen_route_answers_unknown_tickers_with_404(screen, tickers):
+    response = screen(tickers)
+
+    assert response.status_code == 404
+    assert 'Unknown ticker' in response.get_json()['error']
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from technical_analysis_service.services import technical_indicators as ti
+
+
+class ThresholdIndicator(ti.TechnicalIndicator):
+    def calculate(self, data):
+        return data['Avg Price']
+
+    def generate_signal(self, value):
+        if pd.isna(value):
+            return 'unknown'
+        return 'buy' if value > 0 else 'sell' if value < 0 else 'hold'
+
+
+def test_an_indicator_without_generate_signals_can_be_created():
+    assert isinstance(ThresholdIndicator(), ti.TechnicalIndicator)
+
+
+def test_generate_signals_defaults_to_asking_generate_signal():
+    codes = ThresholdIndicator().generate_signals(np.array([1.0, -1.0, 0.0, np.nan]))
+
+    assert codes.tolist() == [ti.BUY, ti.SELL, ti.HOLD, ti.HOLD]
+
+
+@pytest.mark.parametrize('indicator', [ti.RSIIndicator(), ti.StochasticIndicator(),
+                                       ti.MACDIndicator(), ti.WilliamsRIndicator()])
+def test_builtin_vectorized_signals_match_generate_signal(indicator):
+    values = np.concatenate([np.linspace(-120, 120, 481), [np.nan]])
+    labels = {ti.BUY: 'buy', ti.HOLD: 'hold', ti.SELL: 'sell'}
+
+    codes = indicator.generate_signals(values)
+
+    assert [labels[code] for code in codes] == [indicator.generate_signal(value) for value in values]
@@ -0,0 +1,83 @@
+import importlib
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from technical_analysis_service.services.price_store import PriceStore
+from technical_analysis_service.utils.wire_format import NPZ_MIMETYPE, encode_payload
+
+
+def typed_frame(days=30):
+    avg = 100 + np.arange(days, dtype=float)
+    frame = pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=days, freq='D'), 'Last trade price': avg,
+        'Max': avg + 1, 'Min': avg - 1, 'Avg Price': avg, '%chg.': np.zeros(days),
+        'Volume': np.ones(days, dtype='int64'), 'TurnoverBEST_MKD': avg, 'TotalTurnoverMKD': avg
+    })
+    # A day without trades, and days that traded without Max/Min
+    frame.loc[5, ['Last trade price', 'Max', 'Min', 'Avg Price']] = np.nan
+    frame.loc[[6, 7], ['Max', 'Min']] = np.nan
+    return frame
+
+
+@pytest.fixture
+def analyze(tmp_path, monkeypatch):
+    # Importing the routes creates their default store under ./data
+    monkeypatch.chdir(tmp_path)
+    routes = importlib.import_module('technical_analysis_service.routes.analysis_routes')
+    store = PriceStore(str(tmp_path / 'shared'))
+    store.write_frame('ALK', typed_frame())
+    monkeypatch.setattr(routes, 'store', store)
+    frames = []
+    monkeypatch.setattr(routes.analyzer, 'analyze', lambda frame: frames.append(frame) or {'rows': len(frame)})
+
+    app = Flask(__name__)
+    app.register_blueprint(routes.analysis_bp)
+    client = app.test_client()
+
+    def post(npz=False, **body):
+        if npz:
+            return client.post('/api/technical/analyze', data=encode_payload(body), content_type=NPZ_MIMETYPE), frames
+        return client.post('/api/technical/analyze', json=body), frames
+    return post
+
+
+def test_a_ticker_range_is_loaded_from_the_store(analyze):
+    response, frames = analyze(ticker='ALK', date_from='2024-01-03', date_to='2024-01-10')
+
+    assert response.status_code == 200
+    expected = typed_frame().iloc[2:10].drop(index=5)[['Date', 'Avg Price', 'Max', 'Min']].reset_index(drop=True)
+    # Only the day without an average price is dropped, missing Max/Min are kept
+    pd.testing.assert_frame_equal(frames[0], expected, check_dtype=False)
+
+
+def test_posted_historical_data_is_used_as_it_is(analyze):
+    rows = [{'Date': '2024-01-01', 'Avg Price': 1.0, 'Max': 1.0, 'Min': 1.0}]
+
+    response, frames = analyze(ticker='ALK', historical_data=rows)
+
+    assert response.get_json() == {'rows': 1}
+    assert frames[0].to_dict('records') == rows
+
+
+@pytest.mark.parametrize('npz', [False, True])
+def test_the_dashboard_body_with_empty_historical_data_loads_the_ticker(analyze, npz):
+    response, frames = analyze(npz=npz, ticker='ALK', date_from='2024-01-03', date_to='2024-01-10', historical_data=[])
+
+    assert response.status_code == 200
+    assert len(frames[0]) == 7
+
+
+def test_an_empty_range_is_a_bad_request(analyze):
+    response, frames = analyze(ticker='ALK', date_from='2025-01-01')
+
+    assert response.status_code == 400
+    assert frames == []
+
+
+@pytest.mark.parametrize('ticker', ['XYZ', '../ALK', 'alk', 'ALK/../ALK', 7])
+def test_unknown_or_invalid_tickers_are_not_found(analyze, ticker):
+    response, frames = analyze(ticker=ticker)
+
+    assert response.status_code == 404
+    assert frames == []
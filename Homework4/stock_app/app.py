@@ -1,5 +1,9 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from flask import Flask, render_template, request, jsonify
 import requests
+from service_client import ServiceClient
+from wire_format import NPZ_MIMETYPE, decode_payload, encode_payload, to_json_compatible
 
 app = Flask(__name__)
 
@@ -9,6 +13,23 @@ FUNDAMENTAL_SERVICE_URL = 'http://fundamental_analysis_service:5003'
 LSTM_SERVICE_URL = 'http://lstm_prediction_service:5002'
 SCRAPING_SERVICE_URL = 'http://scraping_service:5004'
 
+# One pooled keep-alive client per upstream, timeouts are (connect, read) in seconds
+technical_client = ServiceClient('technical', TECHNICAL_SERVICE_URL, timeout=(3, 10))
+fundamental_client = ServiceClient('fundamental', FUNDAMENTAL_SERVICE_URL, timeout=(3, 10))
+lstm_client = ServiceClient('lstm', LSTM_SERVICE_URL, timeout=(3, 60), retries=1)
+scraping_client = ServiceClient('scraping', SCRAPING_SERVICE_URL, timeout=(3, 30))
+SERVICE_CLIENTS = [technical_client, fundamental_client, lstm_client, scraping_client]
+
+# Services /analyze fans out to: result key -> (client, endpoint, deadline in seconds).
+# The deadline bounds the whole call, retries included; read timeouts only bound each socket read
+ANALYSIS_SERVICES = {
+    'technical': (technical_client, '/api/technical/analyze', 10),
+    'fundamental': (fundamental_client, '/api/fundamental/analyze', 10),
+    'prediction': (lstm_client, '/api/lstm/predict', 60),
+}
+
+analysis_executor = ThreadPoolExecutor(max_workers=16)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -16,7 +37,7 @@ def index():
 @app.route('/companies', methods=['GET'])
 def get_companies():
     try:
-        response = requests.get(f'{SCRAPING_SERVICE_URL}/api/scraper/companies')
+        response = scraping_client.get('/api/scraper/companies')
         return jsonify(response.json())
     except requests.RequestException as e:
         return jsonify({"error": str(e)}), 500
@@ -24,41 +45,68 @@ def get_companies():
 @app.route('/scrape', methods=['POST'])
 def scrape_data():
     try:
-        response = requests.post(f'{SCRAPING_SERVICE_URL}/api/scraper/refresh')
+        # Refreshing scrapes every company, so it gets a long read timeout and no retries
+        response = scraping_client.post('/api/scraper/refresh', timeout=(3, 600), retries=0)
         return jsonify(response.json())
     except requests.RequestException as e:
         return jsonify({"error": str(e)}), 500
 
+# Inter-service payloads go as columnar npz archives, the services fall back to JSON otherwise
+SERVICE_HEADERS = {'Content-Type': NPZ_MIMETYPE, 'Accept': f'{NPZ_MIMETYPE}, application/json;q=0.9'}
+
+def call_service(client, path, body):
+    response = client.post(path, data=body, headers=SERVICE_HEADERS)
+    if response.headers.get('Content-Type', '').startswith(NPZ_MIMETYPE):
+        payload = decode_payload(response.content)
+    else:
+        payload = response.json()
+    # A server error that was not retried still fails the service, with its own message when it sent one
+    if response.status_code >= 500:
+        detail = payload.get('error') if isinstance(payload, dict) else None
+        raise requests.HTTPError(f'{client.name} returned {response.status_code}' + (f': {detail}' if detail else ''),
+                                 response=response)
+    return payload
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
     try:
-        data = request.json
-        results = {}
-
-        # Get technical analysis
-        tech_response = requests.post(
-            f'{TECHNICAL_SERVICE_URL}/api/technical/analyze',
-            json=data
-        )
-        results['technical'] = tech_response.json()
-
-        # Get fundamental analysis
-        fund_response = requests.post(
-            f'{FUNDAMENTAL_SERVICE_URL}/api/fundamental/analyze',
-            json=data
-        )
-        results['fundamental'] = fund_response.json()
-
-        # Get LSTM predictions
-        lstm_response = requests.post(
-            f'{LSTM_SERVICE_URL}/api/lstm/predict',
-            json=data
-        )
-        results['prediction'] = lstm_response.json()
-
-        return jsonify(results)
-    except requests.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+        body = encode_payload(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request body: {e}"}), 400
+
+    # Call all services at once, so the response takes as long as the slowest one instead of their sum
+    started = time.monotonic()
+    futures = {
+        name: analysis_executor.submit(call_service, client, path, body)
+        for name, (client, path, _) in ANALYSIS_SERVICES.items()
+    }
+
+    # A slow or failing service only leaves an error in its own slot, each one waited for up to its own deadline
+    results = {}
+    failed = []
+    for name, future in futures.items():
+        remaining = started + ANALYSIS_SERVICES[name][2] - time.monotonic()
+        try:
+            results[name] = future.result(timeout=max(0, remaining))
+        except FutureTimeoutError:
+            future.cancel()
+            results[name] = {"error": "Service timed out"}
+            failed.append(name)
+        except (requests.RequestException, ValueError) as e:
+            results[name] = {"error": str(e)}
+            failed.append(name)
+
+    if len(failed) == len(futures):
+        return jsonify(to_json_compatible(results)), 502
+    results['partial'] = bool(failed)
+    return jsonify(to_json_compatible(results))
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    return jsonify({client.name: client.stats() for client in SERVICE_CLIENTS})
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
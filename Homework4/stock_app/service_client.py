@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a service that has failed repeatedly and is cooling down."""
+
+
+class ServiceClient:
+    """Pooled keep-alive HTTP client for one upstream service.
+
+    Calls get bounded timeouts and jittered retries on connection errors and 502/503/504.
+    After failure_threshold failed calls in a row the circuit opens and calls fail fast
+    for reset_after seconds; the next call after that is let through as a trial.
+    """
+
+    def __init__(self, name: str, base_url: str, timeout=(3, 10), retries: int = 2, backoff: float = 0.2,
+                 failure_threshold: int = 5, reset_after: float = 30, pool_size: int = 16):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount(base_url, self.adapter)
+
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._latencies = deque(maxlen=1000)
+        self._counts = {'requests': 0, 'failures': 0, 'retries': 0, 'rejected': 0}
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+    def request(self, method: str, path: str, retries=None, timeout=None, **kwargs) -> requests.Response:
+        self._check_circuit()
+        retries = self.retries if retries is None else retries
+        timeout = timeout or self.timeout
+
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, f'{self.base_url}{path}', timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    self._record_success(time.perf_counter() - start)
+                    return response
+                error = requests.HTTPError(f'{self.name} returned {response.status_code}', response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt == retries:
+                self._record_failure()
+                raise error
+            with self._lock:
+                self._counts['retries'] += 1
+            # Full jitter, so retries from concurrent requests do not arrive together
+            time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    def _check_circuit(self):
+        with self._lock:
+            self._counts['requests'] += 1
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_after:
+                self._counts['rejected'] += 1
+                raise CircuitOpenError(f'{self.name} is unavailable, retrying after cool-down')
+            # Half-open: let this call through, one more failure re-opens the circuit
+            self._opened_at = None
+            self._consecutive_failures = self.failure_threshold - 1
+
+    def _record_success(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+
+    def _record_failure(self):
+        with self._lock:
+            self._counts['failures'] += 1
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def _pool_stats(self) -> dict:
+        pools = self.adapter.poolmanager.pools
+        connections = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        return {'maxsize': self.pool_size, 'connections_opened': connections}
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(latency * 1000 for latency in self._latencies)
+            counts = dict(self._counts)
+            circuit = 'open' if self._opened_at is not None else 'closed'
+
+        latency = None
+        if latencies:
+            latency = {
+                'p50_ms': round(latencies[int(0.50 * (len(latencies) - 1))], 2),
+                'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+                'max_ms': round(latencies[-1], 2)
+            }
+        return {**counts, 'circuit': circuit, 'latency': latency, 'pool': self._pool_stats()}
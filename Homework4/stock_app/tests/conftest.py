@@ -0,0 +1,17 @@
+import importlib.util
+import os
+import sys
+import pytest
+
+STOCK_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# app.py imports service_client and wire_format from its own directory
+sys.path.insert(0, STOCK_APP_DIR)
+
+
+@pytest.fixture(scope='session')
+def gateway():
+    # Homework3 has an app.py as well, so the gateway is loaded under a name of its own
+    spec = importlib.util.spec_from_file_location('stock_app_gateway', os.path.join(STOCK_APP_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
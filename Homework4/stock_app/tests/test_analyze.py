@@ -0,0 +1,152 @@
+import json
+import time
+import pytest
+import requests
+
+BODY = {'ticker': 'ALK', 'date_from': '2024-01-01', 'date_to': '2024-11-08'}
+
+
+@pytest.fixture
+def services(gateway, monkeypatch):
+    """Replace the upstream calls: set behaviour[name] to a result, an exception or (seconds, result)."""
+    behaviour = {}
+    names = {path: name for name, (_, path, _) in gateway.ANALYSIS_SERVICES.items()}
+
+    def call_service(client, path, body):
+        outcome = behaviour.get(names[path], {'service': names[path]})
+        if isinstance(outcome, tuple):
+            delay, outcome = outcome
+            time.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(gateway, 'call_service', call_service)
+    for name, (client, path, _) in gateway.ANALYSIS_SERVICES.items():
+        monkeypatch.setitem(gateway.ANALYSIS_SERVICES, name, (client, path, 0.5 if name != 'prediction' else 1.5))
+    return behaviour
+
+
+@pytest.fixture
+def post(gateway):
+    client = gateway.app.test_client()
+    return lambda body=BODY: client.post('/analyze', json=body)
+
+
+def test_all_services_answer(services, post):
+    response = post()
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'technical': {'service': 'technical'}, 'fundamental': {'service': 'fundamental'},
+        'prediction': {'service': 'prediction'}, 'partial': False
+    }
+
+
+def test_services_are_called_concurrently(services, post):
+    for name in ('technical', 'fundamental', 'prediction'):
+        services[name] = (0.3, {'service': name})
+
+    started = time.monotonic()
+    response = post()
+
+    assert response.get_json()['partial'] is False
+    assert time.monotonic() - started < 0.8
+
+
+def test_each_service_is_waited_for_up_to_its_own_deadline(services, post):
+    # Both take longer than the technical deadline; only the technical one is late
+    services['technical'] = (1.0, {'service': 'technical'})
+    services['prediction'] = (1.0, {'service': 'prediction'})
+
+    started = time.monotonic()
+    results = post().get_json()
+
+    assert results['technical'] == {'error': 'Service timed out'}
+    assert results['prediction'] == {'service': 'prediction'}
+    assert results['partial'] is True
+    assert time.monotonic() - started < 1.4
+
+
+def test_a_failing_service_only_fills_its_own_slot(services, post):
+    services['fundamental'] = requests.ConnectionError('fundamental is down')
+
+    response = post()
+
+    assert response.status_code == 200
+    assert response.get_json()['fundamental'] == {'error': 'fundamental is down'}
+    assert response.get_json()['partial'] is True
+
+
+class FakeClient:
+    def __init__(self, name, status, payload):
+        self.name = name
+        self.status = status
+        self.payload = payload
+
+    def post(self, path, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(self.payload).encode()
+        return response
+
+
+@pytest.fixture
+def upstream(gateway, monkeypatch):
+    """Answer each service with a fixed (status, JSON body), through the real call_service."""
+    def answer(**statuses):
+        for name, (_, path, deadline) in gateway.ANALYSIS_SERVICES.items():
+            status, payload = statuses.get(name, (200, {'service': name}))
+            monkeypatch.setitem(gateway.ANALYSIS_SERVICES, name, (FakeClient(name, status, payload), path, deadline))
+        return gateway.app.test_client().post('/analyze', json=BODY)
+    return answer
+
+
+def test_a_service_answering_a_server_error_only_fills_its_own_slot(upstream):
+    response = upstream(fundamental=(500, {'error': 'store is unreadable'}))
+
+    assert response.status_code == 200
+    assert response.get_json()['fundamental'] == {'error': 'fundamental returned 500: store is unreadable'}
+    assert response.get_json()['technical'] == {'service': 'technical'}
+    assert response.get_json()['partial'] is True
+
+
+def test_every_service_answering_a_server_error_is_a_bad_gateway(upstream):
+    response = upstream(**{name: (500, {'error': 'boom'}) for name in ('technical', 'fundamental', 'prediction')})
+
+    assert response.status_code == 502
+
+
+def test_a_client_error_answer_is_the_service_result(upstream):
+    response = upstream(technical=(404, {'error': 'Unknown ticker'}))
+
+    assert response.get_json()['technical'] == {'error': 'Unknown ticker'}
+    assert response.get_json()['partial'] is False
+
+
+def test_all_services_failing_is_a_bad_gateway(services, post):
+    for name in ('technical', 'fundamental', 'prediction'):
+        services[name] = requests.ConnectionError(f'{name} is down')
+
+    assert post().status_code == 502
+
+
+@pytest.mark.parametrize('body', [None, ['ALK'], 'ALK'])
+def test_a_body_that_is_not_an_object_is_a_bad_request(services, gateway, body):
+    client = gateway.app.test_client()
+
+    response = client.post('/analyze', json=body) if body is not None else client.post('/analyze')
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', [
+    {'historical_data': [[1.0, 2.0], [3.0]]},
+    {'historical_data': [{'Date': '11/08/2024', 'trades': [{'price': 1.0}]}]},
+])
+def test_a_body_the_wire_format_cannot_carry_is_a_bad_request(services, post, body):
+    response = post(body)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid request body')
@@ -0,0 +1,99 @@
+import time
+import pytest
+import requests
+from service_client import CircuitOpenError, ServiceClient
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """A client whose session answers from a list of status codes and exceptions, in order."""
+    def make(outcomes, **options):
+        client = ServiceClient('technical', 'http://technical:5001', backoff=0, **options)
+        calls = []
+
+        def request(method, url, timeout, **kwargs):
+            calls.append((method, url, timeout))
+            outcome = outcomes.pop(0) if outcomes else 200
+            if isinstance(outcome, Exception):
+                raise outcome
+            return FakeResponse(outcome)
+
+        monkeypatch.setattr(client.session, 'request', request)
+        return client, calls
+    return make
+
+
+def test_calls_go_to_the_service_url_with_its_timeout(upstream):
+    client, calls = upstream([200])
+
+    assert client.get('/health').status_code == 200
+    assert calls == [('GET', 'http://technical:5001/health', (3, 10))]
+    assert client.stats()['latency'] is not None
+
+
+def test_connection_errors_and_gateway_statuses_are_retried(upstream):
+    client, calls = upstream([requests.ConnectionError(), 503, 200], retries=2)
+
+    assert client.post('/api/technical/analyze').status_code == 200
+    assert len(calls) == 3
+    assert client.stats()['retries'] == 2
+    assert client.stats()['failures'] == 0
+
+
+def test_other_statuses_are_returned_without_retrying(upstream):
+    client, calls = upstream([500])
+
+    assert client.get('/health').status_code == 500
+    assert len(calls) == 1
+
+
+def test_the_last_error_is_raised_once_retries_run_out(upstream):
+    client, calls = upstream([requests.Timeout(), 502], retries=1)
+
+    with pytest.raises(requests.HTTPError, match='technical returned 502'):
+        client.get('/health')
+    assert len(calls) == 2
+    assert client.stats()['failures'] == 1
+
+
+def test_the_circuit_opens_after_repeated_failures(upstream):
+    client, calls = upstream([requests.ConnectionError()] * 3, retries=0, failure_threshold=3)
+    for _ in range(3):
+        with pytest.raises(requests.ConnectionError):
+            client.get('/health')
+
+    with pytest.raises(CircuitOpenError):
+        client.get('/health')
+    assert len(calls) == 3
+    assert client.stats()['circuit'] == 'open'
+    assert client.stats()['rejected'] == 1
+
+
+def test_a_trial_call_after_the_cool_down_closes_the_circuit(upstream):
+    client, calls = upstream([requests.ConnectionError()] * 2 + [200], retries=0, failure_threshold=2, reset_after=0.05)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            client.get('/health')
+
+    time.sleep(0.1)
+    assert client.get('/health').status_code == 200
+    assert client.stats()['circuit'] == 'closed'
+
+
+def test_a_failed_trial_call_opens_the_circuit_again(upstream):
+    client, calls = upstream([requests.ConnectionError()] * 3, retries=0, failure_threshold=2, reset_after=0.05)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            client.get('/health')
+
+    time.sleep(0.1)
+    with pytest.raises(requests.ConnectionError):
+        client.get('/health')
+    with pytest.raises(CircuitOpenError):
+        client.get('/health')
+    assert len(calls) == 3
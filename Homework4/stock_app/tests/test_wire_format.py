@@ -0,0 +1,81 @@
+import hashlib
+import os
+import numpy as np
+import pytest
+from wire_format import decode_payload, encode_payload, to_json_compatible
+
+MICROSERVICES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'microservices')
+
+
+def round_trip(payload):
+    return to_json_compatible(decode_payload(encode_payload(payload)))
+
+
+@pytest.mark.parametrize('payload', [
+    {'ticker': 'ALK', 'window': 60, 'weight': 0.5, 'incremental': True, 'date_to': None},
+    {'results': {'RSI': 41.5, 'signals': {'RSI': 'buy', 'MACD': 'hold'}}},
+    {'prices': [1.5, None, 3.0], 'volumes': [1, 2, 3], 'labels': ['a', '', None]},
+    {'companies': ['Алкалоид', 'Комерцијална банка'], 'note': 'ѓ'},
+    {'tickers': [], 'matrix': [[1.0, 2.0], [3.0, 4.0]]},
+])
+def test_plain_fields_round_trip(payload):
+    assert round_trip(payload) == payload
+
+
+def test_record_lists_round_trip():
+    rows = [
+        {'Date': '11/08/2024', 'Avg Price': 23193.84, 'Volume': 64, 'Note': ''},
+        {'Date': '11/07/2024', 'Avg Price': None, 'Volume': 130, 'Note': None},
+    ]
+
+    assert round_trip({'ticker': 'ALK', 'historical_data': rows}) == {'ticker': 'ALK', 'historical_data': rows}
+
+
+def test_keys_missing_from_some_rows_come_back_as_none():
+    rows = [{'ticker': 'ALK', 'signal': 'BUY'}, {'ticker': 'KMB'}]
+
+    assert round_trip({'results': rows})['results'] == [{'ticker': 'ALK', 'signal': 'BUY'}, {'ticker': 'KMB', 'signal': None}]
+
+
+def test_records_with_nested_fields_round_trip():
+    payload = {'results': [
+        {'ticker': 'ALK', 'indicators': {'RSI': 41.5, 'MACD': None}},
+        {'ticker': 'KMB', 'indicators': {'RSI': 70.1, 'MACD': -0.2}},
+    ]}
+
+    assert round_trip(payload) == payload
+
+
+@pytest.mark.parametrize('payload', [
+    {'results': [{'ticker': 'ALK', 'history': [{'day': 1}]}, {'ticker': 'KMB', 'history': [{'day': 2}]}]},
+    {'rows': [[{'day': 1}], [{'day': 2}]]},
+    {'mixed': [1, {'day': 2}]},
+])
+def test_containers_nested_in_lists_are_refused_instead_of_stringified(payload):
+    with pytest.raises(TypeError):
+        encode_payload(payload)
+
+
+def test_empty_lists_come_back_as_empty_lists():
+    # The dashboard posts historical_data: [] with every /analyze request
+    decoded = decode_payload(encode_payload({'ticker': 'ALK', 'historical_data': [], 'tickers': []}))
+
+    assert decoded == {'ticker': 'ALK', 'historical_data': [], 'tickers': []}
+    assert not decoded['historical_data']
+
+
+def test_numeric_columns_travel_as_typed_arrays():
+    decoded = decode_payload(encode_payload({'prices': np.arange(5, dtype=float), 'volume': np.arange(5)}))
+
+    assert decoded['prices'].dtype == np.float64
+    assert decoded['volume'].dtype == np.int64
+
+
+def test_every_service_has_the_same_wire_format():
+    def digest(path):
+        with open(path, 'rb') as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    gateway = digest(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'wire_format.py'))
+    for service in ('technical_analysis_service', 'fundamental_analysis_service', 'lstm_prediction_service'):
+        assert digest(os.path.join(MICROSERVICES_DIR, service, 'utils', 'wire_format.py')) == gateway, service
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+import designImplemetation as design
+
+
+def prices(days=120, seed=0):
+    rng = np.random.default_rng(seed)
+    avg = 100 + rng.normal(0, 1, days).cumsum()
+    return pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=days, freq='D'),
+        'Avg Price': avg,
+        'Max': avg + rng.uniform(0, 1, days),
+        'Min': avg - rng.uniform(0, 1, days),
+    })
+
+
+def rolling_wma(series, window):
+    # The rolling().apply implementation the kernel replaced
+    weights = np.arange(1, window + 1)
+    return series.rolling(window).apply(lambda values: np.dot(values, weights) / weights.sum(), raw=True)
+
+
+@pytest.mark.parametrize('window', [1, 4, 9, 15])
+def test_weighted_moving_average_matches_rolling_apply(window):
+    series = prices()['Avg Price']
+    series.iloc[30] = np.nan
+
+    pd.testing.assert_series_equal(design.weighted_moving_average(series, window), rolling_wma(series, window), check_names=False)
+
+
+def test_hull_moving_average_matches_rolling_apply():
+    price = prices()['Avg Price']
+    expected = (2 * rolling_wma(price, 4) - rolling_wma(price, 9)).rolling(window=3).mean()
+
+    pd.testing.assert_series_equal(design.MovingAverageFactory.create_hma(price, 9), expected, check_names=False)
+
+
+def test_timeframes_read_the_latest_row_of_the_full_series_indicators():
+    analyzer = design.TechnicalAnalyzer()
+    df = prices()
+    latest = analyzer.calculate_technical_indicators(df).iloc[-1]
+
+    results = analyzer.analyze_timeframes(df, {'1 day': 1, '1 month': 22})
+
+    for analysis in results.values():
+        assert analysis['Date'] == latest['Date'].strftime('%Y-%m-%d')
+        assert analysis['RSI'] == round(latest['RSI'], 2)
+        assert analysis['HMA'] == round(latest['HMA'], 2)
+        assert analysis['Signal'] == analyzer.generate_signal(latest)
+
+
+def test_timeframes_longer_than_the_history_are_left_out():
+    results = design.TechnicalAnalyzer().analyze_timeframes(prices(10), {'1 week': 5, '1 month': 22})
+
+    assert list(results) == ['1 week']
+
+
+@pytest.mark.parametrize('stored_rows', [1, 60, 119])
+def test_incremental_update_matches_a_full_recompute(stored_rows):
+    analyzer = design.TechnicalAnalyzer()
+    df = prices()
+    full = analyzer.calculate_technical_indicators(df)
+
+    updated = analyzer.update_technical_indicators(analyzer.calculate_technical_indicators(df.iloc[:stored_rows]), df)
+
+    pd.testing.assert_frame_equal(updated, full)
+
+
+@pytest.mark.parametrize('stored_rows, missing', [
+    (60, slice(55, 60)),   # stored rows end in missing prices
+    (60, slice(60, 63)),   # new rows start with missing prices
+    (60, slice(57, 64)),   # the gap spans the cut
+    (5, slice(0, 5)),      # no stored price at all
+])
+def test_incremental_update_matches_a_full_recompute_across_missing_prices(stored_rows, missing):
+    analyzer = design.TechnicalAnalyzer()
+    df = prices()
+    df.loc[df.index[missing], 'Avg Price'] = np.nan
+    full = analyzer.calculate_technical_indicators(df)
+
+    updated = analyzer.update_technical_indicators(analyzer.calculate_technical_indicators(df.iloc[:stored_rows]), df)
+
+    pd.testing.assert_frame_equal(updated, full)
+
+
+def test_macd_is_the_difference_of_the_stored_emas():
+    data = design.TechnicalAnalyzer().calculate_technical_indicators(prices())
+    price = data['Avg Price']
+    expected = price.ewm(span=12, adjust=False).mean() - price.ewm(span=26, adjust=False).mean()
+
+    pd.testing.assert_series_equal(data['MACD'], data['EMA_12'] - data['EMA_26'], check_names=False)
+    pd.testing.assert_series_equal(data['MACD'], expected, check_names=False)
+    # Without stored EMAs the indicator still computes its own
+    pd.testing.assert_series_equal(design.MACDIndicator().calculate(prices()), expected, check_names=False)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_vectorized_signals_match_the_row_loop(seed):
+    analyzer = design.TechnicalAnalyzer()
+    data = analyzer.calculate_technical_indicators(prices(days=200, seed=seed))
+
+    signals = analyzer.generate_signals(data)
+
+    assert signals.tolist() == [analyzer.generate_signal(row) for _, row in data.iterrows()]
+    assert list(signals.cat.categories) == design.SIGNAL_LABELS
+
+
+class ThresholdIndicator(design.TechnicalIndicator):
+    def calculate(self, data):
+        return data['Avg Price']
+
+    def generate_signal(self, value):
+        if pd.isna(value):
+            return 'unknown'
+        return 'buy' if value > 0 else 'sell' if value < 0 else 'hold'
+
+
+def test_generate_signals_defaults_to_asking_generate_signal():
+    codes = ThresholdIndicator().generate_signals(np.array([1.0, -1.0, 0.0, np.nan]))
+
+    assert codes.tolist() == [design.BUY, design.SELL, design.HOLD, design.HOLD]